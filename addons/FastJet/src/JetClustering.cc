@@ -2,6 +2,7 @@
 #include "FastJet/ExternalRecombiner.h"
 
 #include "FCCAnalyses/JetClusteringUtils.h"
+#include "FCCAnalyses/Timers.h"
 
 #include "fastjet/JetDefinition.hh"
 #include "fastjet/PseudoJet.hh"
@@ -31,6 +32,8 @@ namespace JetClustering {
   }
 
   FCCAnalysesJet clustering_kt::operator()(const std::vector<fastjet::PseudoJet>& input) {
+    FCCANALYSES_TIMER("JetClustering::clustering_kt");
+    FCCANALYSES_COUNT("JetClustering::clustering_kt inputs", input.size());
     //return empty struct
     if (FCCAnalyses::JetClusteringUtils::check(input.size(), _exclusive, _cut) == false)
       return FCCAnalyses::JetClusteringUtils::initialise_FCCAnalysesJet();
@@ -72,6 +75,8 @@ namespace JetClustering {
   }
 
   FCCAnalysesJet clustering_antikt::operator()(const std::vector<fastjet::PseudoJet>& input) {
+    FCCANALYSES_TIMER("JetClustering::clustering_antikt");
+    FCCANALYSES_COUNT("JetClustering::clustering_antikt inputs", input.size());
     //return empty struct
     if (FCCAnalyses::JetClusteringUtils::check(input.size(), _exclusive, _cut) == false)
       return FCCAnalyses::JetClusteringUtils::initialise_FCCAnalysesJet();
@@ -112,6 +117,8 @@ namespace JetClustering {
   }
 
   FCCAnalysesJet clustering_cambridge::operator()(const std::vector<fastjet::PseudoJet>& input) {
+    FCCANALYSES_TIMER("JetClustering::clustering_cambridge");
+    FCCANALYSES_COUNT("JetClustering::clustering_cambridge inputs", input.size());
     //return empty struct
     if (FCCAnalyses::JetClusteringUtils::check(input.size(), _exclusive, _cut) == false)
       return FCCAnalyses::JetClusteringUtils::initialise_FCCAnalysesJet();
@@ -148,6 +155,8 @@ namespace JetClustering {
   }
 
   FCCAnalysesJet clustering_ee_kt::operator()(const std::vector<fastjet::PseudoJet>& input) {
+    FCCANALYSES_TIMER("JetClustering::clustering_ee_kt");
+    FCCANALYSES_COUNT("JetClustering::clustering_ee_kt inputs", input.size());
     //return empty struct
     if (FCCAnalyses::JetClusteringUtils::check(input.size(), _exclusive, _cut) == false)
       return FCCAnalyses::JetClusteringUtils::initialise_FCCAnalysesJet();
@@ -187,6 +196,8 @@ namespace JetClustering {
   }
 
   FCCAnalysesJet clustering_ee_genkt::operator()(const std::vector<fastjet::PseudoJet>& input) {
+    FCCANALYSES_TIMER("JetClustering::clustering_ee_genkt");
+    FCCANALYSES_COUNT("JetClustering::clustering_ee_genkt inputs", input.size());
     //return empty struct
     if (FCCAnalyses::JetClusteringUtils::check(input.size(), _exclusive, _cut) == false)
       return FCCAnalyses::JetClusteringUtils::initialise_FCCAnalysesJet();
@@ -226,6 +237,8 @@ namespace JetClustering {
   }
 
   FCCAnalysesJet clustering_genkt::operator()(const std::vector<fastjet::PseudoJet>& input) {
+    FCCANALYSES_TIMER("JetClustering::clustering_genkt");
+    FCCANALYSES_COUNT("JetClustering::clustering_genkt inputs", input.size());
     //return empty struct
     if (FCCAnalyses::JetClusteringUtils::check(input.size(), _exclusive, _cut) == false)
       return FCCAnalyses::JetClusteringUtils::initialise_FCCAnalysesJet();
@@ -272,6 +285,8 @@ namespace JetClustering {
   }
 
   FCCAnalysesJet clustering_valencia::operator()(const std::vector<fastjet::PseudoJet>& input) {
+    FCCANALYSES_TIMER("JetClustering::clustering_valencia");
+    FCCANALYSES_COUNT("JetClustering::clustering_valencia inputs", input.size());
     //return empty struct
     if (FCCAnalyses::JetClusteringUtils::check(input.size(), _exclusive, _cut) == false)
       return FCCAnalyses::JetClusteringUtils::initialise_FCCAnalysesJet();
@@ -310,6 +325,8 @@ namespace JetClustering {
   }
 
   FCCAnalysesJet clustering_jade::operator()(const std::vector<fastjet::PseudoJet>& input) {
+    FCCANALYSES_TIMER("JetClustering::clustering_jade");
+    FCCANALYSES_COUNT("JetClustering::clustering_jade inputs", input.size());
     //return empty struct
     if (FCCAnalyses::JetClusteringUtils::check(input.size(), _exclusive, _cut) == false)
       return FCCAnalyses::JetClusteringUtils::initialise_FCCAnalysesJet();
@@ -261,6 +261,8 @@ class JetFlavourHelper:
             self.get_weight_str += "{},".format(var)
         self.get_weight_str = "{})".format(self.get_weight_str[:-1])
 
+        from libraries import load_analyzers
+        load_analyzers("JetFlavourUtils")
         from ROOT import JetFlavourUtils
 
         weaver = JetFlavourUtils.setup_weaver(
@@ -1,4 +1,5 @@
 #include "ONNXRuntime/WeaverInterface.h"
+#include "FCCAnalyses/Timers.h"
 
 #include "nlohmann/json.hpp"
 #include <fstream>
@@ -92,6 +93,7 @@ size_t WeaverInterface::variablePos(const std::string& var_name) const {
 }
 
 rv::RVec<float> WeaverInterface::run(const rv::RVec<ConstituentVars>& constituents) {
+  FCCANALYSES_TIMER("WeaverInterface::run");
   size_t i = 0;
   for (const auto& name : onnx_->inputNames()) {
     const auto& params = prep_info_map_.at(name);
@@ -2,13 +2,15 @@
 import ROOT
 import pathlib
 
-ROOT.gInterpreter.ProcessLine('#include "TMVAHelper/TMVAHelper.h"')
-ROOT.gSystem.Load("libTMVAHelper.so")
+from libraries import load_analyzers
 
 class TMVAHelperXGB():
 
     def __init__(self, model_input, model_name, variables=[]):
 
+        # library and header are loaded only when the helper is used
+        load_analyzers("tmva_helper_xgb")
+
         if len(variables) == 0: # try to get the variables from the model file (saved as a TList)
             fIn = ROOT.TFile(model_input)
             variables_ = fIn.Get("variables")
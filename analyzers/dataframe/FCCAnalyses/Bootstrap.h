@@ -0,0 +1,46 @@
+#ifndef BOOTSTRAP_ANALYZERS_H
+#define BOOTSTRAP_ANALYZERS_H
+
+#include <cstdint>
+#include <vector>
+
+#include "ROOT/RDF/RSampleInfo.hxx"
+#include "ROOT/RVec.hxx"
+
+namespace FCCAnalyses {
+
+/**
+ * Poisson bootstrap utilities.
+ *
+ * Every event gets one Poisson(1) weight per bootstrap replica. The weights
+ * are drawn from a counter-based generator keyed by the input file and the
+ * entry number in it, so they do not depend on the order in which the
+ * entries are processed by the threads.
+ */
+namespace Bootstrap {
+
+/// Entry number of the event in the currently processed data block, needs to
+/// be evaluated for every entry of the event loop
+ULong64_t entry(const ROOT::RDF::RSampleInfo &info);
+
+/// Offset of the file of the data block within the chain of the input files,
+/// subtracted from the entry numbers of the data blocks which are global in
+/// the chain (single-threaded loops and the global entry ranges), so that the
+/// entry number is always the one within the file. The offsets of all files
+/// in the chain are provided in ascending order, none for the blocks with
+/// entry numbers already local to the file
+ULong64_t offset(const ROOT::RDF::RSampleInfo &info,
+                 const std::vector<ULong64_t> &offsets);
+
+/// Key of the event, combines the file name with the entry number within it
+std::uint64_t key(const ROOT::RDF::RSampleInfo &info, ULong64_t entry,
+                  std::uint64_t seed = 0);
+
+/// Poisson(1) weights of the event for all the bootstrap replicas
+ROOT::VecOps::RVec<double> weights(std::uint64_t key, int nreplicas);
+
+} // namespace Bootstrap
+
+} // namespace FCCAnalyses
+
+#endif
@@ -0,0 +1,39 @@
+#ifndef CUTFLOW_ANALYZERS_H
+#define CUTFLOW_ANALYZERS_H
+
+#include <cstdint>
+
+#include "ROOT/RVec.hxx"
+
+namespace FCCAnalyses {
+
+/**
+ * Cut-flow utilities.
+ *
+ * The cuts of the final stage are evaluated once per event and stored in a
+ * bit mask, where i-th bit is set when the event passes the i-th cut. The
+ * functions below turn the mask into the quantities needed for the cut-flows,
+ * N-1 selections and the cut correlations.
+ */
+namespace CutFlow {
+
+/// Indices of the cuts the event passed
+ROOT::VecOps::RVec<int> passed(std::uint64_t mask, int ncuts);
+
+/// Indices of the cuts for which the event passed also all preceding cuts
+ROOT::VecOps::RVec<int> cumulative(std::uint64_t mask, int ncuts);
+
+/// First indices of all pairs of the cuts the event passed
+ROOT::VecOps::RVec<int> pairs_first(std::uint64_t mask, int ncuts);
+
+/// Second indices of all pairs of the cuts the event passed
+ROOT::VecOps::RVec<int> pairs_second(std::uint64_t mask, int ncuts);
+
+/// Whether the event passed all cuts, except the one with provided index
+bool pass_all_but(std::uint64_t mask, int ncuts, int index);
+
+} // namespace CutFlow
+
+} // namespace FCCAnalyses
+
+#endif
@@ -0,0 +1,51 @@
+#ifndef MEMORYMONITOR_ANALYZERS_H
+#define MEMORYMONITOR_ANALYZERS_H
+
+#include "RtypesCore.h"
+
+namespace FCCAnalyses {
+
+/**
+ * Monitor of the memory used by the process.
+ *
+ * The resident set size (RSS) of the process is sampled by a background
+ * thread, so that the peak reached during the event loop is recorded even
+ * when the driver is blocked in it.
+ *
+ * The always-true filter
+ *
+ *   FCCAnalyses::MemoryMonitor::mark_first_entry()
+ *
+ * records the resident set size and the time at the first entry of the event
+ * loop, after the computational graph was jitted and the first cluster read.
+ */
+namespace MemoryMonitor {
+
+/// Current resident set size of the process, in bytes
+ULong64_t get_rss();
+
+/// Start sampling of the resident set size, restarts the running sampling
+void start(unsigned intervalMs = 100);
+
+/// Stop sampling and return the peak resident set size, in bytes
+ULong64_t stop();
+
+/// Peak resident set size of the running or last sampling, in bytes
+ULong64_t get_peak();
+
+/// Record the resident set size at the first call after start, always
+/// returns true
+bool mark_first_entry();
+
+/// Resident set size recorded at the first entry, zero if not reached
+ULong64_t get_first_entry_rss();
+
+/// Time from the start to the first entry, in seconds, negative if not
+/// reached
+double get_first_entry_time();
+
+} // namespace MemoryMonitor
+
+} // namespace FCCAnalyses
+
+#endif
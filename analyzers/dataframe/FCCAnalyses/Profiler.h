@@ -0,0 +1,106 @@
+#ifndef PROFILER_ANALYZERS_H
+#define PROFILER_ANALYZERS_H
+
+#include <utility>
+#include <vector>
+
+#include "ROOT/RVec.hxx"
+#include "RtypesCore.h"
+
+namespace FCCAnalyses {
+
+/**
+ * Profiler of the RDataFrame Define and Filter nodes.
+ *
+ * Every profiled node gets its own set of per-slot counters. The profiled
+ * expression is wrapped as
+ *
+ *   (start(node, rdfslot_), stop(node, rdfslot_, (expression)))
+ *
+ * where the comma operator guarantees that the clock is started before the
+ * expression is evaluated. Only the expression of the node itself is
+ * measured, as RDataFrame evaluates the input columns before calling it.
+ *
+ * With stop_sized() also the heap memory held by the defined value is
+ * accounted, which gives an estimate of the bytes allocated per event by the
+ * RVec-valued columns.
+ */
+namespace Profiler {
+
+/// Register new profiled node and return its index
+int register_node(unsigned nslots);
+
+/// Remove all registered nodes
+void reset();
+
+/// Start the clock of the node
+void start(int node, unsigned slot);
+
+/// Stop the clock of the node and count the call
+void stop(int node, unsigned slot);
+
+/// Stop the clock of the Define node and pass through the defined value
+template <typename T> T stop(int node, unsigned slot, T &&value) {
+  stop(node, slot);
+  return std::forward<T>(value);
+}
+
+/// Add bytes allocated by the value of the Define node
+void add_bytes(int node, unsigned slot, ULong64_t bytes);
+
+/// Estimate of the heap memory held by the value, counts the buffers of the
+/// RVecs and vectors including the nested ones
+template <typename T> ULong64_t get_allocated_bytes(const T &);
+template <typename T>
+ULong64_t get_allocated_bytes(const ROOT::VecOps::RVec<T> &value);
+template <typename T>
+ULong64_t get_allocated_bytes(const std::vector<T> &value);
+
+template <typename T> ULong64_t get_allocated_bytes(const T &) { return 0; }
+
+template <typename T>
+ULong64_t get_allocated_bytes(const ROOT::VecOps::RVec<T> &value) {
+  ULong64_t result = value.capacity() * sizeof(T);
+  for (const auto &element : value) {
+    result += get_allocated_bytes(element);
+  }
+  return result;
+}
+
+template <typename T>
+ULong64_t get_allocated_bytes(const std::vector<T> &value) {
+  ULong64_t result = value.capacity() * sizeof(T);
+  for (const auto &element : value) {
+    result += get_allocated_bytes(element);
+  }
+  return result;
+}
+
+/// Stop the clock of the Define node, account the memory held by the value
+/// and pass it through
+template <typename T> T stop_sized(int node, unsigned slot, T &&value) {
+  stop(node, slot);
+  add_bytes(node, slot, get_allocated_bytes(value));
+  return std::forward<T>(value);
+}
+
+/// Stop the clock of the Filter node and count the passed events
+bool filter(int node, unsigned slot, bool passed);
+
+/// Cumulative time spent in the node per slot, in seconds
+std::vector<double> get_times(int node);
+
+/// Number of evaluations of the node
+ULong64_t get_calls(int node);
+
+/// Number of events which passed the Filter node
+ULong64_t get_passed(int node);
+
+/// Bytes allocated by the values of the Define node
+ULong64_t get_bytes(int node);
+
+} // namespace Profiler
+
+} // namespace FCCAnalyses
+
+#endif
@@ -0,0 +1,154 @@
+#ifndef TIMERS_ANALYZERS_H
+#define TIMERS_ANALYZERS_H
+
+#include <chrono>
+#include <deque>
+#include <mutex>
+#include <string>
+#include <vector>
+
+#include "RtypesCore.h"
+
+namespace FCCAnalyses {
+
+/**
+ * Scoped timers and counters of the analyzer hot paths.
+ *
+ * The instrumentation is compiled in only when the library is configured
+ * with -DFCCANALYSES_TIMERS=ON, otherwise the macros
+ *
+ *   FCCANALYSES_TIMER("name");
+ *   FCCANALYSES_COUNT("name", n);
+ *
+ * expand to nothing. The timer measures the time until the end of the
+ * enclosing scope, the times of the nested timers are inclusive. Every thread
+ * accumulates into its own counters, they are merged when read after the
+ * event loop.
+ *
+ * The core is header-only so that it can be used also by the addons, which
+ * are linked into the FCCAnalyses library.
+ */
+namespace Timers {
+
+using Clock = std::chrono::steady_clock;
+
+/// Accumulated values of one timer or counter in one thread
+struct Counter {
+  Clock::duration elapsed{0};
+  ULong64_t calls = 0;
+  ULong64_t count = 0;
+};
+
+/// Names of the timers and counters of all threads
+struct Registry {
+  std::mutex mutex;
+  std::vector<std::string> names;
+  // Deque keeps the counters in place when new threads register
+  std::deque<std::vector<Counter>> threads;
+};
+
+inline Registry &registry() {
+  static Registry instance;
+  return instance;
+}
+
+/// Register timer or counter and return its index, the same name gets the
+/// same index
+inline int register_timer(const std::string &name) {
+  Registry &reg = registry();
+  std::lock_guard<std::mutex> lock(reg.mutex);
+  for (std::size_t i = 0; i < reg.names.size(); ++i) {
+    if (reg.names[i] == name) {
+      return i;
+    }
+  }
+  reg.names.push_back(name);
+  return reg.names.size() - 1;
+}
+
+/// Counter of the calling thread
+inline Counter &thread_counter(int timer) {
+  thread_local std::vector<Counter> *counters = nullptr;
+  if (counters == nullptr) {
+    Registry &reg = registry();
+    std::lock_guard<std::mutex> lock(reg.mutex);
+    reg.threads.emplace_back();
+    counters = &reg.threads.back();
+  }
+  if (counters->size() <= static_cast<std::size_t>(timer)) {
+    counters->resize(timer + 1);
+  }
+  return (*counters)[timer];
+}
+
+/// Add to the counter
+inline void count(int timer, ULong64_t value) {
+  Counter &counter = thread_counter(timer);
+  ++counter.calls;
+  counter.count += value;
+}
+
+/// Measures time until the end of the enclosing scope
+class Scope {
+public:
+  explicit Scope(int timer) : m_timer(timer), m_start(Clock::now()) {}
+  ~Scope() {
+    Counter &counter = thread_counter(m_timer);
+    counter.elapsed += Clock::now() - m_start;
+    ++counter.calls;
+  }
+  Scope(const Scope &) = delete;
+  Scope &operator=(const Scope &) = delete;
+
+private:
+  int m_timer;
+  Clock::time_point m_start;
+};
+
+/// Whether the library was compiled with the timers
+bool compiled();
+
+/// Zero all timers and counters, not to be called during the event loop
+void reset();
+
+/// Names of the registered timers and counters
+std::vector<std::string> get_names();
+
+/// Time spent in the timers summed over the threads, in seconds
+std::vector<double> get_times();
+
+/// Number of calls of the timers and counters summed over the threads
+std::vector<ULong64_t> get_calls();
+
+/// Values of the counters summed over the threads
+std::vector<ULong64_t> get_counts();
+
+} // namespace Timers
+
+} // namespace FCCAnalyses
+
+#define FCCANALYSES_TIMERS_CONCAT_(a, b) a##b
+#define FCCANALYSES_TIMERS_CONCAT(a, b) FCCANALYSES_TIMERS_CONCAT_(a, b)
+
+#ifdef FCCANALYSES_TIMERS
+#define FCCANALYSES_TIMER(name)                                                \
+  static const int FCCANALYSES_TIMERS_CONCAT(fccTimer, __LINE__) =             \
+      FCCAnalyses::Timers::register_timer(name);                              \
+  FCCAnalyses::Timers::Scope FCCANALYSES_TIMERS_CONCAT(fccTimerScope,          \
+                                                       __LINE__)(             \
+      FCCANALYSES_TIMERS_CONCAT(fccTimer, __LINE__))
+#define FCCANALYSES_COUNT(name, value)                                         \
+  do {                                                                         \
+    static const int fccCounter = FCCAnalyses::Timers::register_timer(name);  \
+    FCCAnalyses::Timers::count(fccCounter, value);                            \
+  } while (false)
+#else
+#define FCCANALYSES_TIMER(name)                                                \
+  do {                                                                         \
+  } while (false)
+#define FCCANALYSES_COUNT(name, value)                                         \
+  do {                                                                         \
+  } while (false)
+#endif
+
+#endif
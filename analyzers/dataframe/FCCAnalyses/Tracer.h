@@ -0,0 +1,78 @@
+#ifndef TRACER_ANALYZERS_H
+#define TRACER_ANALYZERS_H
+
+#include <string>
+
+#include "ROOT/RDF/RSampleInfo.hxx"
+#include "RtypesCore.h"
+
+namespace FCCAnalyses {
+
+/**
+ * Timeline tracer of the event loop.
+ *
+ * Records the tasks processed by every thread of the event loop together
+ * with the file switches, phases of the run and scopes of the expensive
+ * calls, and saves them in the Chrome trace format viewable in Perfetto or
+ * chrome://tracing. Every thread gets its own track and buffer, so the
+ * recording does not need any locking.
+ *
+ * The tasks are detected by the always-true filter
+ *
+ *   FCCAnalyses::Tracer::tick(graph, rdfslot_, rdfsampleinfo_)
+ *
+ * placed at the top of the computational graph. A task starts with its first
+ * entry and ends with the last entry processed before the thread moves to
+ * another task.
+ */
+namespace Tracer {
+
+/// Start recording, the calling thread is shown as the main thread. At most
+/// maxEvents are recorded per thread
+void enable(ULong64_t maxEvents = 1000000);
+
+/// Stop recording and remove all recorded events
+void disable();
+
+/// Whether the recording is enabled
+bool is_enabled();
+
+/// Register traced computational graph and return its index
+int register_graph(const std::string &name);
+
+/// Record the entry of the event loop, always returns true
+bool tick(int graph, unsigned slot, const ROOT::RDF::RSampleInfo &info);
+
+/// Begin phase of the run on the calling thread
+void begin(const std::string &name);
+
+/// End the last begun phase of the run on the calling thread
+void end();
+
+/// Close the tasks which are still open, to be called after the event loop
+void finish();
+
+/// Save recorded events in Chrome trace format
+void save(const std::string &path);
+
+/// Number of recorded events
+ULong64_t get_nevents();
+
+/// Records duration of the enclosing scope as an event on the calling thread
+class Scope {
+public:
+  explicit Scope(const char *name);
+  ~Scope();
+  Scope(const Scope &) = delete;
+  Scope &operator=(const Scope &) = delete;
+
+private:
+  const char *m_name;
+  Long64_t m_start;
+};
+
+} // namespace Tracer
+
+} // namespace FCCAnalyses
+
+#endif
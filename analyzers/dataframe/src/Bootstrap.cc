@@ -0,0 +1,86 @@
+#include "FCCAnalyses/Bootstrap.h"
+
+#include <algorithm>
+#include <cmath>
+#include <functional>
+#include <string>
+#include <utility>
+
+namespace FCCAnalyses {
+
+namespace Bootstrap {
+
+namespace {
+// SplitMix64 finalizer, see https://prng.di.unimi.it/splitmix64.c
+std::uint64_t mix(std::uint64_t x) {
+  x += 0x9e3779b97f4a7c15ULL;
+  x = (x ^ (x >> 30)) * 0xbf58476d1ce4e5b9ULL;
+  x = (x ^ (x >> 27)) * 0x94d049bb133111ebULL;
+  return x ^ (x >> 31);
+}
+
+// Position of the thread in the data block it is processing
+struct BlockState {
+  std::string sample;
+  std::pair<ULong64_t, ULong64_t> range{0, 0};
+  ULong64_t next = 0;
+};
+} // namespace
+
+ULong64_t entry(const ROOT::RDF::RSampleInfo &info) {
+  // The data block is processed by a single thread entry by entry, the state
+  // is reset when the thread moves to another block or exhausts the current
+  // one
+  thread_local BlockState state;
+  const auto range = info.EntryRange();
+  if (state.next >= state.range.second || range != state.range ||
+      info.AsString() != state.sample) {
+    state.sample = info.AsString();
+    state.range = range;
+    state.next = range.first;
+  }
+
+  return state.next++;
+}
+
+ULong64_t offset(const ROOT::RDF::RSampleInfo &info,
+                 const std::vector<ULong64_t> &offsets) {
+  // The data block never spans more files, its file is the last one starting
+  // before the first entry of the block
+  const auto it = std::upper_bound(offsets.begin(), offsets.end(),
+                                   info.EntryRange().first);
+  if (it == offsets.begin()) {
+    return 0;
+  }
+  return *(it - 1);
+}
+
+std::uint64_t key(const ROOT::RDF::RSampleInfo &info, ULong64_t entry,
+                  std::uint64_t seed) {
+  const std::uint64_t sample = std::hash<std::string>{}(info.AsString());
+  return mix(mix(sample ^ seed) ^ entry);
+}
+
+ROOT::VecOps::RVec<double> weights(std::uint64_t key, int nreplicas) {
+  static const double p0 = std::exp(-1.);
+  ROOT::VecOps::RVec<double> result(nreplicas);
+  for (int i = 0; i < nreplicas; ++i) {
+    // Uniform number in [0, 1) from the top 53 bits
+    const double u = (mix(key + i) >> 11) * 0x1.0p-53;
+    // Inversion of the Poisson(1) cumulative distribution
+    int k = 0;
+    double p = p0;
+    double cdf = p0;
+    while (u >= cdf && k < 20) {
+      ++k;
+      p /= k;
+      cdf += p;
+    }
+    result[i] = k;
+  }
+  return result;
+}
+
+} // namespace Bootstrap
+
+} // namespace FCCAnalyses
@@ -0,0 +1,70 @@
+#include "FCCAnalyses/CutFlow.h"
+
+namespace FCCAnalyses {
+
+namespace CutFlow {
+
+namespace {
+bool is_set(std::uint64_t mask, int index) { return (mask >> index) & 1U; }
+} // namespace
+
+ROOT::VecOps::RVec<int> passed(std::uint64_t mask, int ncuts) {
+  ROOT::VecOps::RVec<int> result;
+  for (int i = 0; i < ncuts; ++i) {
+    if (is_set(mask, i)) {
+      result.push_back(i);
+    }
+  }
+  return result;
+}
+
+ROOT::VecOps::RVec<int> cumulative(std::uint64_t mask, int ncuts) {
+  ROOT::VecOps::RVec<int> result;
+  for (int i = 0; i < ncuts; ++i) {
+    if (!is_set(mask, i)) {
+      break;
+    }
+    result.push_back(i);
+  }
+  return result;
+}
+
+ROOT::VecOps::RVec<int> pairs_first(std::uint64_t mask, int ncuts) {
+  ROOT::VecOps::RVec<int> result;
+  for (int i = 0; i < ncuts; ++i) {
+    if (!is_set(mask, i)) {
+      continue;
+    }
+    for (int j = 0; j < ncuts; ++j) {
+      if (is_set(mask, j)) {
+        result.push_back(i);
+      }
+    }
+  }
+  return result;
+}
+
+ROOT::VecOps::RVec<int> pairs_second(std::uint64_t mask, int ncuts) {
+  ROOT::VecOps::RVec<int> result;
+  for (int i = 0; i < ncuts; ++i) {
+    if (!is_set(mask, i)) {
+      continue;
+    }
+    for (int j = 0; j < ncuts; ++j) {
+      if (is_set(mask, j)) {
+        result.push_back(j);
+      }
+    }
+  }
+  return result;
+}
+
+bool pass_all_but(std::uint64_t mask, int ncuts, int index) {
+  const std::uint64_t all = ncuts >= 64 ? ~std::uint64_t(0)
+                                        : (std::uint64_t(1) << ncuts) - 1;
+  return (mask | (std::uint64_t(1) << index)) == all;
+}
+
+} // namespace CutFlow
+
+} // namespace FCCAnalyses
@@ -1,4 +1,5 @@
 #include "FCCAnalyses/JetFlavourUtils.h"
+#include "FCCAnalyses/Tracer.h"
 #include "ONNXRuntime/WeaverInterface.h"
 
 #include <memory>
@@ -39,6 +40,7 @@ namespace FCCAnalyses {
             constit_vars.push_back((float)vars.at(k).at(i).at(j));
           jet_sc_vars.push_back(constit_vars);
         }
+        Tracer::Scope scope("ONNX inference");
         out.emplace_back(gWeavers.at(slot)->run(jet_sc_vars));
       }
       return out;
@@ -0,0 +1,122 @@
+#include "FCCAnalyses/MemoryMonitor.h"
+
+#include <algorithm>
+#include <atomic>
+#include <chrono>
+#include <condition_variable>
+#include <cstdio>
+#include <mutex>
+#include <thread>
+
+#include <sys/resource.h>
+#include <unistd.h>
+
+namespace FCCAnalyses {
+
+namespace MemoryMonitor {
+
+namespace {
+struct Sampler {
+  std::mutex mutex;
+  std::condition_variable condition;
+  std::thread thread;
+  bool running = false;
+  std::atomic<ULong64_t> peak{0};
+  std::atomic<bool> firstEntry{false};
+  ULong64_t firstEntryRss = 0;
+  std::chrono::steady_clock::time_point startTime;
+  double firstEntryTime = -1.;
+};
+
+Sampler &sampler() {
+  static Sampler instance;
+  return instance;
+}
+
+void update_peak(ULong64_t rss) {
+  std::atomic<ULong64_t> &peak = sampler().peak;
+  ULong64_t current = peak.load();
+  while (rss > current && !peak.compare_exchange_weak(current, rss)) {
+  }
+}
+} // namespace
+
+ULong64_t get_rss() {
+  // Linux, second field of statm is the resident size in pages
+  if (std::FILE *file = std::fopen("/proc/self/statm", "r")) {
+    unsigned long long size = 0;
+    unsigned long long resident = 0;
+    const int nread = std::fscanf(file, "%llu %llu", &size, &resident);
+    std::fclose(file);
+    if (nread == 2) {
+      return resident * sysconf(_SC_PAGESIZE);
+    }
+  }
+
+  // Elsewhere only the peak of the whole process is available
+  struct rusage usage;
+  getrusage(RUSAGE_SELF, &usage);
+#ifdef __APPLE__
+  return usage.ru_maxrss;
+#else
+  return usage.ru_maxrss * 1024ULL;
+#endif
+}
+
+void start(unsigned intervalMs) {
+  stop();
+  Sampler &smp = sampler();
+  smp.peak = get_rss();
+  smp.firstEntry = false;
+  smp.firstEntryRss = 0;
+  smp.firstEntryTime = -1.;
+  smp.startTime = std::chrono::steady_clock::now();
+  smp.running = true;
+  smp.thread = std::thread([intervalMs]() {
+    Sampler &smp = sampler();
+    std::unique_lock<std::mutex> lock(smp.mutex);
+    while (!smp.condition.wait_for(
+        lock, std::chrono::milliseconds(std::max(intervalMs, 1u)),
+        [&smp]() { return !smp.running; })) {
+      update_peak(get_rss());
+    }
+  });
+}
+
+ULong64_t stop() {
+  Sampler &smp = sampler();
+  {
+    std::lock_guard<std::mutex> lock(smp.mutex);
+    smp.running = false;
+  }
+  smp.condition.notify_all();
+  if (smp.thread.joinable()) {
+    smp.thread.join();
+  }
+  update_peak(get_rss());
+
+  return smp.peak;
+}
+
+ULong64_t get_peak() { return sampler().peak; }
+
+bool mark_first_entry() {
+  Sampler &smp = sampler();
+  if (!smp.firstEntry.load(std::memory_order_relaxed) &&
+      !smp.firstEntry.exchange(true)) {
+    smp.firstEntryTime = std::chrono::duration<double>(
+                             std::chrono::steady_clock::now() - smp.startTime)
+                             .count();
+    smp.firstEntryRss = get_rss();
+    update_peak(smp.firstEntryRss);
+  }
+  return true;
+}
+
+ULong64_t get_first_entry_rss() { return sampler().firstEntryRss; }
+
+double get_first_entry_time() { return sampler().firstEntryTime; }
+
+} // namespace MemoryMonitor
+
+} // namespace FCCAnalyses
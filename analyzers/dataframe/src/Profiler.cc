@@ -0,0 +1,93 @@
+#include "FCCAnalyses/Profiler.h"
+
+#include <chrono>
+#include <deque>
+
+namespace FCCAnalyses {
+
+namespace Profiler {
+
+namespace {
+using Clock = std::chrono::steady_clock;
+
+// Counters of one slot, padded to avoid false sharing between the slots
+struct alignas(64) Counter {
+  Clock::time_point start;
+  Clock::duration elapsed{0};
+  ULong64_t calls = 0;
+  ULong64_t passed = 0;
+  ULong64_t bytes = 0;
+};
+
+// Nodes are registered before the event loop, the deque keeps the counters
+// in place when new nodes are added
+std::deque<std::vector<Counter>> &counters() {
+  static std::deque<std::vector<Counter>> instance;
+  return instance;
+}
+} // namespace
+
+int register_node(unsigned nslots) {
+  counters().emplace_back(nslots > 0 ? nslots : 1);
+  return counters().size() - 1;
+}
+
+void reset() { counters().clear(); }
+
+void start(int node, unsigned slot) {
+  counters()[node][slot].start = Clock::now();
+}
+
+void stop(int node, unsigned slot) {
+  Counter &counter = counters()[node][slot];
+  counter.elapsed += Clock::now() - counter.start;
+  ++counter.calls;
+}
+
+void add_bytes(int node, unsigned slot, ULong64_t bytes) {
+  counters()[node][slot].bytes += bytes;
+}
+
+bool filter(int node, unsigned slot, bool passed) {
+  stop(node, slot);
+  if (passed) {
+    ++counters()[node][slot].passed;
+  }
+  return passed;
+}
+
+std::vector<double> get_times(int node) {
+  std::vector<double> result;
+  for (const auto &counter : counters()[node]) {
+    result.push_back(std::chrono::duration<double>(counter.elapsed).count());
+  }
+  return result;
+}
+
+ULong64_t get_calls(int node) {
+  ULong64_t result = 0;
+  for (const auto &counter : counters()[node]) {
+    result += counter.calls;
+  }
+  return result;
+}
+
+ULong64_t get_passed(int node) {
+  ULong64_t result = 0;
+  for (const auto &counter : counters()[node]) {
+    result += counter.passed;
+  }
+  return result;
+}
+
+ULong64_t get_bytes(int node) {
+  ULong64_t result = 0;
+  for (const auto &counter : counters()[node]) {
+    result += counter.bytes;
+  }
+  return result;
+}
+
+} // namespace Profiler
+
+} // namespace FCCAnalyses
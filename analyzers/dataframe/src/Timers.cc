@@ -0,0 +1,70 @@
+#include "FCCAnalyses/Timers.h"
+
+namespace FCCAnalyses {
+
+namespace Timers {
+
+bool compiled() {
+#ifdef FCCANALYSES_TIMERS
+  return true;
+#else
+  return false;
+#endif
+}
+
+void reset() {
+  Registry &reg = registry();
+  std::lock_guard<std::mutex> lock(reg.mutex);
+  for (auto &counters : reg.threads) {
+    for (auto &counter : counters) {
+      counter = Counter();
+    }
+  }
+}
+
+std::vector<std::string> get_names() {
+  Registry &reg = registry();
+  std::lock_guard<std::mutex> lock(reg.mutex);
+  return reg.names;
+}
+
+std::vector<double> get_times() {
+  Registry &reg = registry();
+  std::lock_guard<std::mutex> lock(reg.mutex);
+  std::vector<double> result(reg.names.size(), 0.);
+  for (const auto &counters : reg.threads) {
+    for (std::size_t i = 0; i < counters.size(); ++i) {
+      result[i] +=
+          std::chrono::duration<double>(counters[i].elapsed).count();
+    }
+  }
+  return result;
+}
+
+std::vector<ULong64_t> get_calls() {
+  Registry &reg = registry();
+  std::lock_guard<std::mutex> lock(reg.mutex);
+  std::vector<ULong64_t> result(reg.names.size(), 0);
+  for (const auto &counters : reg.threads) {
+    for (std::size_t i = 0; i < counters.size(); ++i) {
+      result[i] += counters[i].calls;
+    }
+  }
+  return result;
+}
+
+std::vector<ULong64_t> get_counts() {
+  Registry &reg = registry();
+  std::lock_guard<std::mutex> lock(reg.mutex);
+  std::vector<ULong64_t> result(reg.names.size(), 0);
+  for (const auto &counters : reg.threads) {
+    for (std::size_t i = 0; i < counters.size(); ++i) {
+      result[i] += counters[i].count;
+    }
+  }
+  return result;
+}
+
+} // namespace Timers
+
+} // namespace FCCAnalyses
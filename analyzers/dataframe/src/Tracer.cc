@@ -0,0 +1,290 @@
+#include "FCCAnalyses/Tracer.h"
+
+#include <atomic>
+#include <chrono>
+#include <cstdio>
+#include <deque>
+#include <fstream>
+#include <mutex>
+#include <stdexcept>
+#include <utility>
+#include <vector>
+
+namespace FCCAnalyses {
+
+namespace Tracer {
+
+namespace {
+using Clock = std::chrono::steady_clock;
+
+struct Event {
+  std::string name;
+  const char *category;
+  char phase; // 'X' for complete event, 'i' for instant event
+  Long64_t start;
+  Long64_t duration;
+  std::string args; // JSON object or empty
+};
+
+// Recorded events and the open task of one thread
+struct ThreadState {
+  int index = 0;
+  std::vector<Event> events;
+  ULong64_t dropped = 0;
+  bool taskOpen = false;
+  int graph = -1;
+  unsigned slot = 0;
+  std::pair<ULong64_t, ULong64_t> range{0, 0};
+  ULong64_t nentries = 0;
+  std::string sample;
+  Long64_t taskStart = 0;
+  Long64_t lastTime = 0;
+  std::vector<std::pair<std::string, Long64_t>> phases;
+};
+
+struct Registry {
+  std::mutex mutex;
+  std::atomic<bool> enabled{false};
+  // Incremented on every enable/disable, threads holding state of the
+  // previous recording register again
+  std::atomic<unsigned> generation{1};
+  Clock::time_point origin = Clock::now();
+  ULong64_t maxEvents = 0;
+  // Deque keeps the states in place when new threads register
+  std::deque<ThreadState> threads;
+  std::vector<std::string> graphs;
+};
+
+Registry &registry() {
+  static Registry instance;
+  return instance;
+}
+
+Long64_t now() {
+  return std::chrono::duration_cast<std::chrono::nanoseconds>(
+             Clock::now() - registry().origin)
+      .count();
+}
+
+ThreadState &thread_state() {
+  thread_local ThreadState *state = nullptr;
+  thread_local unsigned generation = 0;
+  Registry &reg = registry();
+  const unsigned current = reg.generation.load(std::memory_order_acquire);
+  if (state == nullptr || generation != current) {
+    std::lock_guard<std::mutex> lock(reg.mutex);
+    reg.threads.emplace_back();
+    state = &reg.threads.back();
+    state->index = reg.threads.size() - 1;
+    generation = current;
+  }
+  return *state;
+}
+
+void record(ThreadState &state, Event &&event) {
+  if (state.events.size() >= registry().maxEvents) {
+    ++state.dropped;
+    return;
+  }
+  state.events.push_back(std::move(event));
+}
+
+std::string escape(const std::string &text) {
+  std::string result;
+  for (const char c : text) {
+    if (c == '"' || c == '\\') {
+      result += '\\';
+      result += c;
+    } else if (static_cast<unsigned char>(c) < 0x20) {
+      char buffer[8];
+      std::snprintf(buffer, sizeof(buffer), "\\u%04x", c);
+      result += buffer;
+    } else {
+      result += c;
+    }
+  }
+  return result;
+}
+
+void close_task(ThreadState &state) {
+  if (!state.taskOpen) {
+    return;
+  }
+  std::string args = "{\"slot\": " + std::to_string(state.slot);
+  args += ", \"first\": " + std::to_string(state.range.first);
+  args += ", \"last\": " + std::to_string(state.range.second);
+  args += ", \"entries\": " + std::to_string(state.nentries);
+  args += ", \"file\": \"" + escape(state.sample) + "\"}";
+  record(state, {registry().graphs.at(state.graph), "task", 'X',
+                 state.taskStart, state.lastTime - state.taskStart,
+                 std::move(args)});
+  state.taskOpen = false;
+}
+
+std::string format_time(Long64_t time) {
+  char buffer[32];
+  std::snprintf(buffer, sizeof(buffer), "%.3f", time / 1000.);
+  return buffer;
+}
+} // namespace
+
+void enable(ULong64_t maxEvents) {
+  Registry &reg = registry();
+  {
+    std::lock_guard<std::mutex> lock(reg.mutex);
+    reg.threads.clear();
+    reg.graphs.clear();
+    reg.maxEvents = maxEvents;
+    reg.origin = Clock::now();
+    reg.generation.fetch_add(1, std::memory_order_release);
+  }
+  reg.enabled.store(true, std::memory_order_release);
+  // The enabling thread becomes the first track
+  thread_state();
+}
+
+void disable() {
+  Registry &reg = registry();
+  reg.enabled.store(false, std::memory_order_release);
+  std::lock_guard<std::mutex> lock(reg.mutex);
+  reg.threads.clear();
+  reg.graphs.clear();
+  reg.generation.fetch_add(1, std::memory_order_release);
+}
+
+bool is_enabled() {
+  return registry().enabled.load(std::memory_order_acquire);
+}
+
+int register_graph(const std::string &name) {
+  Registry &reg = registry();
+  std::lock_guard<std::mutex> lock(reg.mutex);
+  reg.graphs.push_back(name);
+  return reg.graphs.size() - 1;
+}
+
+bool tick(int graph, unsigned slot, const ROOT::RDF::RSampleInfo &info) {
+  ThreadState &state = thread_state();
+  const Long64_t time = now();
+  const auto range = info.EntryRange();
+  // New task starts when the thread moves to another data block or exhausts
+  // the current one
+  if (!state.taskOpen || graph != state.graph || slot != state.slot ||
+      range != state.range ||
+      state.nentries >= state.range.second - state.range.first) {
+    close_task(state);
+    std::string sample = info.AsString();
+    if (sample != state.sample) {
+      record(state, {"file switch", "io", 'i', time, 0,
+                     "{\"file\": \"" + escape(sample) + "\"}"});
+      state.sample = std::move(sample);
+    }
+    state.taskOpen = true;
+    state.graph = graph;
+    state.slot = slot;
+    state.range = range;
+    state.nentries = 0;
+    state.taskStart = time;
+  }
+  state.lastTime = time;
+  ++state.nentries;
+
+  return true;
+}
+
+void begin(const std::string &name) {
+  if (!is_enabled()) {
+    return;
+  }
+  thread_state().phases.emplace_back(name, now());
+}
+
+void end() {
+  if (!is_enabled()) {
+    return;
+  }
+  ThreadState &state = thread_state();
+  if (state.phases.empty()) {
+    throw std::runtime_error("Tracer: No phase to end!");
+  }
+  auto [name, start] = std::move(state.phases.back());
+  state.phases.pop_back();
+  record(state, {std::move(name), "phase", 'X', start, now() - start, ""});
+}
+
+void finish() {
+  Registry &reg = registry();
+  std::lock_guard<std::mutex> lock(reg.mutex);
+  for (auto &state : reg.threads) {
+    close_task(state);
+  }
+}
+
+void save(const std::string &path) {
+  Registry &reg = registry();
+  std::lock_guard<std::mutex> lock(reg.mutex);
+  std::ofstream outfile(path);
+  if (!outfile) {
+    throw std::runtime_error("Tracer: Can't open " + path + "!");
+  }
+
+  ULong64_t dropped = 0;
+  outfile << "{\"displayTimeUnit\": \"ms\", \"traceEvents\": [\n";
+  outfile << "{\"name\": \"process_name\", \"ph\": \"M\", \"pid\": 1, "
+             "\"args\": {\"name\": \"FCCAnalyses\"}}";
+  for (const auto &state : reg.threads) {
+    const std::string tid = std::to_string(state.index);
+    const std::string name =
+        state.index == 0 ? "main" : "thread " + std::to_string(state.index);
+    outfile << ",\n{\"name\": \"thread_name\", \"ph\": \"M\", \"pid\": 1, "
+            << "\"tid\": " << tid << ", \"args\": {\"name\": \"" << name
+            << "\"}}";
+    for (const auto &event : state.events) {
+      outfile << ",\n{\"name\": \"" << escape(event.name) << "\", \"cat\": \""
+              << event.category << "\", \"ph\": \"" << event.phase
+              << "\", \"pid\": 1, \"tid\": " << tid
+              << ", \"ts\": " << format_time(event.start);
+      if (event.phase == 'X') {
+        outfile << ", \"dur\": " << format_time(event.duration);
+      } else {
+        outfile << ", \"s\": \"t\"";
+      }
+      if (!event.args.empty()) {
+        outfile << ", \"args\": " << event.args;
+      }
+      outfile << "}";
+    }
+    dropped += state.dropped;
+  }
+  outfile << "\n], \"otherData\": {\"droppedEvents\": " << dropped << "}}\n";
+}
+
+ULong64_t get_nevents() {
+  Registry &reg = registry();
+  std::lock_guard<std::mutex> lock(reg.mutex);
+  ULong64_t result = 0;
+  for (const auto &state : reg.threads) {
+    result += state.events.size();
+  }
+  return result;
+}
+
+Scope::Scope(const char *name)
+    : m_name(name), m_start(is_enabled() ? now() : -1) {}
+
+Scope::~Scope() {
+  if (m_start < 0 || !is_enabled()) {
+    return;
+  }
+  ThreadState &state = thread_state();
+  const Long64_t time = now();
+  record(state, {m_name, "call", 'X', m_start, time - m_start, ""});
+  // Keep the scope inside the task which is processing it
+  if (state.taskOpen) {
+    state.lastTime = time;
+  }
+}
+
+} // namespace Tracer
+
+} // namespace FCCAnalyses
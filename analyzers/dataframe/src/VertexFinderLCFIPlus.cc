@@ -2,6 +2,7 @@
 // contact: kunal.gautam@cern.ch
 
 #include "FCCAnalyses/VertexFinderLCFIPlus.h"
+#include "FCCAnalyses/Timers.h"
 #include <iostream>
 
 namespace FCCAnalyses{
@@ -275,6 +276,9 @@ ROOT::VecOps::RVec<VertexingUtils::FCCAnalysesVertex> findSVfromTracks(ROOT::Vec
                                                                        const ROOT::VecOps::RVec<edm4hep::TrackState>&  alltracks,
 								       VertexingUtils::FCCAnalysesVertex PV,
 								       double chi2_cut, double invM_cut, double chi2Tr_cut) {
+  FCCANALYSES_TIMER("VertexFinderLCFIPlus::findSVfromTracks");
+  FCCANALYSES_COUNT("VertexFinderLCFIPlus::findSVfromTracks tracks",
+                    tracks_fin.size());
 
   // find SVs (only if there are 2 or more tracks)
   ROOT::VecOps::RVec<VertexingUtils::FCCAnalysesVertex> result;
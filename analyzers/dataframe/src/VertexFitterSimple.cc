@@ -1,5 +1,6 @@
 #include "FCCAnalyses/VertexFitterSimple.h"
 #include "FCCAnalyses/MCParticle.h"
+#include "FCCAnalyses/Timers.h"
 
 #include <iostream>
 
@@ -98,6 +99,10 @@ VertexFitter_Tk(int Primary, ROOT::VecOps::RVec<edm4hep::TrackState> tracks,
                 const ROOT::VecOps::RVec<edm4hep::TrackState> &alltracks,
                 bool BeamSpotConstraint, double bsc_sigmax, double bsc_sigmay,
                 double bsc_sigmaz, double bsc_x, double bsc_y, double bsc_z) {
+  FCCANALYSES_TIMER("VertexFitterSimple::VertexFitter_Tk");
+  FCCANALYSES_COUNT("VertexFitterSimple::VertexFitter_Tk tracks",
+                    tracks.size());
+
   // Suppressing printf() output from TMatrixBase:
   // https://github.com/root-project/root/blob/722eb4652bfc79149df00c8b0e92d0837caf054c/math/matrix/src/TMatrixTBase.cxx#L662
   // The solution found here:
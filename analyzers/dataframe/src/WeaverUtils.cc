@@ -1,4 +1,5 @@
 #include "FCCAnalyses/WeaverUtils.h"
+#include "FCCAnalyses/Tracer.h"
 #include "ONNXRuntime/WeaverInterface.h"
 
 #include <memory>
@@ -35,6 +36,7 @@ namespace FCCAnalyses {
             input_vars.push_back((float)vars.at(k).at(i).at(j));
           obj_sc_vars.push_back(input_vars);
         }
+        Tracer::Scope scope("ONNX inference");
         out.emplace_back(gWeaver2->run(obj_sc_vars));
       }
       return out;
@@ -108,6 +108,46 @@ macro(fccanalyses_addon_build _name)
   endif()
 endmacro()
 
+#--- Build analyzers with heavy dependencies into a separate library
+macro(fccanalyses_analyzers_build _name)
+  set(options)
+  set(one_val)
+  set(multi_vals ANALYZERS EXT_LIBS)
+  cmake_parse_arguments(ARG "${options}" "${one_val}" "${multi_vals}" ${ARGN})
+  set(_sources)
+  set(_headers)
+  set(_linkdef "#ifdef __CINT__\n#pragma link off all globals;\n#pragma link off all classes;\n#pragma link off all functions;\n#pragma link C++ nestedclasses;\n")
+  foreach(_analyzer ${ARG_ANALYZERS})
+    list(APPEND _sources src/${_analyzer}.cc)
+    list(APPEND _headers FCCAnalyses/${_analyzer}.h)
+    string(APPEND _linkdef "#pragma link C++ namespace FCCAnalyses::${_analyzer};\n")
+  endforeach()
+  string(APPEND _linkdef "#endif\n")
+  file(WRITE ${CMAKE_CURRENT_BINARY_DIR}/LinkDef${_name}.h "${_linkdef}")
+  add_library(FCCAnalyses${_name} SHARED ${_sources} ${_headers})
+  target_link_libraries(FCCAnalyses${_name} PUBLIC FCCAnalyses ${ARG_EXT_LIBS})
+  set_target_properties(FCCAnalyses${_name} PROPERTIES
+    PUBLIC_HEADER "${_headers}")
+  # Dictionary and rootmap, ROOT autoloads the library when one of its
+  # namespaces is used
+  ROOT_GENERATE_DICTIONARY(G__FCCAnalyses${_name}
+                           ${_headers}
+                           MODULE FCCAnalyses${_name}
+                           LINKDEF ${CMAKE_CURRENT_BINARY_DIR}/LinkDef${_name}.h
+                           )
+  #----- installation rules
+  install(TARGETS FCCAnalyses${_name}
+          EXPORT FCCAnalysesTargets
+          RUNTIME DESTINATION "${INSTALL_BIN_DIR}" COMPONENT bin
+          LIBRARY DESTINATION "${INSTALL_LIB_DIR}" COMPONENT shlib
+          PUBLIC_HEADER DESTINATION "${INSTALL_INCLUDE_DIR}/FCCAnalyses"
+          COMPONENT dev)
+  install(FILES
+    "${CMAKE_CURRENT_BINARY_DIR}/libFCCAnalyses${_name}.rootmap"
+    "${CMAKE_CURRENT_BINARY_DIR}/libFCCAnalyses${_name}_rdict.pcm"
+    DESTINATION "${INSTALL_LIB_DIR}" COMPONENT dev)
+endmacro()
+
 macro(get_subdirectories result dir)
   file(GLOB sub_dirs RELATIVE ${dir} ${dir}/*)
   set(dirs)
@@ -5,6 +5,7 @@ import argparse
 ROOT.EnableImplicitMT()
 print ("Load cxx analyzers ... ")
 ROOT.gSystem.Load("libFCCAnalyses")
+ROOT.gSystem.Load("libFCCAnalysesDD4hep")
 
 ROOT.gErrorIgnoreLevel = ROOT.kFatal
 _fcc  = ROOT.dummyLoader
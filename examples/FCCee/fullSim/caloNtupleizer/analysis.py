@@ -4,6 +4,7 @@ import ROOT
 
 print ("Load cxx analyzers ... ")
 ROOT.gSystem.Load("libFCCAnalyses")
+ROOT.gSystem.Load("libFCCAnalysesDD4hep")
 ROOT.gErrorIgnoreLevel = ROOT.kFatal
 
 def str2bool(v):
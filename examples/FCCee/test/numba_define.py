@@ -0,0 +1,85 @@
+'''
+Analysis example, event observables computed by Python functions compiled
+with Numba. The same observables are computed with the C++ expressions in
+numba_define_cpp.py, the two are compared in the benchmarks.
+'''
+from udf import define_numba, filter_numba
+
+
+# Mandatory: List of processes
+processList = {
+    'p8_noBES_ee_H_Hbb_ecm125': {'fraction': 0.01, 'chunks': 1,
+                                 'output': 'test_out'}
+}
+
+# Mandatory: Production tag when running over EDM4Hep centrally produced
+# events, this points to the yaml files for getting sample statistics
+prodTag = "FCCee/spring2021/IDEA/"
+
+# Optional: output directory, default is local running directory
+outputDir = "outputs/numba_define"
+
+# Optional: analysis name, used in the benchmarks
+analysisName = "numba_define"
+
+# Optional test file
+testFile = "root://eospublic.cern.ch//eos/experiment/fcc/ee/generation/" \
+           "DelphesEvents/spring2021/IDEA/p8_ee_ZH_ecm240/" \
+           "events_101027117.root"
+
+
+def at_least_two(pt):
+    '''
+    At least two reconstructed particles.
+    '''
+    return len(pt) >= 2
+
+
+def scalar_ht(pt):
+    '''
+    Scalar sum of the transverse momenta above 1 GeV.
+    '''
+    return pt[pt > 1.].sum()
+
+
+def n_hard(pt):
+    '''
+    Number of particles with transverse momentum above 5 GeV.
+    '''
+    return (pt > 5.).sum()
+
+
+def leading_pt(pt):
+    '''
+    Transverse momentum of the leading particle.
+    '''
+    return pt.max() if len(pt) > 0 else 0.
+
+
+# Mandatory: RDFanalysis class where the use defines the operations on the
+# TTree
+class RDFanalysis():
+    '''
+    Event observables from Python functions.
+    '''
+    # Mandatory: analysers funtion to define the analysers to process, please
+    # make sure you return the last dataframe
+    def analysers(df):
+        '''
+        Analysis graph.
+        '''
+        df = df.Define("RP_pt", "ReconstructedParticle::get_pt("
+                                "ReconstructedParticles)")
+        df = filter_numba(df, at_least_two, ["RP_pt"])
+        df = define_numba(df, "RP_ht", scalar_ht, ["RP_pt"])
+        df = define_numba(df, "RP_n_hard", n_hard, ["RP_pt"])
+        df = define_numba(df, "RP_leading_pt", leading_pt, ["RP_pt"])
+        return df
+
+    # Mandatory: output function, please make sure you return the branchlist
+    # as a python list
+    def output():
+        '''
+        Output variables which will be saved to output root file.
+        '''
+        return ["RP_ht", "RP_n_hard", "RP_leading_pt"]
@@ -0,0 +1,58 @@
+'''
+Analysis example, the event observables of numba_define.py computed with the
+C++ expressions, as reference for the benchmarks.
+'''
+
+# Mandatory: List of processes
+processList = {
+    'p8_noBES_ee_H_Hbb_ecm125': {'fraction': 0.01, 'chunks': 1,
+                                 'output': 'test_out'}
+}
+
+# Mandatory: Production tag when running over EDM4Hep centrally produced
+# events, this points to the yaml files for getting sample statistics
+prodTag = "FCCee/spring2021/IDEA/"
+
+# Optional: output directory, default is local running directory
+outputDir = "outputs/numba_define_cpp"
+
+# Optional: analysis name, used in the benchmarks
+analysisName = "numba_define_cpp"
+
+# Optional test file
+testFile = "root://eospublic.cern.ch//eos/experiment/fcc/ee/generation/" \
+           "DelphesEvents/spring2021/IDEA/p8_ee_ZH_ecm240/" \
+           "events_101027117.root"
+
+
+# Mandatory: RDFanalysis class where the use defines the operations on the
+# TTree
+class RDFanalysis():
+    '''
+    Event observables from C++ expressions.
+    '''
+    # Mandatory: analysers funtion to define the analysers to process, please
+    # make sure you return the last dataframe
+    def analysers(df):
+        '''
+        Analysis graph.
+        '''
+        df2 = (
+            df
+            .Define("RP_pt", "ReconstructedParticle::get_pt("
+                             "ReconstructedParticles)")
+            .Filter("RP_pt.size() >= 2")
+            .Define("RP_ht", "Sum(RP_pt[RP_pt > 1.f])")
+            .Define("RP_n_hard", "(long) Sum(RP_pt > 5.f)")
+            .Define("RP_leading_pt",
+                    "RP_pt.size() > 0 ? Max(RP_pt) : 0.f")
+        )
+        return df2
+
+    # Mandatory: output function, please make sure you return the branchlist
+    # as a python list
+    def output():
+        '''
+        Output variables which will be saved to output root file.
+        '''
+        return ["RP_ht", "RP_n_hard", "RP_leading_pt"]
@@ -73,6 +73,23 @@ def get_element(rdf_module, element: str, is_final: bool = False):
                              'stage of the analysis.', element)
             return 'workday'
 
+        elif element == 'batchBackend':
+            LOGGER.debug('The variable <%s> is optional in your analysis '
+                         'script.\nReturning default value: "condor"',
+                         element)
+            if is_final:
+                LOGGER.debug('The option <%s> is not available in the final '
+                             'stage of the analysis.', element)
+            return 'condor'
+
+        elif element == 'batchMaxCPUs':
+            LOGGER.debug('The variable <%s> is optional in your analysis '
+                         'script.\nReturning default value: 0', element)
+            if is_final:
+                LOGGER.debug('The option <%s> is not available in the final '
+                             'stage of the analysis.', element)
+            return 0
+
         elif element == 'compGroup':
             LOGGER.debug('The variable <%s> is optional in your analysis '
                          'script.\nReturning default value: '
@@ -191,6 +208,60 @@ def get_element(rdf_module, element: str, is_final: bool = False):
             LOGGER.debug('The option <%s> is not available in the presel. '
                          'stages of the analysis', element)
 
+        elif element == 'bootstrapReplicas':
+            if is_final:
+                LOGGER.debug('The variable <%s> is optional in the '
+                             'histmaker.\nReturning default value: 0',
+                             element)
+                return 0
+            LOGGER.debug('The option <%s> is not available in the presel. '
+                         'stages of the analysis', element)
+
+        elif element == 'bootstrapSeed':
+            if is_final:
+                LOGGER.debug('The variable <%s> is optional in the '
+                             'histmaker.\nReturning default value: 0',
+                             element)
+                return 0
+            LOGGER.debug('The option <%s> is not available in the presel. '
+                         'stages of the analysis', element)
+
+        elif element == 'cutScan':
+            if is_final:
+                LOGGER.debug('The variable <%s> is optional in your final '
+                             'analysis script.\nReturning empty dictionary.',
+                             element)
+                return {}
+            LOGGER.debug('The option <%s> is not available in the presel. '
+                         'stages of the analysis', element)
+
+        elif element == 'scanSignal':
+            if is_final:
+                LOGGER.debug('The variable <%s> is optional in your final '
+                             'analysis script.\nReturning empty list.',
+                             element)
+                return []
+            LOGGER.debug('The option <%s> is not available in the presel. '
+                         'stages of the analysis', element)
+
+        elif element == 'saveCutFlow':
+            if is_final:
+                LOGGER.debug('The variable <%s> is optional in your final '
+                             'analysis script.\nReturning default value: '
+                             'False', element)
+                return False
+            LOGGER.debug('The option <%s> is not available in the presel. '
+                         'stages of the analysis', element)
+
+        elif element == 'doNMinusOne':
+            if is_final:
+                LOGGER.debug('The variable <%s> is optional in your final '
+                             'analysis script.\nReturning default value: '
+                             'False', element)
+                return False
+            LOGGER.debug('The option <%s> is not available in the presel. '
+                         'stages of the analysis', element)
+
         elif element == 'saveTabular':
             if is_final:
                 LOGGER.debug('The variable <%s> is optional in your final '
@@ -231,6 +302,12 @@ def get_element(rdf_module, element: str, is_final: bool = False):
         elif element == 'graphPath':
             return ''
 
+        elif element == 'aotCompile':
+            return False
+
+        elif element == 'aotCacheDir':
+            return ''
+
         return None
 
 
@@ -0,0 +1,366 @@
+'''
+Ahead-of-time compilation of the analysis graph.
+
+The Define and Filter nodes booked by the analysers with string expressions
+are turned into typed lambdas of a C++ source file, which is compiled once
+into a shared library. The library is stored in the cache under the hash of
+the booked expressions, the types of the used input columns, the headers and
+the ROOT and analyzers libraries. Later runs, including the batch jobs, load
+the library and book the graph from it, skipping the jitting.
+'''
+
+import os
+import re
+import sys
+import json
+import glob
+import shutil
+import hashlib
+import logging
+import tempfile
+import subprocess
+import ROOT  # type: ignore
+
+from libraries import ANALYZER_LIBRARIES, LOADED_NAMESPACES, \
+    get_loaded_libraries
+
+
+ROOT.gROOT.SetBatch(True)
+
+LOGGER: logging.Logger = logging.getLogger('FCCAnalyses.aot')
+
+# Implicit columns available to the expressions
+SPECIAL_COLUMNS: tuple[str, ...] = ('rdfentry_', 'rdfslot_')
+
+
+# _____________________________________________________________________________
+class RecordedNode:
+    '''
+    Stand-in for the RDataFrame node, which records the operations booked by
+    the analysers. Only Define, Redefine and Filter with string expressions
+    and Alias are supported, other calls raise AttributeError.
+    '''
+    def __init__(self):
+        self.operations: list[tuple] = []
+
+    def Define(self, name, expression, *args):
+        '''
+        Record Define of the column.
+        '''
+        return self.record('Define', name, expression, args)
+
+    def Redefine(self, name, expression, *args):
+        '''
+        Record Redefine of the column.
+        '''
+        return self.record('Redefine', name, expression, args)
+
+    def Filter(self, expression, name='', *args):
+        '''
+        Record Filter.
+        '''
+        return self.record('Filter', name, expression, args)
+
+    def Alias(self, alias, column):
+        '''
+        Record Alias of the column.
+        '''
+        self.operations.append(('Alias', alias, column))
+        return self
+
+    def record(self, kind: str, name, expression, args: tuple):
+        '''
+        Record operation with the string expression.
+        '''
+        if args or not isinstance(expression, str) or \
+                not isinstance(name, str):
+            raise AttributeError(f'{kind} without string expression')
+        if 'Numba::' in expression:
+            raise AttributeError(f'{kind} calling Python function')
+        self.operations.append((kind, name, expression))
+        return self
+
+
+# _____________________________________________________________________________
+def record_operations(analysers) -> list[tuple] | None:
+    '''
+    Record operations booked by the analysers, returns None if they can't be
+    compiled ahead-of-time.
+    '''
+    node = RecordedNode()
+    try:
+        result = analysers(node)
+    except Exception as excp:
+        LOGGER.warning('The analysers can\'t be compiled ahead-of-time, '
+                       'only Define, Redefine, Filter with string '
+                       'expressions and Alias are supported:\n%s', excp)
+        return None
+    if result is not node:
+        LOGGER.warning('The analysers can\'t be compiled ahead-of-time, they '
+                       'don\'t return the booked node!')
+        return None
+
+    return node.operations
+
+
+# _____________________________________________________________________________
+def get_column_pattern(columns) -> re.Pattern:
+    '''
+    Get pattern matching the column names in the expression, not being part
+    of a longer identifier or accessed as a member.
+    '''
+    names = sorted(columns, key=len, reverse=True)
+    return re.compile(r'(?<![\w.])(' + '|'.join(re.escape(n) for n in names) +
+                      r')(?!\w)')
+
+
+# _____________________________________________________________________________
+def get_used_columns(operations: list[tuple],
+                     input_columns: list[str]) -> list[str]:
+    '''
+    Get input columns used by the expressions of the operations.
+    '''
+    available = set(input_columns) | set(SPECIAL_COLUMNS)
+    used = set()
+    for kind, name, expression in operations:
+        if kind == 'Alias':
+            used.add(expression)
+            available.add(name)
+            continue
+        used |= set(get_column_pattern(available).findall(expression))
+        if kind != 'Filter':
+            available.add(name)
+
+    return sorted(used & set(input_columns))
+
+
+# _____________________________________________________________________________
+def get_cache_key(operations: list[tuple], input_types: dict[str, str],
+                  headers: list[str]) -> str:
+    '''
+    Get hash of everything the compiled graph depends on.
+    '''
+    sha = hashlib.sha256()
+    sha.update(json.dumps([operations, input_types]).encode())
+    sha.update(ROOT.gROOT.GetVersion().encode())
+    library_path = ROOT.gSystem.DynamicPathName('libFCCAnalyses', True)
+    library_paths = [library_path] if library_path else []
+    # Analyzer libraries loaded on demand are linked into the graph as well
+    library_paths += get_loaded_libraries()
+    for path in library_paths + headers:
+        stat = os.stat(path)
+        sha.update(f'{path}:{stat.st_size}:{stat.st_mtime_ns}'.encode())
+
+    return sha.hexdigest()[:16]
+
+
+# _____________________________________________________________________________
+def get_cache_dir(cache_dir: str = '') -> str:
+    '''
+    Get location of the compiled graphs.
+    '''
+    if cache_dir:
+        return cache_dir
+    cache_dir = os.getenv('XDG_CACHE_HOME',
+                          os.path.join(os.path.expanduser('~'), '.cache'))
+    return os.path.join(cache_dir, 'FCCAnalyses', 'aot')
+
+
+# _____________________________________________________________________________
+def get_declaration(key: str) -> str:
+    '''
+    Get declaration of the function booking the compiled graph.
+    '''
+    return (f'namespace FCCAnalysesAOT_{key} {{\n'
+            f'ROOT::RDF::RNode apply(ROOT::RDF::RNode node);\n'
+            f'}}\n')
+
+
+# _____________________________________________________________________________
+def load_compiled_graph(key: str, cache_dir: str) -> bool:
+    '''
+    Load the compiled graph from the cache, if present.
+    '''
+    library_path = os.path.join(cache_dir, key, 'libFCCAnalysesAOT.so')
+    if not os.path.isfile(library_path):
+        return False
+    if ROOT.gSystem.Load(library_path) < 0:
+        LOGGER.warning('Compiled graph can\'t be loaded:\n%s', library_path)
+        return False
+    ROOT.gInterpreter.Declare(get_declaration(key))
+    LOGGER.info('Loaded compiled graph:\n%s', library_path)
+
+    return True
+
+
+# _____________________________________________________________________________
+def get_lambda(kind: str, expression: str, columns: list[str],
+               types: list[str]) -> str:
+    '''
+    Get C++ lambda evaluating the expression from the columns.
+    '''
+    params = {column: f'var{i}' for i, column in enumerate(columns)}
+    body = expression
+    if params:
+        body = get_column_pattern(params).sub(
+            lambda match: params[match.group(1)], expression)
+    # Expressions with return are function bodies, as in RDataFrame
+    if not re.search(r'\breturn\b', body):
+        body = f'return {body}\n;'
+    args = ', '.join(f'const {t} &{params[c]}'
+                     for c, t in zip(columns, types))
+    result = ' -> bool' if kind == 'Filter' else ''
+
+    return f'[]({args}){result} {{\n    {body}\n  }}'
+
+
+# _____________________________________________________________________________
+def book_and_generate(dframe, operations: list[tuple], headers: list[str],
+                      key: str) -> tuple:
+    '''
+    Book the operations with jitted expressions and generate C++ source of
+    the function booking the same graph with typed lambdas. The column types
+    are taken from the jitted graph.
+    '''
+    source = '// Generated by FCCAnalyses, do not edit\n'
+    source += '#include "ROOT/RDataFrame.hxx"\n'
+    for header in headers:
+        source += f'#include "{header}"\n'
+    source += f'\nnamespace FCCAnalysesAOT_{key} {{\n'
+    source += 'using namespace ROOT::VecOps;\n'
+    source += 'using namespace FCCAnalyses;\n\n'
+    source += 'ROOT::RDF::RNode apply(ROOT::RDF::RNode node) {\n'
+
+    available = set(str(c) for c in dframe.GetColumnNames())
+    available |= set(SPECIAL_COLUMNS)
+    for kind, name, expression in operations:
+        if kind == 'Alias':
+            dframe = dframe.Alias(name, expression)
+            source += f'  node = node.Alias({json.dumps(name)}, '
+            source += f'{json.dumps(expression)});\n'
+            available.add(name)
+            continue
+        columns = sorted(set(get_column_pattern(available).findall(
+            expression)))
+        types = [str(dframe.GetColumnType(c)) for c in columns]
+        code = get_lambda(kind, expression, columns, types)
+        column_list = '{' + ', '.join(json.dumps(c) for c in columns) + '}'
+        if kind == 'Filter':
+            dframe = dframe.Filter(expression, name)
+            source += f'  node = node.Filter({code}, {column_list}, '
+            source += f'{json.dumps(name)});\n'
+        else:
+            dframe = getattr(dframe, kind)(name, expression)
+            source += f'  node = node.{kind}({json.dumps(name)}, {code}, '
+            source += f'{column_list});\n'
+            available.add(name)
+    source += '  return node;\n}\n\n}\n'
+
+    return dframe, source
+
+
+# _____________________________________________________________________________
+def compile_graph(source: str, key: str, cache_dir: str,
+                  include_dirs: list[str]) -> bool:
+    '''
+    Compile the source of the graph into a shared library in the cache. The
+    library is moved into place only when complete, concurrent jobs compiling
+    the same graph keep the first one.
+    '''
+    os.makedirs(cache_dir, exist_ok=True)
+    build_dir = tempfile.mkdtemp(prefix=f'.{key}_', dir=cache_dir)
+    try:
+        source_path = os.path.join(build_dir, 'graph.cxx')
+        with open(source_path, 'w', encoding='utf-8') as source_file:
+            source_file.write(source)
+        with open(os.path.join(build_dir, 'graph.h'), 'w',
+                  encoding='utf-8') as header_file:
+            header_file.write(get_declaration(key))
+
+        cmd = [subprocess.getoutput('root-config --cxx').strip(),
+               '-O2', '-fPIC', '-shared']
+        cmd += subprocess.getoutput('root-config --cflags').split()
+        cmd += [f'-I{d}' for d in include_dirs]
+        cmd += [source_path, '-o',
+                os.path.join(build_dir, 'libFCCAnalysesAOT.so')]
+        cmd += subprocess.getoutput('root-config --libs').split()
+        if sys.platform == 'darwin':
+            # Analyzers are resolved from the already loaded library
+            cmd += ['-undefined', 'dynamic_lookup']
+        LOGGER.info('Compiling the graph ahead-of-time...')
+        LOGGER.debug('Compilation command:\n%s', ' '.join(cmd))
+        result = subprocess.run(cmd, stdout=subprocess.PIPE,
+                                stderr=subprocess.STDOUT,
+                                universal_newlines=True, check=False)
+        if result.returncode != 0:
+            LOGGER.warning('Compilation of the graph failed, the graph will '
+                           'be jitted:\n%s', result.stdout)
+            return False
+
+        try:
+            os.rename(build_dir, os.path.join(cache_dir, key))
+        except OSError:
+            LOGGER.debug('Graph compiled concurrently by another job')
+    finally:
+        shutil.rmtree(build_dir, ignore_errors=True)
+
+    LOGGER.info('Compiled graph stored in:\n%s', os.path.join(cache_dir, key))
+    return True
+
+
+# _____________________________________________________________________________
+def get_include_dirs() -> list[str]:
+    '''
+    Get include directories of ROOT, FCCAnalyses and its dependencies.
+    '''
+    return [d for d in os.getenv('ROOT_INCLUDE_PATH', '').split(':') if d]
+
+
+# _____________________________________________________________________________
+def get_analyzer_headers(include_dirs: list[str]) -> list[str]:
+    '''
+    Get headers of the FCCAnalyses analyzers, without the ones from the
+    analyzer libraries which were not loaded.
+    '''
+    not_loaded = {header
+                  for namespace, (_, headers) in ANALYZER_LIBRARIES.items()
+                  if namespace not in LOADED_NAMESPACES
+                  for header in headers}
+    for include_dir in include_dirs:
+        headers = sorted(glob.glob(os.path.join(include_dir, 'FCCAnalyses',
+                                                '*.h')))
+        if headers:
+            return [h for h in headers
+                    if os.path.relpath(h, include_dir) not in not_loaded]
+
+    return []
+
+
+# _____________________________________________________________________________
+def book_compiled_graph(dframe, analysers, include_paths: list[str],
+                        cache_dir: str = ''):
+    '''
+    Book the graph of the analysers from the compiled library. On the first
+    run, the graph is jitted and compiled into the cache for the next runs.
+    Falls back to the jitted graph if the analysers can't be compiled.
+    '''
+    operations = record_operations(analysers)
+    if operations is None:
+        return analysers(dframe)
+
+    include_dirs = get_include_dirs()
+    headers = get_analyzer_headers(include_dirs) + include_paths
+    input_columns = [str(c) for c in dframe.GetColumnNames()]
+    input_types = {c: str(dframe.GetColumnType(c))
+                   for c in get_used_columns(operations, input_columns)}
+    key = get_cache_key(operations, input_types, headers)
+    cache_dir = get_cache_dir(cache_dir)
+
+    if load_compiled_graph(key, cache_dir):
+        return getattr(ROOT, f'FCCAnalysesAOT_{key}').apply(
+            ROOT.RDF.AsRNode(dframe))
+
+    dframe, source = book_and_generate(dframe, operations, headers, key)
+    compile_graph(source, key, cache_dir, include_dirs)
+
+    return dframe
@@ -0,0 +1,30 @@
+# generated with `stubgen aot.py`
+
+import logging
+import re
+
+LOGGER: logging.Logger
+SPECIAL_COLUMNS: tuple[str, ...]
+
+class RecordedNode:
+    operations: list[tuple]
+    def __init__(self) -> None: ...
+    def Define(self, name, expression, *args): ...
+    def Redefine(self, name, expression, *args): ...
+    def Filter(self, expression, name: str = '', *args): ...
+    def Alias(self, alias, column): ...
+    def record(self, kind: str, name, expression, args: tuple): ...
+
+def record_operations(analysers) -> list[tuple] | None: ...
+def get_column_pattern(columns) -> re.Pattern: ...
+def get_used_columns(operations: list[tuple], input_columns: list[str]) -> list[str]: ...
+def get_cache_key(operations: list[tuple], input_types: dict[str, str], headers: list[str]) -> str: ...
+def get_cache_dir(cache_dir: str = '') -> str: ...
+def get_declaration(key: str) -> str: ...
+def load_compiled_graph(key: str, cache_dir: str) -> bool: ...
+def get_lambda(kind: str, expression: str, columns: list[str], types: list[str]) -> str: ...
+def book_and_generate(dframe, operations: list[tuple], headers: list[str], key: str) -> tuple: ...
+def compile_graph(source: str, key: str, cache_dir: str, include_dirs: list[str]) -> bool: ...
+def get_include_dirs() -> list[str]: ...
+def get_analyzer_headers(include_dirs: list[str]) -> list[str]: ...
+def book_compiled_graph(dframe, analysers, include_paths: list[str], cache_dir: str = ''): ...
@@ -0,0 +1,113 @@
+'''
+Automatic choice of the number of threads and of the granularity of the tasks
+of the event loop.
+
+The number of threads is limited by the number of clusters in the input, and
+by the amount of work per thread, which should not be shorter than the setup
+of the event loop measured in the single-threaded calibration.
+'''
+
+import logging
+import ROOT  # type: ignore
+
+from process import get_files_metadata
+
+
+ROOT.gROOT.SetBatch(True)
+
+LOGGER: logging.Logger = logging.getLogger('FCCAnalyses.autotune')
+
+# Maximal number of files opened to count the clusters
+CLUSTER_SAMPLE_FILES: int = 10
+# Minimal work per thread, in seconds
+MIN_THREAD_SECONDS: float = 1.
+# Minimal work per task, in seconds
+MIN_TASK_SECONDS: float = 0.5
+# Default tasks per worker hint of the TTreeProcessorMT
+MAX_TASKS_PER_WORKER: int = 10
+
+
+# _____________________________________________________________________________
+def count_clusters(file_path: str) -> tuple[int, int]:
+    '''
+    Get number of entries and clusters of the "events" TTree in the file.
+    '''
+    with ROOT.TFile.Open(file_path, 'READ') as infile:
+        tree = infile.Get('events')
+        if not tree:
+            return 0, 0
+        nentries = tree.GetEntries()
+        nclusters = 0
+        cluster_iter = tree.GetClusterIterator(0)
+        start = cluster_iter.Next()
+        while start < nentries:
+            nclusters += 1
+            start = cluster_iter.Next()
+
+    return nentries, nclusters
+
+
+# _____________________________________________________________________________
+def get_input_stats(file_paths: list[str]) -> dict:
+    '''
+    Get number of entries and estimate number of clusters in the input files,
+    the clusters are counted in the sample of the files.
+    '''
+    nentries = sum(metadata['entries'] or 0
+                   for metadata in get_files_metadata(file_paths))
+
+    step = max(1, len(file_paths) // CLUSTER_SAMPLE_FILES)
+    sample_entries = 0
+    sample_clusters = 0
+    for file_path in file_paths[::step][:CLUSTER_SAMPLE_FILES]:
+        entries, clusters = count_clusters(file_path)
+        sample_entries += entries
+        sample_clusters += clusters
+
+    nclusters = len(file_paths)
+    if sample_entries > 0:
+        nclusters = max(nclusters,
+                        round(nentries * sample_clusters / sample_entries))
+
+    return {'entries': nentries, 'clusters': nclusters}
+
+
+# _____________________________________________________________________________
+def plan_threads(calibration: dict, input_stats: dict,
+                 max_threads: int) -> dict:
+    '''
+    Choose number of threads and tasks per worker hint of the event loop over
+    the input from the single-threaded calibration.
+    '''
+    work = input_stats['entries'] * calibration['event_time']
+    thread_work = max(MIN_THREAD_SECONDS, calibration['setup_time'])
+    nthreads = min(max_threads,
+                   max(1, input_stats['clusters']),
+                   max(1, int(work / thread_work)))
+    tasks_per_worker = min(MAX_TASKS_PER_WORKER,
+                           input_stats['clusters'] // nthreads,
+                           int(work / (nthreads * MIN_TASK_SECONDS)))
+
+    return {'threads': nthreads,
+            'tasks_per_worker': max(1, tasks_per_worker),
+            'predicted_time': calibration['setup_time'] + work / nthreads}
+
+
+# _____________________________________________________________________________
+def log_thread_plan(plan: dict, calibration: dict, input_stats: dict) -> None:
+    '''
+    Log the chosen configuration of the event loop with the measured
+    throughput.
+    '''
+    rate = 0.
+    if calibration['event_time'] > 0.:
+        rate = 1. / calibration['event_time']
+    text = 'Auto-tuned event loop:\n'
+    text += f'\t- input entries:         {input_stats["entries"]:,}\n'
+    text += f'\t- input clusters:        {input_stats["clusters"]:,}\n'
+    text += f'\t- setup time:            {calibration["setup_time"]:.2f} s\n'
+    text += f'\t- events/second/thread:  {rate:,.0f}\n'
+    text += f'\t- threads:               {plan["threads"]}\n'
+    text += f'\t- tasks per worker:      {plan["tasks_per_worker"]}\n'
+    text += f'\t- predicted time:        {plan["predicted_time"]:.1f} s'
+    LOGGER.info(text)
@@ -0,0 +1,14 @@
+# generated with `stubgen autotune.py`
+
+import logging
+
+LOGGER: logging.Logger
+CLUSTER_SAMPLE_FILES: int
+MIN_THREAD_SECONDS: float
+MIN_TASK_SECONDS: float
+MAX_TASKS_PER_WORKER: int
+
+def count_clusters(file_path: str) -> tuple[int, int]: ...
+def get_input_stats(file_paths: list[str]) -> dict: ...
+def plan_threads(calibration: dict, input_stats: dict, max_threads: int) -> dict: ...
+def log_thread_plan(plan: dict, calibration: dict, input_stats: dict) -> None: ...
@@ -0,0 +1,245 @@
+'''
+Batch backends the analysis chunks can be sent to.
+
+Every backend runs the same sub-job scripts, either by submitting them to
+HTCondor or by running them in a pool of local processes.
+'''
+
+import os
+import sys
+import time
+import shutil
+import logging
+import subprocess
+import concurrent.futures
+
+from anascript import get_element
+
+
+LOGGER = logging.getLogger('FCCAnalyses.batch')
+
+# Number of retries of a failed sub-job
+MAX_RETRIES: int = 3
+# Number of CPUs of the sub-jobs when it is chosen automatically
+AUTO_JOB_NCPUS: int = 4
+
+
+# _____________________________________________________________________________
+def get_job_ncpus(rdf_module) -> int:
+    '''
+    Get number of CPUs requested by every sub-job. The automatic choice is
+    done only in the local runs, the sub-jobs run with the fixed default.
+    All threads (-1) are resolved to the CPUs of this machine.
+    '''
+    ncpus = get_element(rdf_module, 'nCPUS')
+    if ncpus == 'auto':
+        return AUTO_JOB_NCPUS
+    if not isinstance(ncpus, int):
+        LOGGER.error('Number of CPUs "%s" not recognized!\nAborting...',
+                     ncpus)
+        sys.exit(3)
+    if ncpus < 1:
+        return os.cpu_count() or 1
+
+    return ncpus
+
+
+# _____________________________________________________________________________
+def determine_os(local_dir: str) -> str | None:
+    '''
+    Determines platform on which FCCAnalyses was compiled
+    '''
+    cmake_config_path = local_dir + '/build/CMakeFiles/CMakeConfigureLog.yaml'
+    if not os.path.isfile(cmake_config_path):
+        LOGGER.warning('CMake configuration file was not found!\n'
+                       'Was FCCAnalyses properly build?')
+        return None
+
+    with open(cmake_config_path, 'r', encoding='utf-8') as cmake_config_file:
+        cmake_config = cmake_config_file.read()
+        if 'centos7' in cmake_config:
+            return 'centos7'
+        if 'almalinux9' in cmake_config:
+            return 'almalinux9'
+
+    return None
+
+
+# _____________________________________________________________________________
+def create_condor_config(log_dir: str,
+                         process_name: str,
+                         build_os: str | None,
+                         rdf_module,
+                         subjob_scripts: list[str]) -> str:
+    '''
+    Creates contents of condor configuration file.
+    '''
+    cfg = 'executable       = $(filename)\n'
+
+    cfg += f'Log              = {log_dir}/condor_job.{process_name}.'
+    cfg += '$(ClusterId).$(ProcId).log\n'
+
+    cfg += f'Output           = {log_dir}/condor_job.{process_name}.'
+    cfg += '$(ClusterId).$(ProcId).out\n'
+
+    cfg += f'Error            = {log_dir}/condor_job.{process_name}.'
+    cfg += '$(ClusterId).$(ProcId).error\n'
+
+    cfg += 'getenv           = False\n'
+
+    cfg += 'environment      = "LS_SUBCWD={log_dir}"\n'  # not sure
+
+    cfg += 'requirements     = ( '
+    if build_os == 'centos7':
+        cfg += '(OpSysAndVer =?= "CentOS7") && '
+    if build_os == 'almalinux9':
+        cfg += '(OpSysAndVer =?= "AlmaLinux9") && '
+    if build_os is None:
+        LOGGER.warning('Submitting jobs to default operating system. There '
+                       'may be compatibility issues.')
+    cfg += '(Machine =!= LastRemoteHost) && (TARGET.has_avx2 =?= True) )\n'
+
+    cfg += 'on_exit_remove   = (ExitBySignal == False) && (ExitCode == 0)\n'
+
+    cfg += 'max_retries      = 3\n'
+
+    cfg += '+JobFlavour      = "%s"\n' % get_element(rdf_module, 'batchQueue')
+
+    cfg += '+AccountingGroup = "%s"\n' % get_element(rdf_module, 'compGroup')
+
+    cfg += 'RequestCpus      = %i\n' % get_job_ncpus(rdf_module)
+
+    cfg += 'queue filename matching files'
+    for script in subjob_scripts:
+        cfg += ' ' + script
+    cfg += '\n'
+
+    return cfg
+
+
+# _____________________________________________________________________________
+def submit_job(cmd: str, max_trials: int) -> bool:
+    '''
+    Submit job to condor, retry `max_trials` times.
+    '''
+    for i in range(max_trials):
+        with subprocess.Popen(cmd, shell=True,
+                              stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+                              universal_newlines=True) as proc:
+            (stdout, stderr) = proc.communicate()
+
+            if proc.returncode == 0 and len(stderr) == 0:
+                LOGGER.info(stdout)
+                LOGGER.info('GOOD SUBMISSION')
+                return True
+
+            LOGGER.warning('Error while submitting, retrying...\n  '
+                           'Trial: %i / %i\n  Error: %s',
+                           i, max_trials, stderr)
+            time.sleep(10)
+
+    LOGGER.error('Failed submitting after: %i trials!', max_trials)
+    return False
+
+
+# _____________________________________________________________________________
+def submit_condor(rdf_module, log_dir: str, process: str,
+                  subjob_scripts: list[str]) -> None:
+    '''
+    Submit sub-job scripts to HTCondor.
+    '''
+    if shutil.which('condor_q') is None:
+        LOGGER.error('HTCondor tools can\'t be found!\nAborting...')
+        sys.exit(3)
+
+    local_dir = os.environ['LOCAL_DIR']
+    condor_config_path = f'{log_dir}/job_desc_{process}.cfg'
+
+    for i in range(3):
+        try:
+            with open(condor_config_path, 'w', encoding='utf-8') as cfgfile:
+                condor_config = create_condor_config(log_dir,
+                                                     process,
+                                                     determine_os(local_dir),
+                                                     rdf_module,
+                                                     subjob_scripts)
+                cfgfile.write(condor_config)
+        except IOError as e:
+            LOGGER.warning('I/O error(%i): %s', e.errno, e.strerror)
+            if i == 2:
+                sys.exit(3)
+        else:
+            break
+        time.sleep(10)
+    subprocess.getstatusoutput(f'chmod 777 {condor_config_path}')
+
+    batch_cmd = f'condor_submit {condor_config_path}'
+    LOGGER.info('Batch command:\n  %s', batch_cmd)
+    success = submit_job(batch_cmd, 10)
+    if not success:
+        sys.exit(3)
+
+
+# _____________________________________________________________________________
+def run_subjob(subjob_script: str, log_dir: str) -> int:
+    '''
+    Run sub-job script locally, retry it up to MAX_RETRIES times. Output of
+    all the attempts is stored in the log file next to the script.
+    '''
+    log_path = os.path.splitext(subjob_script)[0] + '.log'
+    with open(log_path, 'w', encoding='utf-8') as logfile:
+        for attempt in range(MAX_RETRIES + 1):
+            logfile.write(f'{" Attempt " + str(attempt + 1) + " ":=^80}\n')
+            logfile.flush()
+            with subprocess.Popen([subjob_script], cwd=log_dir,
+                                  stdout=logfile,
+                                  stderr=subprocess.STDOUT) as proc:
+                returncode = proc.wait()
+            if returncode == 0:
+                return 0
+            LOGGER.warning('Sub-job failed with exit code %i, attempt '
+                           '%i / %i:\n  %s', returncode, attempt + 1,
+                           MAX_RETRIES + 1, subjob_script)
+
+    return returncode
+
+
+# _____________________________________________________________________________
+def submit_local(rdf_module, log_dir: str, process: str,
+                 subjob_scripts: list[str]) -> None:
+    '''
+    Run sub-job scripts in a pool of local processes. Number of the processes
+    running at the same time is limited by the number of CPUs available to
+    the batch and the number of threads of every sub-job.
+    '''
+    ncpus_job = get_job_ncpus(rdf_module)
+    ncpus_max = get_element(rdf_module, 'batchMaxCPUs')
+    if ncpus_max <= 0:
+        ncpus_max = os.cpu_count() or 1
+    n_workers = max(1, min(ncpus_max // ncpus_job, len(subjob_scripts)))
+    LOGGER.info('Running %i sub-jobs of process "%s" locally in %i '
+                'parallel slot(s)...\nLogs can be found in:\n  %s',
+                len(subjob_scripts), process, n_workers, log_dir)
+
+    with concurrent.futures.ThreadPoolExecutor(n_workers) as executor:
+        futures = {executor.submit(run_subjob, script, log_dir): script
+                   for script in subjob_scripts}
+        failed_jobs = []
+        for future in concurrent.futures.as_completed(futures):
+            script = futures[future]
+            if future.result() != 0:
+                LOGGER.error('Sub-job failed! See the log file:\n  %s',
+                             os.path.splitext(script)[0] + '.log')
+                failed_jobs.append(script)
+            else:
+                LOGGER.debug('Sub-job done:\n  %s', script)
+
+    if failed_jobs:
+        LOGGER.error('%i sub-job(s) of process "%s" failed!\nAborting...',
+                     len(failed_jobs), process)
+        sys.exit(3)
+    LOGGER.info('All sub-jobs of process "%s" done.', process)
+
+
+BATCH_BACKENDS = {'condor': submit_condor,
+                  'local': submit_local}
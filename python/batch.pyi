@@ -0,0 +1,17 @@
+# generated with `stubgen batch.py`
+
+import logging
+
+LOGGER: logging.Logger
+MAX_RETRIES: int
+AUTO_JOB_NCPUS: int
+
+def get_job_ncpus(rdf_module) -> int: ...
+def determine_os(local_dir: str) -> str | None: ...
+def create_condor_config(log_dir: str, process_name: str, build_os: str | None, rdf_module, subjob_scripts: list[str]) -> str: ...
+def submit_job(cmd: str, max_trials: int) -> bool: ...
+def submit_condor(rdf_module, log_dir: str, process: str, subjob_scripts: list[str]) -> None: ...
+def run_subjob(subjob_script: str, log_dir: str) -> int: ...
+def submit_local(rdf_module, log_dir: str, process: str, subjob_scripts: list[str]) -> None: ...
+
+BATCH_BACKENDS: dict
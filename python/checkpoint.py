@@ -0,0 +1,89 @@
+'''
+Checkpoints of the partial results of the histmaker.
+
+The checkpoint is a single ROOT file holding the accumulated histograms, sums
+of weights and event counts of every process together with the list of the
+already processed slices of the input. It is replaced atomically after every
+slice, so it is always consistent with the recorded slices.
+'''
+
+import os
+import json
+import logging
+import ROOT  # type: ignore
+
+
+ROOT.gROOT.SetBatch(True)
+
+LOGGER: logging.Logger = logging.getLogger('FCCAnalyses.checkpoint')
+
+
+# _____________________________________________________________________________
+def load_checkpoint(checkpoint_path: str,
+                    fingerprint: str) -> tuple[set[int], dict[str, dict]]:
+    '''
+    Load processed slices and accumulated results from the checkpoint. The
+    checkpoint is ignored if it was created for different slicing of the
+    input.
+    '''
+    if not os.path.isfile(checkpoint_path):
+        return set(), {}
+
+    with ROOT.TFile(checkpoint_path, 'READ') as infile:
+        state = infile.Get('checkpointState')
+        if not state:
+            LOGGER.warning('Checkpoint file is corrupted, ignoring it:\n%s',
+                           checkpoint_path)
+            return set(), {}
+        state = json.loads(state.GetTitle())
+        if state['fingerprint'] != fingerprint:
+            LOGGER.warning('Checkpoint was created for different input, '
+                           'ignoring it:\n%s', checkpoint_path)
+            return set(), {}
+
+        accumulated = {}
+        for process, content in state['processes'].items():
+            directory = infile.Get(content['directory'])
+            hists = {}
+            for hname in content['hists']:
+                hist = directory.Get(hname).Clone()
+                hist.SetDirectory(0)
+                hists[hname] = hist
+            accumulated[process] = {
+                'hists': hists,
+                'sum_of_weights': content['sum_of_weights'],
+                'nevents': content['nevents']}
+
+    LOGGER.info('Resuming from checkpoint with %i processed slice(s):\n%s',
+                len(state['done']), checkpoint_path)
+
+    return set(state['done']), accumulated
+
+
+# _____________________________________________________________________________
+def save_checkpoint(checkpoint_path: str, fingerprint: str, done: set[int],
+                    accumulated: dict[str, dict]) -> None:
+    '''
+    Save processed slices and accumulated results into the checkpoint.
+    '''
+    state = {'fingerprint': fingerprint,
+             'done': sorted(done),
+             'processes': {}}
+
+    tmp_path = checkpoint_path + '.tmp'
+    with ROOT.TFile(tmp_path, 'RECREATE') as outfile:
+        for i, (process, content) in enumerate(accumulated.items()):
+            directory = outfile.mkdir(f'process{i}')
+            directory.cd()
+            for hist in content['hists'].values():
+                hist.Write()
+            state['processes'][process] = {
+                'directory': f'process{i}',
+                'hists': list(content['hists']),
+                'sum_of_weights': content['sum_of_weights'],
+                'nevents': content['nevents']}
+        outfile.cd()
+        ROOT.TNamed('checkpointState', json.dumps(state)).Write()
+    os.replace(tmp_path, checkpoint_path)
+
+    LOGGER.info('Checkpoint saved after %i slice(s)', len(done))
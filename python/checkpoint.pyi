@@ -0,0 +1,8 @@
+# generated with `stubgen checkpoint.py`
+
+import logging
+
+LOGGER: logging.Logger
+
+def load_checkpoint(checkpoint_path: str, fingerprint: str) -> tuple[set[int], dict[str, dict]]: ...
+def save_checkpoint(checkpoint_path: str, fingerprint: str, done: set[int], accumulated: dict[str, dict]) -> None: ...
@@ -0,0 +1,123 @@
+'''
+Cut-flow engine of the final stage.
+
+All cuts are evaluated once per event and stored into a bit mask column, the
+cut-flows, N-1 selections and cut correlations are derived from it.
+'''
+
+import math
+import logging
+import ROOT  # type: ignore
+
+
+ROOT.gROOT.SetBatch(True)
+
+LOGGER: logging.Logger = logging.getLogger('FCCAnalyses.cutflow')
+
+# Maximal number of cuts which fit into the mask
+N_MAX_CUTS: int = 64
+CUT_MASK_COLUMN: str = '_cut_mask'
+
+
+# _____________________________________________________________________________
+def define_cut_mask(dframe, cut_list: dict[str, str]):
+    '''
+    Define column with the bit mask of the cuts the event passed.
+    '''
+    expression = ' | '.join(
+        f'(static_cast<std::uint64_t>(static_cast<bool>({cut})) << {i})'
+        for i, cut in enumerate(cut_list.values()))
+
+    return dframe.Define(CUT_MASK_COLUMN, expression)
+
+
+# _____________________________________________________________________________
+def filter_cut(dframe, index: int, cut_name: str):
+    '''
+    Select events passing the cut with provided index.
+    '''
+    return dframe.Filter(f'({CUT_MASK_COLUMN} >> {index}) & 1', cut_name)
+
+
+# _____________________________________________________________________________
+def filter_n_minus_one(dframe, index: int, ncuts: int, cut_name: str):
+    '''
+    Select events passing all cuts except the one with provided index.
+    '''
+    return dframe.Filter(
+        f'FCCAnalyses::CutFlow::pass_all_but({CUT_MASK_COLUMN}, '
+        f'{ncuts}, {index})',
+        f'N-1 {cut_name}')
+
+
+# _____________________________________________________________________________
+def book_cut_flow(dframe, cut_list: dict[str, str],
+                  full: bool = True) -> dict:
+    '''
+    Book independent and cumulative cut-flows and the cut overlap matrix.
+    Without full cut-flow, only the independent cut-flow is booked.
+    '''
+    ncuts = len(cut_list)
+    dframe = dframe.Define(
+        '_cut_passed',
+        f'FCCAnalyses::CutFlow::passed({CUT_MASK_COLUMN}, {ncuts})')
+
+    results = {}
+    results['independent'] = dframe.Histo1D(
+        ('cutFlowIndependent', ';;Events', ncuts, 0, ncuts), '_cut_passed')
+    if not full:
+        return results
+
+    dframe = dframe.Define(
+        '_cut_cumulative',
+        f'FCCAnalyses::CutFlow::cumulative({CUT_MASK_COLUMN}, {ncuts})')
+    dframe = dframe.Define(
+        '_cut_pairs_first',
+        f'FCCAnalyses::CutFlow::pairs_first({CUT_MASK_COLUMN}, {ncuts})')
+    dframe = dframe.Define(
+        '_cut_pairs_second',
+        f'FCCAnalyses::CutFlow::pairs_second({CUT_MASK_COLUMN}, {ncuts})')
+
+    results['cumulative'] = dframe.Histo1D(
+        ('cutFlowCumulative', ';;Events', ncuts, 0, ncuts), '_cut_cumulative')
+    results['overlap'] = dframe.Histo2D(
+        ('cutOverlap', ';;;Events', ncuts, 0, ncuts, ncuts, 0, ncuts),
+        '_cut_pairs_first', '_cut_pairs_second')
+
+    return results
+
+
+# _____________________________________________________________________________
+def get_cut_correlation(overlap, nevents: int):
+    '''
+    Calculate correlation coefficients of the cuts from the cut overlap
+    matrix.
+    '''
+    ncuts = overlap.GetNbinsX()
+    correlation = ROOT.TH2D('cutCorrelation', '', ncuts, 0, ncuts,
+                            ncuts, 0, ncuts)
+    correlation.SetDirectory(0)
+    for i in range(1, ncuts + 1):
+        for j in range(1, ncuts + 1):
+            n_i = overlap.GetBinContent(i, i)
+            n_j = overlap.GetBinContent(j, j)
+            n_ij = overlap.GetBinContent(i, j)
+            denominator = n_i * (nevents - n_i) * n_j * (nevents - n_j)
+            if denominator <= 0:
+                continue
+            correlation.SetBinContent(
+                i, j, (nevents * n_ij - n_i * n_j) / math.sqrt(denominator))
+
+    return correlation
+
+
+# _____________________________________________________________________________
+def label_cut_flow(hists: list, cut_names: list[str]) -> None:
+    '''
+    Label bins of the cut-flow histograms with the cut names.
+    '''
+    for hist in hists:
+        for i, cut_name in enumerate(cut_names):
+            hist.GetXaxis().SetBinLabel(i + 1, cut_name)
+            if hist.GetDimension() > 1:
+                hist.GetYaxis().SetBinLabel(i + 1, cut_name)
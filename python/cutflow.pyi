@@ -0,0 +1,14 @@
+# generated with `stubgen cutflow.py`
+
+import logging
+
+LOGGER: logging.Logger
+N_MAX_CUTS: int
+CUT_MASK_COLUMN: str
+
+def define_cut_mask(dframe, cut_list: dict[str, str]): ...
+def filter_cut(dframe, index: int, cut_name: str): ...
+def filter_n_minus_one(dframe, index: int, ncuts: int, cut_name: str): ...
+def book_cut_flow(dframe, cut_list: dict[str, str], full: bool = True) -> dict: ...
+def get_cut_correlation(overlap, nevents: int): ...
+def label_cut_flow(hists: list, cut_names: list[str]) -> None: ...
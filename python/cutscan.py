@@ -0,0 +1,151 @@
+'''
+Cut-threshold scan of the final stage.
+
+Each event is placed into one bin of a histogram indexed by the number of
+thresholds it passes in every scanned variable. The yields for all points of
+the threshold grid are then obtained as cumulative sums of this histogram, so
+the whole grid is filled in one event loop.
+'''
+
+import math
+import logging
+import itertools
+import sys
+import ROOT  # type: ignore
+
+
+ROOT.gROOT.SetBatch(True)
+
+LOGGER: logging.Logger = logging.getLogger('FCCAnalyses.cutscan')
+
+SCAN_INDEX_COLUMN: str = '_cut_scan_index'
+
+
+# _____________________________________________________________________________
+def get_scan_grid(cut_scan: dict) -> list[tuple[str, str, list[float]]]:
+    '''
+    Get list of the scanned variables with the cut direction and sorted
+    thresholds. The thresholds are sorted so that the events passing a
+    threshold pass also all preceding ones.
+    '''
+    grid = []
+    for variable, config in cut_scan.items():
+        direction = '>'
+        thresholds = config
+        if isinstance(config, dict):
+            direction = config.get('direction', '>')
+            thresholds = config.get('thresholds', [])
+        if direction not in ('>', '<'):
+            LOGGER.error('Unknown direction "%s" of the scanned variable '
+                         '"%s"!\nAborting...', direction, variable)
+            sys.exit(3)
+        if len(thresholds) == 0:
+            LOGGER.error('No thresholds provided for the scanned variable '
+                         '"%s"!\nAborting...', variable)
+            sys.exit(3)
+        grid.append((variable, direction,
+                     sorted(thresholds, reverse=direction == '<')))
+
+    return grid
+
+
+# _____________________________________________________________________________
+def book_cut_scan(dframe, grid: list[tuple[str, str, list[float]]]):
+    '''
+    Book histogram of the number of passed thresholds in all scanned
+    variables.
+    '''
+    index = '0'
+    for i, (variable, direction, thresholds) in enumerate(grid):
+        column = f'_cut_scan_var{i}'
+        dframe = dframe.Define(column, f'static_cast<double>({variable})')
+        npassed = ' + '.join(f'int({column} {direction} {threshold})'
+                             for threshold in thresholds)
+        index = f'({index}) * {len(thresholds) + 1} + {npassed}'
+    dframe = dframe.Define(SCAN_INDEX_COLUMN, index)
+
+    nbins = math.prod(len(thresholds) + 1 for _, _, thresholds in grid)
+
+    return dframe.Histo1D(('cutScan', ';;Events', nbins, 0, nbins),
+                          SCAN_INDEX_COLUMN)
+
+
+# _____________________________________________________________________________
+def get_scan_yields(hist, grid: list[tuple[str, str, list[float]]]) \
+        -> list[float]:
+    '''
+    Get yields for all points of the threshold grid. The points are ordered
+    as in itertools.product of the thresholds.
+    '''
+    shape = [len(thresholds) + 1 for _, _, thresholds in grid]
+    counts = [hist.GetBinContent(i + 1) for i in range(math.prod(shape))]
+
+    # Cumulative sums from above along each of the variables
+    stride = 1
+    for size in reversed(shape):
+        for i in reversed(range(len(counts))):
+            if (i // stride) % size < size - 1:
+                counts[i] += counts[i + stride]
+        stride *= size
+
+    # Event passes threshold j if it passes at least j + 1 thresholds
+    yields = []
+    for point in itertools.product(*(range(1, size) for size in shape)):
+        i = 0
+        for size, npassed in zip(shape, point):
+            i = i * size + npassed
+        yields.append(counts[i])
+
+    return yields
+
+
+# _____________________________________________________________________________
+def get_significance(signal: float, background: float) -> tuple[float, float]:
+    '''
+    Get S/sqrt(B) and the Asimov significance. Points without background are
+    assigned zero significance.
+    '''
+    if background <= 0.:
+        return 0., 0.
+
+    s_over_sqrt_b = signal / math.sqrt(background)
+    asimov = math.sqrt(2. * ((signal + background) *
+                             math.log(1. + signal / background) - signal))
+
+    return s_over_sqrt_b, asimov
+
+
+# _____________________________________________________________________________
+def write_cut_scan(path: str, grid: list[tuple[str, str, list[float]]],
+                   signal: list[float], background: list[float]) -> None:
+    '''
+    Write table of signal and background yields and significances for all
+    points of the threshold grid, ordered by the Asimov significance.
+    '''
+    rows = []
+    for point, sig, bkg in zip(
+            itertools.product(*(thresholds for _, _, thresholds in grid)),
+            signal, background):
+        rows.append((point, sig, bkg, *get_significance(sig, bkg)))
+    rows.sort(key=lambda row: row[4], reverse=True)
+
+    header = [f'{variable} {direction}' for variable, direction, _ in grid]
+    header += ['S', 'B', 'S/sqrt(B)', 'Z_Asimov']
+    width = max(12, *(len(column) for column in header))
+    with open(path, 'w', encoding='utf-8') as outfile:
+        outfile.write(' '.join(f'{column:>{width}}' for column in header))
+        outfile.write('\n')
+        for point, *values in rows:
+            outfile.write(' '.join(f'{threshold:>{width}g}'
+                                   for threshold in point))
+            outfile.write(' ')
+            outfile.write(' '.join(f'{value:>{width}.4e}'
+                                   for value in values))
+            outfile.write('\n')
+
+    if rows:
+        best = ', '.join(f'{column} {threshold:g}'
+                         for column, threshold in zip(header, rows[0][0]))
+        LOGGER.info('Best point of the cut scan: %s\n\tS = %.4e, B = %.4e, '
+                    'Z_Asimov = %.3f', best, rows[0][1], rows[0][2],
+                    rows[0][4])
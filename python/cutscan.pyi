@@ -0,0 +1,12 @@
+# generated with `stubgen cutscan.py`
+
+import logging
+
+LOGGER: logging.Logger
+SCAN_INDEX_COLUMN: str
+
+def get_scan_grid(cut_scan: dict) -> list[tuple[str, str, list[float]]]: ...
+def book_cut_scan(dframe, grid: list[tuple[str, str, list[float]]]): ...
+def get_scan_yields(hist, grid: list[tuple[str, str, list[float]]]) -> list[float]: ...
+def get_significance(signal: float, background: float) -> tuple[float, float]: ...
+def write_cut_scan(path: str, grid: list[tuple[str, str, list[float]]], signal: list[float], background: list[float]) -> None: ...
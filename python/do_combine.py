@@ -36,6 +36,29 @@ def rebin(h, newbins):
         mybins = array.array('d', newbins)
         return h.Rebin(len(mybins)-1, h.GetName(), mybins)
 
+def get_hist(inputDir, procList, sel, hist_name):
+    hist = None
+    for proc in procList:
+        if sel == -1:
+            fInName = f"{inputDir}/{proc}.root"
+        else:
+            fInName = f"{inputDir}/{proc}_{sel}_histo.root"
+        if not os.path.isfile(fInName):
+            LOGGER.error(f'File {fInName} not found! Aborting...')
+            sys.exit(3)
+        fIn = ROOT.TFile(fInName, 'READ')
+        h = fIn.Get(hist_name)
+        if not h:
+            LOGGER.error(f'Histogram {hist_name} not found in {fInName}! '
+                         'Aborting...')
+            sys.exit(3)
+        h = copy.deepcopy(h)
+        if hist == None:
+            hist = h
+        else:
+            hist.Add(h)
+    return hist
+
 def run(script_path):
 
     ROOT.gROOT.SetBatch(True)
@@ -94,6 +117,7 @@ def run(script_path):
 
     ## systematic uncertainties
     systs = get_param(param, "systs")
+    shape_systs = {} # process name -> shape systematics applied to it
     for systName, syst in systs.items():
         syst_type = syst['type']
         syst_val = str(syst['value'])
@@ -103,11 +127,11 @@ def run(script_path):
             for proc in procs:
                 apply_proc = (isinstance(procs_to_apply, list) and proc in procs_to_apply) or (isinstance(procs_to_apply, str) and re.search(procs_to_apply, proc))
                 if apply_proc:
-                    if syst_type == "shape":
-                        LOGGER.warning('Shape uncertainties not yet supported! Skipping')
-                        val = "-"
-                    else:
-                        val = str(syst_val)
+                    # shape variations are taken from the histograms with
+                    # suffix _<systName>Up and _<systName>Down
+                    if syst_type == "shape" and systName not in shape_systs.setdefault(proc, []):
+                        shape_systs[proc].append(systName)
+                    val = str(syst_val)
                 else:
                     val = "-"
                 dc_tmp += f"{val:{' '}{'<'}{lspace}}"
@@ -125,21 +149,14 @@ def run(script_path):
     hists_asimov = {}
     for procName, procList in proc_dict.items():
         for i,cat in enumerate(categories):
-            hist = None
-            for proc in procList:
-                if sel == -1:
-                    fInName = f"{inputDir}/{proc}.root"
-                else:
-                    fInName = f"{inputDir}/{proc}_{sel}_histo.root"
-                if not os.path.isfile(fInName):
-                    LOGGER.error(f'File {fInName} not found! Aborting...')
-                    sys.exit(3)
-                fIn = ROOT.TFile(fInName, 'READ')
-                h = copy.deepcopy(fIn.Get(hist_names[i]))
-                if hist == None:
-                    hist = h
-                else:
-                    hist.Add(h)
+            for systName in shape_systs.get(procName, []):
+                for direction in ["Up", "Down"]:
+                    hist = get_hist(inputDir, procList, sel, f"{hist_names[i]}_{systName}{direction}")
+                    hist.SetName(f"{cat}_{procName}_{systName}{direction}")
+                    hist.Scale(intLumi)
+                    hist = rebin(hist, new_bins)
+                    hists.append(copy.deepcopy(hist))
+            hist = get_hist(inputDir, procList, sel, hist_names[i])
             hist.SetName(f"{cat}_{procName}")
             hist.Scale(intLumi)
             hist = rebin(hist, new_bins)
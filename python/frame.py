@@ -7,17 +7,117 @@ import pathlib
 import shutil
 import logging
 import ROOT  # type: ignore
+from profiler import PROFILED_NODES, get_node, save_timing_graph
 
 
 ROOT.gROOT.SetBatch(True)
 
 LOGGER: logging.Logger = logging.getLogger('FCCAnalyses.frame')
 
+# Event weight column with the bootstrap replicas as variations
+BOOTSTRAP_COLUMN: str = 'bootstrap_weight'
+
+# Names of the variations registered with the helpers below
+REGISTERED_VARIATIONS: list[str] = []
+
 
 # _____________________________________________________________________________
-def generate_graph(dframe, args, suffix: str | None = None) -> None:
+def create_dataframe(input_list,
+                     entry_range: tuple[int, int] | None = None):
     '''
-    Generate computational graph of the analysis
+    Create RDataFrame over the "events" TTree in the input files, optionally
+    restricted to the range of entries (global within the input files).
+    '''
+    if entry_range is None:
+        return ROOT.RDataFrame("events", input_list)
+
+    LOGGER.info('Processing entries [%s, %s) of the input files',
+                f'{entry_range[0]:,}', f'{entry_range[1]:,}')
+    spec = ROOT.RDF.Experimental.RDatasetSpec()
+    spec.AddSample(ROOT.RDF.Experimental.RSample("events", "events",
+                                                 input_list))
+    spec.WithGlobalRange(ROOT.RDF.Experimental.RDatasetSpec.REntryRange(
+        entry_range[0], entry_range[1]))
+
+    return ROOT.RDataFrame(spec)
+
+
+# _____________________________________________________________________________
+def vary_column(dframe, column: str, variation_name: str,
+                variations: dict[str, str]):
+    '''
+    Register systematic variations of the column, which can be also the event
+    weight or a selection threshold. The dictionary maps the variation tags
+    (e.g. "up", "down") to the C++ expressions of the varied values.
+    '''
+    expression = f'ROOT::RVec<std::decay_t<decltype({column})>>{{'
+    expression += ', '.join(f'({expr})' for expr in variations.values())
+    expression += '}'
+    REGISTERED_VARIATIONS.append(variation_name)
+
+    return dframe.Vary(column, expression, list(variations), variation_name)
+
+
+# _____________________________________________________________________________
+def get_variation_suffix(variation_key: str) -> str:
+    '''
+    Get suffix of the histogram name from the RDataFrame variation key, e.g.
+    "muon_scale:up" becomes "_muon_scaleUp".
+    '''
+    if variation_key == 'nominal':
+        return ''
+    variation_name, tag = variation_key.split(':', 1)
+    return f'_{variation_name}{tag[:1].upper()}{tag[1:]}'
+
+
+# _____________________________________________________________________________
+def get_variations(result) -> dict:
+    '''
+    Get values of the result by the variation key, the result without
+    variations has only the nominal one.
+    '''
+    if not hasattr(result, 'GetKeys'):
+        return {'nominal': result.GetValue()}
+
+    return {key: result[key] for key in result.GetKeys()}
+
+
+# _____________________________________________________________________________
+def define_bootstrap(dframe, nreplicas: int, seed: int = 0,
+                     offsets: list[int] | None = None):
+    '''
+    Define event weight column "bootstrap_weight" with Poisson(1) bootstrap
+    replicas registered as its variations. Histograms weighted by it, or by
+    any column derived from it, are filled for all replicas in the same event
+    loop. The offsets of the input files within the chain are needed when
+    the entry numbers of the event loop are global in the chain.
+    '''
+    # Replicas of the event are keyed by its entry number within the file
+    offsets_expr = ', '.join(f'{offset}ull' for offset in offsets or [])
+    dframe = dframe.DefinePerSample(
+        '_bootstrap_offset',
+        'FCCAnalyses::Bootstrap::offset(rdfsampleinfo_, '
+        f'std::vector<ULong64_t>{{{offsets_expr}}})')
+    # The entry number needs to be evaluated for every event, the filter
+    # always passes
+    dframe = dframe.Define('_bootstrap_entry',
+                           'FCCAnalyses::Bootstrap::entry(rdfsampleinfo_) - '
+                           '_bootstrap_offset')
+    dframe = dframe.Filter('_bootstrap_entry >= 0')
+    dframe = dframe.Define(BOOTSTRAP_COLUMN, '1.')
+
+    expression = 'FCCAnalyses::Bootstrap::weights('
+    expression += 'FCCAnalyses::Bootstrap::key(rdfsampleinfo_, '
+    expression += f'_bootstrap_entry, {seed}), {nreplicas})'
+    REGISTERED_VARIATIONS.append('bootstrap')
+
+    return dframe.Vary(BOOTSTRAP_COLUMN, expression, nreplicas, 'bootstrap')
+
+
+# _____________________________________________________________________________
+def get_graph_path(args, suffix: str | None = None) -> pathlib.PurePath:
+    '''
+    Get path of the computational graph of the analysis
     '''
     # Check if output file path is provided
     graph_path: pathlib.PurePath = pathlib.PurePath(args.graph_path)
@@ -36,18 +136,14 @@ def generate_graph(dframe, args, suffix: str | None = None) -> None:
                                           suffix +
                                           graph_path.suffix)  # extension
 
-    # Announce to which files graph will be saved
-    if shutil.which('dot') is None:
-        LOGGER.info('Analysis computational graph will be saved into:\n - %s',
-                    graph_path.with_suffix('.dot'))
-    else:
-        LOGGER.info('Analysis computational graph will be saved into:\n - %s\n - %s',
-                    graph_path.with_suffix('.dot'),
-                    graph_path.with_suffix('.png'))
+    return graph_path
 
-    # Generate graph in .dot format
-    ROOT.RDF.SaveGraph(dframe, str(graph_path.with_suffix('.dot')))
 
+# _____________________________________________________________________________
+def convert_graph(graph_path: pathlib.PurePath) -> None:
+    '''
+    Convert graph in .dot format into .png
+    '''
     if shutil.which('dot') is None:
         LOGGER.warning('PNG version of the computational graph will not be '
                        'generated.\nGraphviz library not found!')
@@ -56,3 +152,51 @@ def generate_graph(dframe, args, suffix: str | None = None) -> None:
     # Convert .dot file into .png
     os.system(f'dot -Tpng {graph_path.with_suffix(".dot")} '
               f'-o {graph_path.with_suffix(".png")}')
+
+
+# _____________________________________________________________________________
+def announce_graph(graph_path: pathlib.PurePath, what: str) -> None:
+    '''
+    Announce to which files graph will be saved
+    '''
+    if shutil.which('dot') is None:
+        LOGGER.info('%s will be saved into:\n - %s', what,
+                    graph_path.with_suffix('.dot'))
+    else:
+        LOGGER.info('%s will be saved into:\n - %s\n - %s', what,
+                    graph_path.with_suffix('.dot'),
+                    graph_path.with_suffix('.png'))
+
+
+# _____________________________________________________________________________
+def generate_graph(dframe, args, suffix: str | None = None) -> None:
+    '''
+    Generate computational graph of the analysis
+    '''
+    graph_path = get_graph_path(args, suffix)
+    announce_graph(graph_path, 'Analysis computational graph')
+
+    # Generate graph in .dot format
+    ROOT.RDF.SaveGraph(get_node(dframe), str(graph_path.with_suffix('.dot')))
+
+    convert_graph(graph_path)
+
+
+# _____________________________________________________________________________
+def generate_timing_graph(args) -> None:
+    '''
+    Generate computational graph of the analysis annotated with the timings
+    measured by the profiler, needs to be called after the event loop
+    '''
+    if not PROFILED_NODES:
+        LOGGER.warning('No profiled nodes found, graph with timings will not '
+                       'be generated!')
+        return
+
+    graph_path = get_graph_path(args, '_timing')
+    announce_graph(graph_path, 'Computational graph with timings')
+
+    # Generate graph in .dot format
+    save_timing_graph(str(graph_path.with_suffix('.dot')))
+
+    convert_graph(graph_path)
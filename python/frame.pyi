@@ -1,7 +1,19 @@
 # generated with `stubgen frame.py`
 
 import logging
+import pathlib
 
 LOGGER: logging.Logger
+BOOTSTRAP_COLUMN: str
+REGISTERED_VARIATIONS: list[str]
 
+def create_dataframe(input_list, entry_range: tuple[int, int] | None = None): ...
+def vary_column(dframe, column: str, variation_name: str, variations: dict[str, str]): ...
+def get_variation_suffix(variation_key: str) -> str: ...
+def get_variations(result) -> dict: ...
+def define_bootstrap(dframe, nreplicas: int, seed: int = 0, offsets: list[int] | None = None): ...
+def get_graph_path(args, suffix: str | None = None) -> pathlib.PurePath: ...
+def convert_graph(graph_path: pathlib.PurePath) -> None: ...
+def announce_graph(graph_path: pathlib.PurePath, what: str) -> None: ...
 def generate_graph(dframe, args, suffix: str | None = None) -> None: ...
+def generate_timing_graph(args) -> None: ...
@@ -0,0 +1,124 @@
+'''
+On-demand loading of the analyzer libraries with heavy dependencies.
+
+The analyzers depending on ONNXRuntime, ACTS or DD4hep, and the add-on helpers
+not needed by the core analyzers, are built into separate libraries. The
+registry maps their namespaces to the libraries and headers, which are loaded
+only when the analysis references the namespace.
+'''
+
+import os
+import re
+import sys
+import logging
+import ROOT  # type: ignore
+
+
+ROOT.gROOT.SetBatch(True)
+
+LOGGER: logging.Logger = logging.getLogger('FCCAnalyses.libraries')
+
+# Namespaces of the analyzers with the library and headers providing them
+ANALYZER_LIBRARIES: dict[str, tuple[str, tuple[str, ...]]] = {
+    'JetFlavourUtils': ('libFCCAnalysesONNX',
+                        ('FCCAnalyses/JetFlavourUtils.h',)),
+    'WeaverUtils': ('libFCCAnalysesONNX',
+                    ('FCCAnalyses/WeaverUtils.h',)),
+    'VertexFitterActs': ('libFCCAnalysesActs',
+                         ('FCCAnalyses/VertexFitterActs.h',)),
+    'VertexFinderActs': ('libFCCAnalysesActs',
+                         ('FCCAnalyses/VertexFinderActs.h',)),
+    'CaloNtupleizer': ('libFCCAnalysesDD4hep',
+                       ('FCCAnalyses/CaloNtupleizer.h',)),
+    'tmva_helper_xgb': ('libTMVAHelper',
+                        ('TMVAHelper/TMVAHelper.h',)),
+}
+
+# Namespaces already loaded
+LOADED_NAMESPACES: set[str] = set()
+
+
+# Comments of the analysis scripts and of the C++ headers
+PYTHON_COMMENT_PATTERN: re.Pattern = re.compile(r'#[^\n]*')
+CPP_COMMENT_PATTERN: re.Pattern = re.compile(r'//[^\n]*|/\*.*?\*/', re.DOTALL)
+
+
+# _____________________________________________________________________________
+def load_analyzers(namespace: str, required: bool = True) -> None:
+    '''
+    Load library and headers of the analyzers in the namespace, if not loaded
+    already. If the library is not required, only warn when it is missing.
+    '''
+    if namespace in LOADED_NAMESPACES:
+        return
+    if namespace not in ANALYZER_LIBRARIES:
+        LOGGER.error('Analyzers namespace "%s" not known!\nAborting...',
+                     namespace)
+        sys.exit(3)
+
+    library, headers = ANALYZER_LIBRARIES[namespace]
+    LOGGER.info('Loading %s analyzers from %s...', namespace, library)
+    if not required and not ROOT.gSystem.DynamicPathName(library, True):
+        LOGGER.warning('Library %s not found, the %s analyzers won\'t be '
+                       'available!', library, namespace)
+        return
+    if ROOT.gSystem.Load(library) < 0:
+        LOGGER.error('Library %s not found, was FCCAnalyses built with its '
+                     'dependencies?\nAborting...', library)
+        sys.exit(3)
+    for header in headers:
+        if not ROOT.gInterpreter.Declare(f'#include "{header}"'):
+            LOGGER.error('Header %s can\'t be loaded!\nAborting...', header)
+            sys.exit(3)
+    LOADED_NAMESPACES.add(namespace)
+
+
+# _____________________________________________________________________________
+def get_referenced_namespaces(text: str) -> list[str]:
+    '''
+    Get namespaces from the registry referenced in the text.
+    '''
+    pattern = re.compile(r'\b(' + '|'.join(ANALYZER_LIBRARIES) + r')\b')
+
+    return sorted(set(pattern.findall(text)))
+
+
+# _____________________________________________________________________________
+def strip_comments(text: str, path: str) -> str:
+    '''
+    Remove comments from the Python script or from the C++ header.
+    '''
+    if path.endswith('.py'):
+        return PYTHON_COMMENT_PATTERN.sub('', text)
+
+    return CPP_COMMENT_PATTERN.sub('', text)
+
+
+# _____________________________________________________________________________
+def load_referenced_analyzers(paths: list[str]) -> None:
+    '''
+    Load analyzers referenced in the analysis script or in the custom header
+    files. Missing libraries are only reported, the analysis fails later if
+    it really uses them.
+    '''
+    for path in paths:
+        if not os.path.isfile(path):
+            continue
+        with open(path, 'r', encoding='utf-8', errors='replace') as infile:
+            namespaces = get_referenced_namespaces(
+                strip_comments(infile.read(), path))
+        for namespace in namespaces:
+            LOGGER.debug('Namespace %s referenced in:\n%s', namespace, path)
+            load_analyzers(namespace, required=False)
+
+
+# _____________________________________________________________________________
+def get_loaded_libraries() -> list[str]:
+    '''
+    Get paths of the analyzer libraries loaded on demand.
+    '''
+    names = sorted({ANALYZER_LIBRARIES[namespace][0]
+                    for namespace in LOADED_NAMESPACES})
+    paths = [ROOT.gSystem.DynamicPathName(name, True) for name in names]
+
+    return [str(path) for path in paths if path]
@@ -0,0 +1,16 @@
+# generated with `stubgen libraries.py`
+
+import re
+import logging
+
+LOGGER: logging.Logger
+ANALYZER_LIBRARIES: dict[str, tuple[str, tuple[str, ...]]]
+LOADED_NAMESPACES: set[str]
+PYTHON_COMMENT_PATTERN: re.Pattern
+CPP_COMMENT_PATTERN: re.Pattern
+
+def load_analyzers(namespace: str, required: bool = True) -> None: ...
+def get_referenced_namespaces(text: str) -> list[str]: ...
+def strip_comments(text: str, path: str) -> str: ...
+def load_referenced_analyzers(paths: list[str]) -> None: ...
+def get_loaded_libraries() -> list[str]: ...
@@ -0,0 +1,111 @@
+'''
+Manifests of the analysis outputs.
+
+The manifest is stored next to the output file, hidden from the discovery
+of the inputs of the next stage, and records everything the output depends
+on: the analysis script with its custom headers, the analyzer libraries and
+the input files. Outputs with matching manifest are considered up-to-date and
+are not reprocessed.
+'''
+
+import os
+import json
+import hashlib
+import logging
+import ROOT  # type: ignore
+
+from libraries import get_loaded_libraries
+
+
+ROOT.gROOT.SetBatch(True)
+
+LOGGER: logging.Logger = logging.getLogger('FCCAnalyses.manifest')
+
+
+# _____________________________________________________________________________
+def get_manifest_path(output_path: str) -> str:
+    '''
+    Get path of the manifest belonging to the output file.
+    '''
+    stem = os.path.splitext(os.path.basename(output_path))[0]
+    return os.path.join(os.path.dirname(output_path),
+                        f'.{stem}.manifest.json')
+
+
+# _____________________________________________________________________________
+def get_file_stamp(filepath: str) -> list:
+    '''
+    Get size and modification time of the file. Remote files are identified
+    only by their path.
+    '''
+    try:
+        stat = os.stat(filepath)
+    except OSError:
+        return [filepath, None, None]
+
+    return [filepath, stat.st_size, stat.st_mtime_ns]
+
+
+# _____________________________________________________________________________
+def get_file_hash(filepath: str) -> str | None:
+    '''
+    Get hash of the file content.
+    '''
+    try:
+        with open(filepath, 'rb') as infile:
+            return hashlib.sha256(infile.read()).hexdigest()
+    except OSError:
+        return None
+
+
+# _____________________________________________________________________________
+def get_manifest(anapath: str, input_files: list[str],
+                 entry_range: tuple[int, int] | None, nevents: int,
+                 include_paths: list[str] | None = None) -> dict:
+    '''
+    Put together manifest of the output produced from the input files. The
+    custom headers are given relative to the analysis script.
+    '''
+    basepath = os.path.dirname(os.path.abspath(anapath))
+    headers = {path: get_file_hash(os.path.join(basepath, path))
+               for path in include_paths or []}
+
+    library_paths = [ROOT.gSystem.DynamicPathName('libFCCAnalyses', True)]
+    library_paths += get_loaded_libraries()
+    libraries = [get_file_stamp(str(p)) for p in library_paths if p]
+
+    return {'script': get_file_hash(anapath),
+            'headers': headers,
+            'libraries': libraries,
+            'inputs': [get_file_stamp(f) for f in input_files],
+            'entry_range': list(entry_range) if entry_range else None,
+            'nevents': nevents}
+
+
+# _____________________________________________________________________________
+def is_up_to_date(output_path: str, manifest: dict) -> bool:
+    '''
+    Check whether the output exists and was produced with the same manifest.
+    '''
+    manifest_path = get_manifest_path(output_path)
+    if not os.path.isfile(output_path) or not os.path.isfile(manifest_path):
+        return False
+
+    try:
+        with open(manifest_path, 'r', encoding='utf-8') as infile:
+            return json.load(infile) == manifest
+    except (OSError, ValueError):
+        LOGGER.debug('Manifest can\'t be read:\n%s', manifest_path)
+        return False
+
+
+# _____________________________________________________________________________
+def save_manifest(output_path: str, manifest: dict) -> None:
+    '''
+    Save manifest next to the output file.
+    '''
+    manifest_path = get_manifest_path(output_path)
+    tmp_path = manifest_path + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as outfile:
+        json.dump(manifest, outfile, indent=2)
+    os.replace(tmp_path, manifest_path)
@@ -0,0 +1,12 @@
+# generated with `stubgen manifest.py`
+
+import logging
+
+LOGGER: logging.Logger
+
+def get_manifest_path(output_path: str) -> str: ...
+def get_file_stamp(filepath: str) -> list: ...
+def get_file_hash(filepath: str) -> str | None: ...
+def get_manifest(anapath: str, input_files: list[str], entry_range: tuple[int, int] | None, nevents: int, include_paths: list[str] | None = None) -> dict: ...
+def is_up_to_date(output_path: str, manifest: dict) -> bool: ...
+def save_manifest(output_path: str, manifest: dict) -> None: ...
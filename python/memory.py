@@ -0,0 +1,213 @@
+'''
+Memory accounting of the analysis.
+
+The peak resident memory is sampled during the event loop and the memory
+allocated per event by the RVec-valued columns is estimated from the profiled
+Define nodes. With the memory limit, the execution of the analysis is planned
+so that the projected peak memory stays within it.
+'''
+
+import logging
+import ROOT  # type: ignore
+
+from profiler import PROFILED_NODES
+
+
+ROOT.gROOT.SetBatch(True)
+
+LOGGER: logging.Logger = logging.getLogger('FCCAnalyses.memory')
+
+# Factors of the TTreeCache size relative to the cluster size, from the ROOT
+# default
+CACHE_FACTORS: tuple[float, ...] = (1., 0.5, 0.25)
+# Sizes of the output buffers of the Snapshot before they are flushed to the
+# file, from the ROOT default
+AUTO_FLUSH_SIZES: tuple[int, ...] = (30_000_000, 16_000_000, 8_000_000,
+                                     4_000_000)
+# Default basket size of the Snapshot branches
+BASKET_SIZE: int = 32_000
+# Margin applied to the projected memory
+SAFETY_FACTOR: float = 1.1
+
+
+# _____________________________________________________________________________
+def start_memory_monitor(interval_ms: int = 100) -> None:
+    '''
+    Start sampling of the resident memory of the process.
+    '''
+    ROOT.FCCAnalyses.MemoryMonitor.start(interval_ms)
+
+
+# _____________________________________________________________________________
+def stop_memory_monitor() -> int:
+    '''
+    Stop sampling of the resident memory and return its peak in bytes.
+    '''
+    return int(ROOT.FCCAnalyses.MemoryMonitor.stop())
+
+
+# _____________________________________________________________________________
+def format_bytes(nbytes: float) -> str:
+    '''
+    Format number of bytes in human readable units.
+    '''
+    for unit in ('B', 'kB', 'MB', 'GB'):
+        if abs(nbytes) < 1024.:
+            return f'{nbytes:.1f} {unit}'
+        nbytes /= 1024.
+    return f'{nbytes:.1f} TB'
+
+
+# _____________________________________________________________________________
+def get_column_sizes() -> list[dict]:
+    '''
+    Get estimate of the bytes allocated per event by the sized Define nodes,
+    sorted from the largest. Columns without heap allocations are skipped.
+    '''
+    sizes = []
+    for node, metadata in enumerate(PROFILED_NODES):
+        if not metadata['sized']:
+            continue
+        calls = int(ROOT.FCCAnalyses.Profiler.get_calls(node))
+        nbytes = int(ROOT.FCCAnalyses.Profiler.get_bytes(node))
+        if calls == 0 or nbytes == 0:
+            continue
+        sizes.append({'label': metadata['label'],
+                      'name': metadata['name'],
+                      'calls': calls,
+                      'bytes_per_event': nbytes / calls})
+
+    return sorted(sizes, key=lambda size: size['bytes_per_event'],
+                  reverse=True)
+
+
+# _____________________________________________________________________________
+def log_column_sizes(nlargest: int = 20) -> None:
+    '''
+    Log the columns allocating the most memory per event.
+    '''
+    sizes = get_column_sizes()
+    if not sizes:
+        LOGGER.warning('No RVec-valued columns with allocations found!')
+        return
+
+    text = f'{"Bytes/event":>12} {"Events":>12}  Column\n'
+    for size in sizes[:nlargest]:
+        text += f'{format_bytes(size["bytes_per_event"]):>12} '
+        text += f'{size["calls"]:>12,}  {size["label"]}: {size["name"]}\n'
+
+    LOGGER.info('Columns allocating the most memory per event:\n%s', text)
+
+
+# _____________________________________________________________________________
+def get_cluster_bytes(file_path: str) -> int:
+    '''
+    Get average compressed size of the cluster of the "events" TTree in the
+    file, which is the amount of the data read at once by every thread.
+    '''
+    with ROOT.TFile.Open(file_path, 'READ') as infile:
+        tree = infile.Get('events')
+        if not tree or tree.GetEntries() <= 0:
+            return 0
+        auto_flush = tree.GetAutoFlush()
+        if auto_flush < 0:
+            # Clusters were flushed after the given number of bytes
+            return -auto_flush
+        nbytes = tree.GetZipBytes()
+        if auto_flush == 0:
+            return nbytes
+        return int(nbytes * min(1., auto_flush / tree.GetEntries()))
+
+
+# _____________________________________________________________________________
+def project_memory(calibration: dict, nthreads: int, cache_factor: float,
+                   auto_flush: int | None) -> float:
+    '''
+    Project peak memory of one process running the analysis with given
+    settings, from the single-threaded warm-up.
+
+    The memory at the start of the warm-up and the memory needed to jit the
+    graph and read the first cluster are paid once per process, the memory
+    gained while processing the events, the input cache and the output buffers
+    are paid by every thread.
+    '''
+    setup = max(0, calibration['first_entry'] - calibration['base'])
+    per_event = max(0, calibration['peak'] - calibration['first_entry'])
+    # The cache of the first thread is already part of the setup
+    cache = (nthreads - 1) * cache_factor * calibration['cluster_bytes']
+
+    return SAFETY_FACTOR * (calibration['base'] + setup + cache +
+                            nthreads * (per_event + (auto_flush or 0)))
+
+
+# _____________________________________________________________________________
+def plan_memory_budget(limit: int, ncpus: int, nworkers: int,
+                       calibration: dict, snapshot: bool) -> dict:
+    '''
+    Find number of workers, threads per worker, input cache and output buffer
+    sizes with the most threads for which the projected peak memory stays
+    within the limit. Smaller cache and output buffers are used only if they
+    allow more threads.
+    '''
+    auto_flush_sizes = AUTO_FLUSH_SIZES if snapshot else (None,)
+    best = None
+    for workers in range(1, max(1, nworkers) + 1):
+        for nthreads in range(1, max(1, ncpus // workers) + 1):
+            for cache_factor in CACHE_FACTORS:
+                for auto_flush in auto_flush_sizes:
+                    projected = workers * project_memory(
+                        calibration, nthreads, cache_factor, auto_flush)
+                    if projected <= limit:
+                        key = (True, workers * nthreads, cache_factor,
+                               auto_flush or 0, -workers, -projected)
+                    else:
+                        key = (False, -projected)
+                    if best is None or key > best[0]:
+                        best = (key, workers, nthreads, cache_factor,
+                                auto_flush, projected)
+
+    _, workers, nthreads, cache_factor, auto_flush, projected = best
+    plan = {'limit': limit,
+            'workers': workers,
+            'threads': nthreads,
+            'cache_factor': cache_factor,
+            'auto_flush': None,
+            'basket_size': None,
+            'projected': int(projected)}
+    if auto_flush is not None and auto_flush < AUTO_FLUSH_SIZES[0]:
+        plan['auto_flush'] = auto_flush
+        plan['basket_size'] = max(
+            4000, BASKET_SIZE * auto_flush // AUTO_FLUSH_SIZES[0])
+    if projected > limit:
+        LOGGER.warning('Projected peak memory %s exceeds the memory limit '
+                       '%s even with the smallest settings!',
+                       format_bytes(projected), format_bytes(limit))
+
+    return plan
+
+
+# _____________________________________________________________________________
+def log_memory_plan(plan: dict, calibration: dict) -> None:
+    '''
+    Log the settings chosen to stay within the memory limit.
+    '''
+    text = f'Memory limit:            {format_bytes(plan["limit"])}\n'
+    text += '\t- memory at start:       '
+    text += f'{format_bytes(calibration["base"])}\n'
+    text += '\t- jit and first cluster: '
+    text += format_bytes(max(0, calibration['first_entry'] -
+                             calibration['base'])) + '\n'
+    text += '\t- event processing:      '
+    text += format_bytes(max(0, calibration['peak'] -
+                             calibration['first_entry'])) + '\n'
+    text += '\t- input cluster:         '
+    text += f'{format_bytes(calibration["cluster_bytes"])}\n'
+    text += f'\t- workers:               {plan["workers"]}\n'
+    text += f'\t- threads per worker:    {plan["threads"]}\n'
+    text += f'\t- TTreeCache factor:     {plan["cache_factor"]}\n'
+    if plan['auto_flush'] is not None:
+        text += '\t- output auto-flush:     '
+        text += f'{format_bytes(plan["auto_flush"])}\n'
+        text += f'\t- output basket size:    {plan["basket_size"]:,} B\n'
+    text += f'\t- projected peak memory: {format_bytes(plan["projected"])}'
+    LOGGER.info(text)
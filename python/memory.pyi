@@ -0,0 +1,19 @@
+# generated with `stubgen memory.py`
+
+import logging
+
+LOGGER: logging.Logger
+CACHE_FACTORS: tuple[float, ...]
+AUTO_FLUSH_SIZES: tuple[int, ...]
+BASKET_SIZE: int
+SAFETY_FACTOR: float
+
+def start_memory_monitor(interval_ms: int = 100) -> None: ...
+def stop_memory_monitor() -> int: ...
+def format_bytes(nbytes: float) -> str: ...
+def get_column_sizes() -> list[dict]: ...
+def log_column_sizes(nlargest: int = 20) -> None: ...
+def get_cluster_bytes(file_path: str) -> int: ...
+def project_memory(calibration: dict, nthreads: int, cache_factor: float, auto_flush: int | None) -> float: ...
+def plan_memory_budget(limit: int, ncpus: int, nworkers: int, calibration: dict, snapshot: bool) -> dict: ...
+def log_memory_plan(plan: dict, calibration: dict) -> None: ...
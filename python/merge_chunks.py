@@ -0,0 +1,239 @@
+'''
+Merge chunked outputs of the analysis stages.
+'''
+
+import os
+import sys
+import glob
+import shutil
+import logging
+import tempfile
+import subprocess
+import concurrent.futures
+import ROOT  # type: ignore
+
+from process import get_files_metadata
+
+
+ROOT.gROOT.SetBatch(True)
+
+LOGGER = logging.getLogger('FCCAnalyses.merge')
+
+
+# _____________________________________________________________________________
+def get_file_groups(file_list: list[str], nfiles: int) -> list[list[str]]:
+    '''
+    Arrange files into groups with roughly the same number of entries.
+    '''
+    entries = [metadata['entries'] or 0
+               for metadata in get_files_metadata(file_list)]
+    nentries_total = sum(entries)
+
+    groups = [[] for _ in range(nfiles)]
+    nentries = 0
+    for i, (filepath, nevents) in enumerate(zip(file_list, entries)):
+        if nentries_total > 0:
+            igroup = min(nfiles - 1, nentries * nfiles // nentries_total)
+        else:
+            igroup = i * nfiles // len(file_list)
+        groups[igroup].append(filepath)
+        nentries += nevents
+
+    return [group for group in groups if group]
+
+
+# _____________________________________________________________________________
+def hadd(output_path: str, input_paths: list[str], recluster: bool) -> str:
+    '''
+    Merge the files with hadd. Returns error output in case of failure.
+    '''
+    cmd = ['hadd', '-f']
+    if recluster:
+        # Re-optimize the basket sizes and clustering of the trees
+        cmd.append('-O')
+    cmd += [output_path] + input_paths
+    result = subprocess.run(cmd, stdout=subprocess.PIPE,
+                            stderr=subprocess.STDOUT,
+                            universal_newlines=True, check=False)
+    if result.returncode != 0:
+        return result.stdout
+
+    return ''
+
+
+# _____________________________________________________________________________
+def merge_tree(targets: dict[str, list[str]], fan_in: int, njobs: int,
+               recluster: bool, tmp_dir: str) -> bool:
+    '''
+    Merge input files into the target files in a tree of partial merges. The
+    merges of each level run in parallel, the trees are fast-cloned in the
+    partial merges and optionally re-clustered in the final ones.
+    '''
+    pending = dict(targets)
+    npartials = 0
+    with concurrent.futures.ThreadPoolExecutor(njobs) as executor:
+        while pending:
+            jobs = {}
+            next_pending = {}
+            for output_path, input_paths in pending.items():
+                if len(input_paths) <= fan_in:
+                    jobs[output_path] = (input_paths, recluster)
+                    continue
+                partials = []
+                for i in range(0, len(input_paths), fan_in):
+                    partial_path = os.path.join(tmp_dir,
+                                                f'partial{npartials}.root')
+                    npartials += 1
+                    jobs[partial_path] = (input_paths[i:i + fan_in], False)
+                    partials.append(partial_path)
+                next_pending[output_path] = partials
+            LOGGER.debug('Running %i merge(s)...', len(jobs))
+
+            futures = {executor.submit(hadd, output_path, *job): output_path
+                       for output_path, job in jobs.items()}
+            success = True
+            for future in concurrent.futures.as_completed(futures):
+                error = future.result()
+                if error:
+                    LOGGER.error('Merging into "%s" failed:\n%s',
+                                 futures[future], error)
+                    success = False
+            if not success:
+                return False
+
+            # Partial results of the previous level are not needed anymore
+            for input_paths, _ in jobs.values():
+                for input_path in input_paths:
+                    if os.path.dirname(input_path) == tmp_dir:
+                        os.remove(input_path)
+
+            pending = next_pending
+
+    return True
+
+
+# _____________________________________________________________________________
+def write_merged_metadata(output_path: str, input_paths: list[str]) -> None:
+    '''
+    Write sums of the number of processed and selected events of the input
+    files into the merged file.
+    '''
+    events_processed = 0
+    events_selected = 0
+    for input_path in input_paths:
+        with ROOT.TFile(input_path, 'READ') as infile:
+            param = infile.Get('eventsProcessed')
+            if param:
+                events_processed += param.GetVal()
+            param = infile.Get('eventsSelected')
+            if param:
+                events_selected += param.GetVal()
+
+    with ROOT.TFile(output_path, 'UPDATE'):
+        param = ROOT.TParameter(int)('eventsProcessed', events_processed)
+        param.Write('', ROOT.TObject.kOverwrite)
+        param = ROOT.TParameter(int)('eventsSelected', events_selected)
+        param.Write('', ROOT.TObject.kOverwrite)
+
+    LOGGER.info('Merged file "%s":\n\t- eventsProcessed: %s\n\t'
+                '- eventsSelected:  %s', output_path,
+                f'{events_processed:,}', f'{events_selected:,}')
+
+
+# _____________________________________________________________________________
+def merge_directory(directory: str, args) -> None:
+    '''
+    Merge chunks in the directory. The original chunks are moved to the
+    hidden ".<directory>.chunks", which is not picked up by the next stages.
+    '''
+    directory = directory.rstrip('/')
+    chunks_dir = os.path.join(os.path.dirname(directory),
+                              f'.{os.path.basename(directory)}.chunks')
+    if os.path.exists(chunks_dir):
+        LOGGER.error('Directory with the original chunks already exists:\n%s'
+                     '\nAborting...', chunks_dir)
+        sys.exit(3)
+
+    if os.path.exists(directory + '.root'):
+        LOGGER.error('Output file already exists:\n%s\nAborting...',
+                     directory + '.root')
+        sys.exit(3)
+
+    input_paths = sorted(glob.glob(os.path.join(directory, '*.root')))
+    if len(input_paths) == 0:
+        LOGGER.error('No files to merge found in:\n%s\nAborting...',
+                     directory)
+        sys.exit(3)
+
+    nfiles = min(args.nfiles, len(input_paths))
+    LOGGER.info('Merging %i file(s) from "%s" into %i file(s)...',
+                len(input_paths), directory, nfiles)
+
+    os.rename(directory, chunks_dir)
+    input_paths = [os.path.join(chunks_dir, os.path.basename(p))
+                   for p in input_paths]
+    if nfiles == 1:
+        targets = {directory + '.root': input_paths}
+    else:
+        os.mkdir(directory)
+        targets = {os.path.join(directory, f'chunk{i}.root'): group
+                   for i, group in
+                   enumerate(get_file_groups(input_paths, nfiles))}
+
+    tmp_dir = tempfile.mkdtemp(prefix='.merge_',
+                               dir=os.path.dirname(os.path.abspath(directory)))
+    try:
+        success = merge_tree(targets, args.fan_in, args.jobs,
+                             args.recluster, tmp_dir)
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+    if not success:
+        # Restore the original state
+        for output_path in targets:
+            if os.path.exists(output_path):
+                os.remove(output_path)
+        if os.path.isdir(directory):
+            os.rmdir(directory)
+        os.rename(chunks_dir, directory)
+        LOGGER.error('Merging of "%s" failed!\nAborting...', directory)
+        sys.exit(3)
+
+    for output_path, paths in targets.items():
+        write_merged_metadata(output_path, paths)
+
+    if args.remove_chunks:
+        shutil.rmtree(chunks_dir)
+    else:
+        LOGGER.info('Original chunks moved to:\n%s', chunks_dir)
+
+
+# _____________________________________________________________________________
+def merge_chunks(parser):
+    '''
+    Merge chunked outputs of the analysis stage.
+    '''
+    args, _ = parser.parse_known_args()
+
+    if args.command != 'merge':
+        LOGGER.error('Unknow sub-command "%s"!\nAborting...', args.command)
+        sys.exit(3)
+
+    if shutil.which('hadd') is None:
+        LOGGER.error('ROOT hadd tool can\'t be found!\nAborting...')
+        sys.exit(3)
+
+    if args.jobs <= 0:
+        args.jobs = os.cpu_count() or 1
+    if args.fan_in < 2:
+        LOGGER.error('Number of files merged at once needs to be at least 2!'
+                     '\nAborting...')
+        sys.exit(3)
+
+    for directory in args.directories:
+        if not os.path.isdir(directory):
+            LOGGER.error('Directory "%s" not found!\nAborting...', directory)
+            sys.exit(3)
+
+    for directory in args.directories:
+        merge_directory(directory, args)
@@ -2,9 +2,37 @@
 Parsers for the fccanalysis sub-commands
 '''
 
+import re
 import argparse
 
 
+def parse_memory_size(text: str) -> int:
+    '''
+    Parse memory size with optional binary unit suffix, e.g. "2G" or "1500M",
+    into bytes.
+    '''
+    match = re.fullmatch(r'\s*(\d+(?:\.\d*)?)\s*([kKmMgGtT]?)i?[bB]?\s*',
+                         text)
+    if match is None:
+        raise argparse.ArgumentTypeError(f'invalid memory size: "{text}"')
+    exponent = ' KMGT'.index(match.group(2).upper() or ' ')
+
+    return int(float(match.group(1)) * 1024 ** exponent)
+
+
+def parse_ncpus(text: str) -> int | str:
+    '''
+    Parse number of threads, which can be also "auto".
+    '''
+    if text == 'auto':
+        return text
+    try:
+        return int(text)
+    except ValueError as err:
+        raise argparse.ArgumentTypeError(
+            f'invalid number of threads: "{text}"') from err
+
+
 def setup_init_parser(parser):
     '''
     Arguments for the init sub-command
@@ -108,17 +136,74 @@ def setup_run_parser(parser):
              'outputList')
     parser.add_argument('--nevents', type=int, default=-1,
                         help='specify max number of events to process')
+    parser.add_argument('--entry-range', type=int, nargs=2, default=None,
+                        metavar=('FIRST', 'LAST'),
+                        help='process only entries from FIRST to LAST '
+                        '(exclusive) of the input files')
     parser.add_argument('--test', action='store_true', default=False,
                         help='run over the test input file')
     parser.add_argument('--bench', action='store_true', default=False,
                         help='output benchmark results to a JSON file')
-    parser.add_argument('-j', '--ncpus', type=int, default=-1,
-                        help='set number of threads')
+    parser.add_argument('-j', '--ncpus', type=parse_ncpus, default=-1,
+                        help='set number of threads, "auto" chooses it '
+                        'from the input and a short calibration')
+    parser.add_argument('--local-workers', type=int, default=1,
+                        help='number of chunks running locally in parallel, '
+                        'the threads are divided among them')
+    parser.add_argument('--profile', nargs='?', const='profile.json',
+                        default=None, metavar='PATH',
+                        help='profile Define and Filter nodes of the analysis '
+                        'and save the report into PATH (default: '
+                        'profile.json)')
+    parser.add_argument('--trace', nargs='?', const='trace.json',
+                        default=None, metavar='PATH',
+                        help='record timeline of the event loop and save it '
+                        'in Chrome trace format into PATH (default: '
+                        'trace.json)')
+    parser.add_argument('--column-sizes', action='store_true', default=False,
+                        help='estimate memory allocated per event by the '
+                        'RVec-valued columns')
+    parser.add_argument('--memory-limit', type=parse_memory_size,
+                        default=None, metavar='SIZE',
+                        help='choose number of threads, local workers, input '
+                        'cache and output buffer sizes so that the projected '
+                        'peak memory stays below SIZE (e.g. 2G), calibrated '
+                        'on the first events')
+    parser.add_argument('--memory-plan', type=str, default=None,
+                        help=argparse.SUPPRESS)
+    parser.add_argument('--tasks-per-worker', type=int, default=None,
+                        help=argparse.SUPPRESS)
+    parser.add_argument('--plan', nargs='?', const='plan.json',
+                        default=None, metavar='PATH',
+                        help='estimate cost of the stage from a sample of '
+                        'events of every process, propose number of chunks '
+                        'and save the plan into PATH (default: plan.json)')
+    parser.add_argument('--plan-events', type=int, default=1000, metavar='N',
+                        help='number of events sampled per process when '
+                        'planning (default: 1000)')
+    parser.add_argument('--target-walltime', type=float, default=2.,
+                        metavar='HOURS',
+                        help='target walltime of a chunk when planning '
+                        '(default: 2)')
+    parser.add_argument('--aot-compile', action='store_true', default=False,
+                        help='compile the string expressions of the analysis '
+                        'into a cached shared library instead of jitting '
+                        'them')
+    parser.add_argument('--force', action='store_true', default=False,
+                        help='rerun also the outputs which are up-to-date')
+    parser.add_argument('--checkpoint', type=int, default=0, metavar='N',
+                        help='histmaker only, process the input in N slices '
+                        'and checkpoint the partial results after each of '
+                        'them')
     parser.add_argument('-g', '--graph', action='store_true', default=False,
                         help='generate computational graph of the analysis')
     parser.add_argument('--graph-path', type=str, default='',
                         help='analysis graph save path, should end with '
                         '\'.dot\' or \'.png\'')
+    parser.add_argument('--graph-timing', action='store_true', default=False,
+                        help='run the analysis with profiled nodes and '
+                        'generate computational graph annotated with the '
+                        'measured timings')
 
     # Internal argument, not to be used by the users
     parser.add_argument('--batch', action='store_true', default=False,
@@ -131,11 +216,28 @@ def setup_run_parser_final(parser):
     '''
     parser.add_argument('anascript_path',
                         help='path to analysis_final script')
+    parser.add_argument('--profile', nargs='?', const='profile.json',
+                        default=None, metavar='PATH',
+                        help='profile Define and Filter nodes of the analysis '
+                        'and save the report into PATH (default: '
+                        'profile.json)')
+    parser.add_argument('--trace', nargs='?', const='trace.json',
+                        default=None, metavar='PATH',
+                        help='record timeline of the event loop and save it '
+                        'in Chrome trace format into PATH (default: '
+                        'trace.json)')
+    parser.add_argument('--column-sizes', action='store_true', default=False,
+                        help='estimate memory allocated per event by the '
+                        'RVec-valued columns')
     parser.add_argument('-g', '--graph', action='store_true', default=False,
                         help='generate computational graph of the analysis')
     parser.add_argument('--graph-path', type=str, default='',
                         help='analysis graph save path, should end with '
                         '\'.dot\' or \'.png\'')
+    parser.add_argument('--graph-timing', action='store_true', default=False,
+                        help='run the analysis with profiled nodes and '
+                        'generate computational graph annotated with the '
+                        'measured timings')
 
 
 def setup_run_parser_plots(parser):
@@ -163,6 +265,25 @@ def setup_run_parser_combine(parser):
     parser.add_argument('script_path', help="path to the combine script")
 
 
+def setup_merge_parser(parser):
+    '''
+    Define command line arguments for the merge sub-command.
+    '''
+    parser.add_argument('directories', nargs='+',
+                        help='directories with the chunks to be merged')
+    parser.add_argument('-n', '--nfiles', type=int, default=1,
+                        help='number of the merged files per directory')
+    parser.add_argument('-j', '--jobs', type=int, default=-1,
+                        help='number of merges running in parallel')
+    parser.add_argument('--fan-in', type=int, default=32,
+                        help='maximal number of files merged at once')
+    parser.add_argument('--recluster', action='store_true', default=False,
+                        help='re-optimize baskets and clusters of the merged '
+                        'trees')
+    parser.add_argument('--remove-chunks', action='store_true', default=False,
+                        help='remove original chunks after successful merge')
+
+
 # _____________________________________________________________________________
 def setup_subparsers(subparsers):
     '''
@@ -194,6 +315,9 @@ def setup_subparsers(subparsers):
     parser_run_combine = subparsers.add_parser(
         'combine',
         help="prepare combine cards to run basic template fits")
+    parser_merge = subparsers.add_parser(
+        'merge',
+        help="merge chunked outputs of the analysis stage")
 
     # Register sub-parsers
     setup_init_parser(parser_init)
@@ -204,3 +328,4 @@ def setup_subparsers(subparsers):
     setup_run_parser_final(parser_run_final)
     setup_run_parser_plots(parser_run_plots)
     setup_run_parser_combine(parser_run_combine)
+    setup_merge_parser(parser_merge)
@@ -0,0 +1,90 @@
+'''
+Planning of the production of the analysis stage.
+
+The cost of every process is projected from the single-threaded calibration
+on a sample of its events, assuming that the batch jobs scale ideally with
+the number of threads.
+'''
+
+import json
+import math
+import logging
+import pprint
+
+from memory import format_bytes
+
+
+LOGGER: logging.Logger = logging.getLogger('FCCAnalyses.planner')
+
+
+# _____________________________________________________________________________
+def project_process(nevents: int, calibration: dict, nthreads: int,
+                    target_walltime: float) -> dict:
+    '''
+    Project CPU time, output volume and walltime of the chunks of the process
+    and propose number of chunks so that every chunk finishes within the
+    target walltime, in seconds.
+    '''
+    setup_time = calibration['setup_time']
+    cpu_time = nevents * calibration['event_time']
+    # Every job pays the setup, at least tenth of the target is left for the
+    # events
+    budget = max(target_walltime - setup_time, 0.1 * target_walltime)
+    chunks = max(1, math.ceil(cpu_time / (nthreads * budget)))
+    chunks = min(chunks, max(1, nevents))
+
+    events_per_second = 0.
+    if calibration['event_time'] > 0.:
+        events_per_second = 1. / calibration['event_time']
+
+    return {'nevents': nevents,
+            'events_per_second': events_per_second,
+            'setup_time': setup_time,
+            'cpu_hours': (cpu_time + chunks * setup_time) / 3600.,
+            'output_bytes': nevents * calibration['output_bytes'],
+            'chunks': chunks,
+            'chunk_walltime': setup_time + cpu_time / (nthreads * chunks)}
+
+
+# _____________________________________________________________________________
+def log_stage_plan(projections: dict[str, dict], nthreads: int) -> None:
+    '''
+    Log the projections of all processes and their totals.
+    '''
+    text = f'Projected cost of the stage with {nthreads} thread(s) per job:\n'
+    text += f'{"Events":>14} {"Events/s":>10} {"CPU hours":>10} '
+    text += f'{"Output":>10} {"Chunks":>7} {"Walltime":>9}  Process\n'
+    for process_name, projection in projections.items():
+        text += f'{projection["nevents"]:>14,} '
+        text += f'{projection["events_per_second"]:>10,.1f} '
+        text += f'{projection["cpu_hours"]:>10.2f} '
+        text += f'{format_bytes(projection["output_bytes"]):>10} '
+        text += f'{projection["chunks"]:>7,} '
+        text += f'{projection["chunk_walltime"] / 3600.:>8.2f}h  '
+        text += f'{process_name}\n'
+    cpu_hours = sum(p['cpu_hours'] for p in projections.values())
+    output_bytes = sum(p['output_bytes'] for p in projections.values())
+    text += f'Total CPU hours: {cpu_hours:.2f}\n'
+    text += f'Total output:    {format_bytes(output_bytes)}'
+    LOGGER.info(text)
+
+
+# _____________________________________________________________________________
+def save_stage_plan(path: str, process_list: dict,
+                    projections: dict[str, dict]) -> None:
+    '''
+    Save the projections together with the processList patched with the
+    proposed number of chunks.
+    '''
+    patched = {}
+    for process_name, projection in projections.items():
+        patched[process_name] = dict(process_list[process_name] or {})
+        patched[process_name]['chunks'] = projection['chunks']
+
+    with open(path, 'w', encoding='utf-8') as planfile:
+        json.dump({'processes': projections, 'processList': patched},
+                  planfile, indent=2)
+
+    LOGGER.info('Plan saved into "%s", processList with the proposed '
+                'chunks:\nprocessList = %s', path,
+                pprint.pformat(patched, sort_dicts=False))
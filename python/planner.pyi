@@ -0,0 +1,9 @@
+# generated with `stubgen planner.py`
+
+import logging
+
+LOGGER: logging.Logger
+
+def project_process(nevents: int, calibration: dict, nthreads: int, target_walltime: float) -> dict: ...
+def log_stage_plan(projections: dict[str, dict], nthreads: int) -> None: ...
+def save_stage_plan(path: str, process_list: dict, projections: dict[str, dict]) -> None: ...
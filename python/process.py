@@ -7,6 +7,8 @@ import sys
 import json
 import glob
 import logging
+import itertools
+import concurrent.futures
 import urllib.request
 import yaml  # type: ignore
 import ROOT  # type: ignore
@@ -16,15 +18,222 @@ ROOT.gROOT.SetBatch(True)
 LOGGER: logging.Logger = logging.getLogger('FCCAnalyses.process_info')
 
 
+def get_file_index_path() -> str:
+    '''
+    Get location of the on-disk index with the input file metadata.
+    '''
+    cache_dir = os.getenv('XDG_CACHE_HOME',
+                          os.path.join(os.path.expanduser('~'), '.cache'))
+    return os.path.join(cache_dir, 'FCCAnalyses', 'file_index.json')
+
+
+def load_file_index() -> dict[str, dict]:
+    '''
+    Load the index with the input file metadata.
+    '''
+    index_path = get_file_index_path()
+    try:
+        with open(index_path, 'r', encoding='utf-8') as index_file:
+            return json.load(index_file)
+    except (OSError, json.decoder.JSONDecodeError):
+        LOGGER.debug('File index not found or not readable:\n%s', index_path)
+    return {}
+
+
+def save_file_index(file_index: dict[str, dict]) -> None:
+    '''
+    Merge provided entries into the on-disk file index.
+    '''
+    index_path = get_file_index_path()
+    try:
+        os.makedirs(os.path.dirname(index_path), exist_ok=True)
+        # Other jobs might have updated the index in the meantime
+        merged_index = load_file_index()
+        merged_index.update(file_index)
+        tmp_path = f'{index_path}.{os.getpid()}.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as index_file:
+            json.dump(merged_index, index_file)
+        os.replace(tmp_path, index_path)
+    except OSError as err:
+        LOGGER.warning('Unable to update the file index:\n%s\n%s',
+                       index_path, err)
+
+
+def read_file_metadata(inpath: str) -> dict:
+    '''
+    Open the file and read number of entries in the TTree named "events",
+    number of events processed and sum of weights from previous stages.
+    '''
+    metadata = {'entries': None,
+                'eventsProcessed': 0,
+                'sumOfWeights': None}
+
+    infile = ROOT.TFile.Open(inpath, 'READ')
+    if not infile or infile.IsZombie():
+        LOGGER.warning('Unable to open input file:\n%s', inpath)
+        return metadata
+
+    events_ttree = infile.Get('events')
+    if events_ttree:
+        metadata['entries'] = events_ttree.GetEntries()
+    events_processed = infile.Get('eventsProcessed')
+    if events_processed:
+        metadata['eventsProcessed'] = events_processed.GetVal()
+    sum_of_weights = infile.Get('sumOfWeights')
+    if sum_of_weights:
+        metadata['sumOfWeights'] = sum_of_weights.GetVal()
+    infile.Close()
+
+    return metadata
+
+
+def get_files_metadata(file_paths: list[str],
+                       n_workers: int | None = None) -> list[dict]:
+    '''
+    Get metadata of the input files. Files are scanned in a thread pool and
+    the results are stored in the on-disk index, files which did not change
+    since the last scan are not opened again.
+    '''
+    file_index = load_file_index()
+    new_entries: dict[str, dict] = {}
+    results: dict[str, dict] = {}
+    to_scan: list[str] = []
+
+    for path in file_paths:
+        try:
+            stat = os.stat(path)
+        except OSError:
+            # Remote files are not indexed
+            to_scan.append(path)
+            continue
+        key = os.path.abspath(path)
+        entry = file_index.get(key)
+        if entry is not None and \
+                entry['size'] == stat.st_size and \
+                entry['mtime'] == stat.st_mtime:
+            results[path] = entry
+            continue
+        new_entries[key] = {'size': stat.st_size, 'mtime': stat.st_mtime}
+        to_scan.append(path)
+
+    if to_scan:
+        LOGGER.debug('Scanning %i input file(s) for metadata...',
+                     len(to_scan))
+        ROOT.EnableThreadSafety()
+        # Allow the file opening to run concurrently
+        ROOT.TFile.Open.__release_gil__ = True
+        with concurrent.futures.ThreadPoolExecutor(n_workers) as executor:
+            for path, metadata in zip(to_scan,
+                                      executor.map(read_file_metadata,
+                                                   to_scan)):
+                results[path] = metadata
+                key = os.path.abspath(path)
+                if key in new_entries and metadata['entries'] is not None:
+                    new_entries[key].update(metadata)
+                else:
+                    new_entries.pop(key, None)
+
+    if new_entries:
+        save_file_index(new_entries)
+
+    return [results[path] for path in file_paths]
+
+
 def get_entries(inpath: str) -> int:
     '''
     Get number of entries in the TTree named "events".
     '''
-    nevents = None
-    with ROOT.TFile(inpath, 'READ') as infile:
-        tt = infile.Get("events")
-        nevents = tt.GetEntries()
-    return nevents
+    return get_files_metadata([inpath])[0]['entries']
+
+
+def get_chunk_list(file_list: list[str],
+                   event_list: list[int],
+                   chunks: int) -> list[dict]:
+    '''
+    Arrange input files into chunks with roughly the same number of events.
+    Files are split between the chunks if necessary, in which case the chunk
+    carries the range of entries (global within the files of the chunk) to be
+    processed.
+    '''
+    nevents_total = sum(event_list)
+    if nevents_total <= 0:
+        LOGGER.warning('Number of events in the input files unknown, '
+                       'arranging chunks by the number of files...')
+        chunk_size = -(-len(file_list) // chunks)
+        return [{'files': file_list[i:i + chunk_size],
+                 'entry_range': None,
+                 'nevents': 0}
+                for i in range(0, len(file_list), chunk_size)]
+
+    boundaries = [i * nevents_total // chunks for i in range(chunks + 1)]
+    offsets = [0] + list(itertools.accumulate(event_list))[:-1]
+
+    chunk_list = []
+    for begin, end in zip(boundaries[:-1], boundaries[1:]):
+        if begin == end:
+            continue
+        chunk_files = []
+        chunk_offset = None
+        chunk_nevents = 0
+        for filepath, offset, nevents in zip(file_list, offsets, event_list):
+            if nevents == 0:
+                # Empty files still carry their eventsProcessed metadata,
+                # they are assigned to exactly one chunk
+                if begin <= offset < end or \
+                        (end == nevents_total and offset == nevents_total):
+                    chunk_files.append(filepath)
+                continue
+            if offset >= end or offset + nevents <= begin:
+                continue
+            if chunk_offset is None:
+                chunk_offset = offset
+            chunk_files.append(filepath)
+            chunk_nevents += nevents
+
+        entry_range = (begin - chunk_offset, end - chunk_offset)
+        if entry_range == (0, chunk_nevents):
+            entry_range = None
+        chunk_list.append({'files': chunk_files,
+                           'entry_range': entry_range,
+                           'nevents': end - begin})
+
+    return chunk_list
+
+
+def get_chunk_events(file_list: list[str],
+                     entry_range: tuple[int, int] | None = None) \
+        -> tuple[int, int]:
+    '''
+    Get number of events processed in the previous stages and number of
+    local events in the provided files. In case of the entry range the number
+    of previously processed events is pro-rated for the files which are
+    processed only partially.
+    '''
+    nevents_orig = 0
+    nevents_local = 0
+    offset = 0
+    for filepath, metadata in zip(file_list, get_files_metadata(file_list)):
+        if metadata['entries'] is None:
+            LOGGER.error('Input file:\n%s\nis missing events TTree!\n'
+                         'Aborting...', filepath)
+            sys.exit(3)
+
+        nevents = metadata['entries']
+        events_processed = metadata['eventsProcessed']
+        if entry_range is None or nevents == 0:
+            nevents_orig += events_processed
+            nevents_local += nevents
+            offset += nevents
+            continue
+
+        first = min(max(entry_range[0] - offset, 0), nevents)
+        last = min(max(entry_range[1] - offset, 0), nevents)
+        nevents_orig += events_processed * last // nevents - \
+            events_processed * first // nevents
+        nevents_local += last - first
+        offset += nevents
+
+    return nevents_orig, nevents_local
 
 
 def get_process_info(process: str,
@@ -73,13 +282,16 @@ def get_process_info_files(process: str, input_dir: str) -> tuple[list[str],
 
     if os.path.isfile(filetest):
         filelist.append(filetest)
-        eventlist.append(get_entries(filetest))
 
     if os.path.isdir(dirtest):
-        flist = glob.glob(dirtest+"/*.root")
-        for f in flist:
-            filelist.append(f)
-            eventlist.append(get_entries(f))
+        filelist += glob.glob(dirtest+"/*.root")
+
+    for filepath, metadata in zip(filelist, get_files_metadata(filelist)):
+        if metadata['entries'] is None:
+            LOGGER.error('Input file:\n%s\nis missing events TTree!\n'
+                         'Aborting...', filepath)
+            sys.exit(3)
+        eventlist.append(metadata['entries'])
 
     return filelist, eventlist
 
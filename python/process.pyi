@@ -4,7 +4,14 @@ import logging
 
 LOGGER: logging.Logger
 
+def get_file_index_path() -> str: ...
+def load_file_index() -> dict[str, dict]: ...
+def save_file_index(file_index: dict[str, dict]) -> None: ...
+def read_file_metadata(inpath: str) -> dict: ...
+def get_files_metadata(file_paths: list[str], n_workers: int | None = None) -> list[dict]: ...
 def get_entries(inpath: str) -> int: ...
+def get_chunk_list(file_list: list[str], event_list: list[int], chunks: int) -> list[dict]: ...
+def get_chunk_events(file_list: list[str], entry_range: tuple[int, int] | None = None) -> tuple[int, int]: ...
 def get_process_info(process: str, prod_tag: str, input_dir: str) -> tuple[list[str], list[int]]: ...
 def get_process_info_files(process: str, input_dir: str) -> tuple[list[str], list[int]]: ...
 def get_process_info_yaml(process_name: str, prod_tag: str) -> tuple[list[str], list[int]]: ...
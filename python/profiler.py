@@ -0,0 +1,357 @@
+'''
+Profiler of the Define and Filter nodes registered by the analysis scripts.
+
+The string expressions of the nodes are wrapped so that the time spent in
+them, the number of their evaluations and, for filters, the number of passed
+events are recorded per processing slot. The structure of the profiled graph
+is recorded as well, so that it can be drawn with the measured timings.
+'''
+
+import re
+import json
+import html
+import logging
+import ROOT  # type: ignore
+
+
+ROOT.gROOT.SetBatch(True)
+
+LOGGER: logging.Logger = logging.getLogger('FCCAnalyses.profiler')
+
+# Metadata of the profiled nodes, index corresponds to the node index in the
+# C++ profiler
+PROFILED_NODES: list[dict] = []
+
+# Nodes of the profiled computational graph, each of them holds index of its
+# parent and indices of the profiled nodes evaluated in it
+GRAPH_NODES: list[dict] = []
+
+# Nodes of the graph drawn as boxes, the rest are drawn as ellipses
+GRAPH_BOX_NODES: set[str] = {'Source', 'Filter', 'Range'}
+
+
+# _____________________________________________________________________________
+def profile_expression(expression: str, kind: str, name: str,
+                       label: str, sized: bool = False) -> str:
+    '''
+    Register profiled node and return its wrapped expression. Expressions
+    written as a function body (with return statement) are not profiled. For
+    sized Define nodes also the memory held by their values is accounted.
+    '''
+    if re.search(r'\breturn\b', expression):
+        LOGGER.debug('Expression of the node "%s" contains return statement, '
+                     'it will not be profiled', name)
+        return expression
+
+    nslots = ROOT.GetThreadPoolSize() if ROOT.IsImplicitMTEnabled() else 1
+    node = ROOT.FCCAnalyses.Profiler.register_node(max(1, nslots))
+    sized = sized and kind != 'Filter'
+    PROFILED_NODES.append({'label': label,
+                           'kind': kind,
+                           'name': name,
+                           'expression': expression,
+                           'sized': sized})
+
+    stop = 'filter' if kind == 'Filter' else 'stop'
+    if sized:
+        stop = 'stop_sized'
+    return (f'(FCCAnalyses::Profiler::start({node}, rdfslot_), '
+            f'FCCAnalyses::Profiler::{stop}({node}, rdfslot_, '
+            f'({expression})))')
+
+
+# _____________________________________________________________________________
+def add_graph_node(parent: int | None, kind: str, name: str, label: str,
+                   profiled: list[int] | None = None) -> int:
+    '''
+    Add node into the profiled computational graph and return its index.
+    '''
+    GRAPH_NODES.append({'parent': parent,
+                        'kind': kind,
+                        'name': name,
+                        'label': label,
+                        'profiled': profiled or []})
+    return len(GRAPH_NODES) - 1
+
+
+# _____________________________________________________________________________
+def get_call_name(args) -> str:
+    '''
+    Get name of the node or result from the arguments of the call, i.e. the
+    column name or name of the histogram model.
+    '''
+    for arg in args:
+        if isinstance(arg, str):
+            return arg
+        if isinstance(arg, tuple) and arg and isinstance(arg[0], str):
+            return arg[0]
+    return ''
+
+
+# _____________________________________________________________________________
+def is_node(obj) -> bool:
+    '''
+    Check whether the object is RDataFrame node.
+    '''
+    cpp_name = getattr(type(obj), '__cpp_name__', '')
+    return cpp_name == 'ROOT::RDataFrame' or \
+        cpp_name.startswith('ROOT::RDF::RInterface<')
+
+
+# _____________________________________________________________________________
+def is_result(obj) -> bool:
+    '''
+    Check whether the object is lazy result of RDataFrame action.
+    '''
+    cpp_name = getattr(type(obj), '__cpp_name__', '')
+    return cpp_name.startswith('ROOT::RDF::RResultPtr<')
+
+
+# _____________________________________________________________________________
+def get_node(dframe):
+    '''
+    Get the RDataFrame node, e.g. when passing it to C++ functions.
+    '''
+    if isinstance(dframe, ProfiledNode):
+        return dframe.node
+    return dframe
+
+
+# _____________________________________________________________________________
+class ProfiledNode:
+    '''
+    RDataFrame node with profiled Define and Filter nodes. All other methods
+    are forwarded to the wrapped node.
+    '''
+    def __init__(self, node, label: str, index: int | None = None,
+                 sized: bool = False):
+        self.node = node
+        self.label = label
+        self.sized = sized
+        if index is None:
+            index = add_graph_node(None, 'Source', '', label)
+        self.index = index
+
+    def wrap(self, result, kind: str, name: str,
+             profiled: list[int] | None = None):
+        '''
+        Record the node or result created from this node in the graph and
+        wrap the node.
+        '''
+        if is_node(result):
+            index = add_graph_node(self.index, kind, name, self.label,
+                                   profiled)
+            return ProfiledNode(result, self.label, index, self.sized)
+        if is_result(result):
+            add_graph_node(self.index, kind, name, self.label)
+        return result
+
+    def _profile(self, expression, kind: str, name: str) -> tuple:
+        nnodes = len(PROFILED_NODES)
+        expression = profile_expression(expression, kind, name, self.label,
+                                        self.sized)
+        return expression, list(range(nnodes, len(PROFILED_NODES)))
+
+    def Define(self, name, expression, *args):
+        '''
+        Define new column with profiled expression.
+        '''
+        profiled = []
+        if isinstance(expression, str) and not args:
+            expression, profiled = self._profile(expression, 'Define', name)
+        return self.wrap(self.node.Define(name, expression, *args),
+                         'Define', name, profiled)
+
+    def Redefine(self, name, expression, *args):
+        '''
+        Redefine column with profiled expression.
+        '''
+        profiled = []
+        if isinstance(expression, str) and not args:
+            expression, profiled = self._profile(expression, 'Redefine', name)
+        return self.wrap(self.node.Redefine(name, expression, *args),
+                         'Redefine', name, profiled)
+
+    def Filter(self, expression, *args):
+        '''
+        Filter events with profiled expression.
+        '''
+        profiled = []
+        name = args[0] if args and isinstance(args[0], str) and args[0] \
+            else str(expression)
+        if isinstance(expression, str) and \
+                all(isinstance(arg, str) for arg in args):
+            expression, profiled = self._profile(expression, 'Filter', name)
+        return self.wrap(self.node.Filter(expression, *args),
+                         'Filter', name, profiled)
+
+    def __getattr__(self, attr):
+        value = getattr(self.node, attr)
+        if not callable(value):
+            return value
+
+        def forward(*args, **kwargs):
+            args = [get_node(arg) for arg in args]
+            return self.wrap(value(*args, **kwargs), attr,
+                             get_call_name(args))
+
+        return forward
+
+
+# _____________________________________________________________________________
+def get_profile_report() -> list[dict]:
+    '''
+    Collect results of all profiled nodes, sorted from the most time
+    consuming.
+    '''
+    report = []
+    for node, metadata in enumerate(PROFILED_NODES):
+        slot_times = list(ROOT.FCCAnalyses.Profiler.get_times(node))
+        calls = int(ROOT.FCCAnalyses.Profiler.get_calls(node))
+        entry = dict(metadata)
+        entry['time'] = sum(slot_times)
+        entry['slot_times'] = slot_times
+        entry['calls'] = calls
+        entry['time_per_call'] = entry['time'] / calls if calls > 0 else 0.
+        if metadata['kind'] == 'Filter':
+            passed = int(ROOT.FCCAnalyses.Profiler.get_passed(node))
+            entry['passed'] = passed
+            entry['pass_rate'] = passed / calls if calls > 0 else 0.
+        elif metadata['sized']:
+            nbytes = int(ROOT.FCCAnalyses.Profiler.get_bytes(node))
+            entry['bytes_per_call'] = nbytes / calls if calls > 0 else 0.
+        report.append(entry)
+
+    return sorted(report, key=lambda entry: entry['time'], reverse=True)
+
+
+# _____________________________________________________________________________
+def save_profile_report(path: str, nhottest: int = 20) -> None:
+    '''
+    Save the profile report as JSON and text table with the hottest nodes.
+    '''
+    report = get_profile_report()
+    if not report:
+        LOGGER.warning('No profiled nodes found!')
+        return
+
+    with open(path, 'w', encoding='utf-8') as outfile:
+        json.dump(report, outfile, indent=2)
+
+    time_total = sum(entry['time'] for entry in report)
+    text = f'{"Time [s]":>10} {"Share":>6} {"Calls":>12} '
+    text += f'{"ns/call":>9} {"Pass":>7}  Node\n'
+    for entry in report[:nhottest]:
+        share = entry['time'] / time_total if time_total > 0 else 0.
+        text += f'{entry["time"]:>10.3f} {share:>6.1%} {entry["calls"]:>12,} '
+        text += f'{entry["time_per_call"] * 1e9:>9.0f} '
+        if 'pass_rate' in entry:
+            text += f'{entry["pass_rate"]:>7.2%}  '
+        else:
+            text += f'{"":>7}  '
+        text += f'{entry["label"]}: {entry["kind"]} {entry["name"]}\n'
+
+    text_path = path.rsplit('.', 1)[0] + '.txt'
+    with open(text_path, 'w', encoding='utf-8') as outfile:
+        outfile.write(text)
+
+    LOGGER.info('Hottest RDataFrame nodes (full report saved to %s):\n%s',
+                path, text)
+
+
+# _____________________________________________________________________________
+def get_heat_color(fraction: float) -> str:
+    '''
+    Get fill color of the graph node, from white for negligible time to red
+    for the most time consuming node.
+    '''
+    level = round(255 * (1. - min(max(fraction, 0.), 1.)))
+    return f'#ff{level:02x}{level:02x}'
+
+
+# _____________________________________________________________________________
+def save_timing_graph(path: str) -> None:
+    '''
+    Save the profiled computational graph in dot format. The nodes are
+    colored by the time spent in them and labeled with the number of events
+    entering and leaving them and with the average time per event.
+    '''
+    times = [sum(ROOT.FCCAnalyses.Profiler.get_times(node))
+             for node in range(len(PROFILED_NODES))]
+    time_total = sum(times)
+    time_max = max((sum(times[node] for node in gnode['profiled'])
+                    for gnode in GRAPH_NODES), default=0.)
+
+    lines = ['digraph {']
+    for index, gnode in enumerate(GRAPH_NODES):
+        label = [html.escape(gnode['kind'])]
+        name = gnode['label'] if gnode['kind'] == 'Source' else gnode['name']
+        if name:
+            if len(name) > 60:
+                name = name[:57] + '...'
+            label.append(html.escape(name))
+
+        node_time = 0.
+        for node in gnode['profiled']:
+            calls = int(ROOT.FCCAnalyses.Profiler.get_calls(node))
+            if len(gnode['profiled']) > 1:
+                label.append(
+                    f'<B>{html.escape(PROFILED_NODES[node]["name"])}</B>')
+            text = f'in: {calls:,}'
+            if PROFILED_NODES[node]['kind'] == 'Filter':
+                passed = int(ROOT.FCCAnalyses.Profiler.get_passed(node))
+                text += f', out: {passed:,}'
+            label.append(text)
+            time_per_call = times[node] / calls if calls > 0 else 0.
+            share = times[node] / time_total if time_total > 0 else 0.
+            label.append(f'{time_per_call * 1e9:.0f} ns/event, {share:.1%}')
+            node_time += times[node]
+
+        if gnode['profiled']:
+            color = get_heat_color(node_time / time_max if time_max > 0
+                                   else 0.)
+        else:
+            color = '#dddddd'
+        shape = 'box' if gnode['kind'] in GRAPH_BOX_NODES else 'ellipse'
+        lines.append(f'\t{index} [label=<{"<BR/>".join(label)}>, '
+                     f'style="filled", fillcolor="{color}", '
+                     f'shape="{shape}"];')
+        if gnode['parent'] is not None:
+            lines.append(f'\t{gnode["parent"]} -> {index};')
+    lines.append('}')
+
+    with open(path, 'w', encoding='utf-8') as outfile:
+        outfile.write('\n'.join(lines) + '\n')
+
+
+# _____________________________________________________________________________
+def get_analyzer_timers() -> list[dict]:
+    '''
+    Collect the scoped timers of the C++ analyzers, the counters are attached
+    to the timers with matching name prefix. Empty if the library was not
+    compiled with the timers.
+    '''
+    if not ROOT.FCCAnalyses.Timers.compiled():
+        return []
+
+    names = list(ROOT.FCCAnalyses.Timers.get_names())
+    times = list(ROOT.FCCAnalyses.Timers.get_times())
+    calls = list(ROOT.FCCAnalyses.Timers.get_calls())
+    counts = list(ROOT.FCCAnalyses.Timers.get_counts())
+
+    timers = {}
+    for name, time, ncalls, count in zip(names, times, calls, counts):
+        if ncalls == 0:
+            continue
+        if count == 0:
+            timers[str(name)] = {'name': str(name), 'time': time,
+                                 'calls': int(ncalls), 'counts': {}}
+    for name, ncalls, count in zip(names, calls, counts):
+        if count == 0:
+            continue
+        timer, _, counter = str(name).rpartition(' ')
+        if timer in timers:
+            timers[timer]['counts'][counter] = int(count)
+
+    return sorted(timers.values(), key=lambda timer: timer['time'],
+                  reverse=True)
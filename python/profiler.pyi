@@ -0,0 +1,34 @@
+# generated with `stubgen profiler.py`
+
+import logging
+from _typeshed import Incomplete
+
+LOGGER: logging.Logger
+PROFILED_NODES: list[dict]
+GRAPH_NODES: list[dict]
+GRAPH_BOX_NODES: set[str]
+
+def profile_expression(expression: str, kind: str, name: str, label: str, sized: bool = False) -> str: ...
+def add_graph_node(parent: int | None, kind: str, name: str, label: str, profiled: list[int] | None = None) -> int: ...
+def get_call_name(args) -> str: ...
+def is_node(obj) -> bool: ...
+def is_result(obj) -> bool: ...
+def get_node(dframe): ...
+
+class ProfiledNode:
+    node: Incomplete
+    label: Incomplete
+    sized: Incomplete
+    index: Incomplete
+    def __init__(self, node, label: str, index: int | None = None, sized: bool = False) -> None: ...
+    def wrap(self, result, kind: str, name: str, profiled: list[int] | None = None): ...
+    def Define(self, name, expression, *args): ...
+    def Redefine(self, name, expression, *args): ...
+    def Filter(self, expression, *args): ...
+    def __getattr__(self, attr): ...
+
+def get_profile_report() -> list[dict]: ...
+def save_profile_report(path: str, nhottest: int = 20) -> None: ...
+def get_heat_color(fraction: float) -> str: ...
+def save_timing_graph(path: str) -> None: ...
+def get_analyzer_timers() -> list[dict]: ...
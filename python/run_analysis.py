@@ -5,103 +5,51 @@ Run analysis in one of the different styles.
 import os
 import sys
 import time
-import shutil
 import json
+import fcntl
+import hashlib
+import itertools
 import logging
+import tempfile
 import subprocess
 import importlib.util
 import datetime
-import numpy as np
+import concurrent.futures
+
+# Start of the driver, reference of the time-to-first-event benchmark
+START_TIME: float = time.time()
 
 import ROOT  # type: ignore
 from anascript import get_element, get_element_dict
-from process import get_process_info, get_process_dict
-from frame import generate_graph
+from process import get_process_info, get_process_dict, \
+    get_files_metadata, get_chunk_list, get_chunk_events
+from frame import generate_graph, generate_timing_graph, create_dataframe, \
+    get_variation_suffix, get_variations, define_bootstrap, \
+    REGISTERED_VARIATIONS
+from checkpoint import load_checkpoint, save_checkpoint
+from manifest import get_manifest, is_up_to_date, save_manifest
+from batch import BATCH_BACKENDS, get_job_ncpus
+from profiler import ProfiledNode, save_profile_report, get_analyzer_timers
+from memory import start_memory_monitor, stop_memory_monitor, \
+    format_bytes, get_column_sizes, log_column_sizes, get_cluster_bytes, \
+    plan_memory_budget, log_memory_plan
+from tracer import start_tracing, trace_dataframe, trace_phase, save_trace
+from autotune import get_input_stats, plan_threads, log_thread_plan
+from planner import project_process, log_stage_plan, save_stage_plan
+from aot import book_compiled_graph
+from libraries import load_analyzers, load_referenced_analyzers
 
 LOGGER = logging.getLogger('FCCAnalyses.run')
 
 ROOT.gROOT.SetBatch(True)
 
 
-# _____________________________________________________________________________
-def determine_os(local_dir: str) -> str | None:
-    '''
-    Determines platform on which FCCAnalyses was compiled
-    '''
-    cmake_config_path = local_dir + '/build/CMakeFiles/CMakeConfigureLog.yaml'
-    if not os.path.isfile(cmake_config_path):
-        LOGGER.warning('CMake configuration file was not found!\n'
-                       'Was FCCAnalyses properly build?')
-        return None
-
-    with open(cmake_config_path, 'r', encoding='utf-8') as cmake_config_file:
-        cmake_config = cmake_config_file.read()
-        if 'centos7' in cmake_config:
-            return 'centos7'
-        if 'almalinux9' in cmake_config:
-            return 'almalinux9'
-
-    return None
-
-
-# _____________________________________________________________________________
-def create_condor_config(log_dir: str,
-                         process_name: str,
-                         build_os: str | None,
-                         rdf_module,
-                         subjob_scripts: list[str]) -> str:
-    '''
-    Creates contents of condor configuration file.
-    '''
-    cfg = 'executable       = $(filename)\n'
-
-    cfg += f'Log              = {log_dir}/condor_job.{process_name}.'
-    cfg += '$(ClusterId).$(ProcId).log\n'
-
-    cfg += f'Output           = {log_dir}/condor_job.{process_name}.'
-    cfg += '$(ClusterId).$(ProcId).out\n'
-
-    cfg += f'Error            = {log_dir}/condor_job.{process_name}.'
-    cfg += '$(ClusterId).$(ProcId).error\n'
-
-    cfg += 'getenv           = False\n'
-
-    cfg += 'environment      = "LS_SUBCWD={log_dir}"\n'  # not sure
-
-    cfg += 'requirements     = ( '
-    if build_os == 'centos7':
-        cfg += '(OpSysAndVer =?= "CentOS7") && '
-    if build_os == 'almalinux9':
-        cfg += '(OpSysAndVer =?= "AlmaLinux9") && '
-    if build_os is None:
-        LOGGER.warning('Submitting jobs to default operating system. There '
-                       'may be compatibility issues.')
-    cfg += '(Machine =!= LastRemoteHost) && (TARGET.has_avx2 =?= True) )\n'
-
-    cfg += 'on_exit_remove   = (ExitBySignal == False) && (ExitCode == 0)\n'
-
-    cfg += 'max_retries      = 3\n'
-
-    cfg += '+JobFlavour      = "%s"\n' % get_element(rdf_module, 'batchQueue')
-
-    cfg += '+AccountingGroup = "%s"\n' % get_element(rdf_module, 'compGroup')
-
-    cfg += 'RequestCpus      = %i\n' % get_element(rdf_module, "nCPUS")
-
-    cfg += 'queue filename matching files'
-    for script in subjob_scripts:
-        cfg += ' ' + script
-    cfg += '\n'
-
-    return cfg
-
-
 # _____________________________________________________________________________
 def create_subjob_script(local_dir: str,
                          rdf_module,
                          process_name: str,
                          chunk_num: int,
-                         chunk_list: list[list[str]],
+                         chunk_list: list[dict],
                          anapath: str) -> str:
     '''
     Creates sub-job script to be run.
@@ -138,8 +86,14 @@ def create_subjob_script(local_dir: str,
     scr += local_dir
     scr += f'/bin/fccanalysis run {anapath} --batch '
     scr += f'--output {output_path} '
+    # Sub-jobs use exactly the CPUs they requested
+    if get_element(rdf_module, 'nCPUS') != get_job_ncpus(rdf_module):
+        scr += f'--ncpus {get_job_ncpus(rdf_module)} '
+    entry_range = chunk_list[chunk_num]['entry_range']
+    if entry_range is not None:
+        scr += f'--entry-range {entry_range[0]} {entry_range[1]} '
     scr += '--files-list'
-    for file_path in chunk_list[chunk_num]:
+    for file_path in chunk_list[chunk_num]['files']:
         scr += f' {file_path}'
     scr += '\n\n'
 
@@ -195,56 +149,179 @@ def get_subfile_list(in_file_list: list[str],
 
 
 # _____________________________________________________________________________
-def get_chunk_list(file_list: str, chunks: int):
+def save_benchmark(outfile, benchmark):
     '''
-    Get list of input file paths arranged into chunks.
+    Save benchmark results to a JSON file.
     '''
-    chunk_list = list(np.array_split(file_list, chunks))
-    return [chunk for chunk in chunk_list if chunk.size > 0]
+    with open(outfile, 'a+', encoding='utf-8') as benchfile:
+        # Local workers save their results concurrently
+        fcntl.flock(benchfile, fcntl.LOCK_EX)
+        benchfile.seek(0)
+        try:
+            benchmarks = json.loads(benchfile.read() or '[]')
+        except ValueError:
+            benchmarks = []
+
+        benchmarks = [b for b in benchmarks
+                      if b['name'] != benchmark['name']]
+        benchmarks.append(benchmark)
+
+        benchfile.seek(0)
+        benchfile.truncate()
+        json.dump(benchmarks, benchfile, indent=2)
 
 
 # _____________________________________________________________________________
-def save_benchmark(outfile, benchmark):
+def get_tuning_files(args, rdf_module) -> list[str]:
     '''
-    Save benchmark results to a JSON file.
+    Get input files of the first event loop of the analysis. The histmaker
+    processes all processes in one event loop, the first process split into
+    chunks is approximated by its first chunk.
+    '''
+    if hasattr(rdf_module, 'RDFanalysis'):
+        if args.test:
+            return [get_element(rdf_module, 'testFile')]
+        if len(args.files_list) > 0:
+            return [apply_filepath_rewrites(f) for f in args.files_list]
+
+    process_list = get_element(rdf_module, 'processList')
+    tuning_files = []
+    for process_name in process_list:
+        file_list, _ = get_process_info(process_name,
+                                        get_element(rdf_module, 'prodTag'),
+                                        get_element(rdf_module, 'inputDir'))
+        file_list = [apply_filepath_rewrites(f) for f in file_list]
+        if hasattr(rdf_module, 'build_graph'):
+            tuning_files += file_list[:1] if args.test else file_list
+            continue
+        chunks = get_element_dict(process_list[process_name], 'chunks') or 1
+        if file_list:
+            return file_list[:max(1, len(file_list) // chunks)]
+
+    return tuning_files
+
+
+# _____________________________________________________________________________
+def run_calibration(rdf_module, infile_path: str,
+                    nevents: int = 2000) -> dict:
     '''
-    benchmarks = []
+    Run the analysis single-threaded over the first events of the input file
+    and measure the memory at its start, at the first entry and the peak, the
+    time of the setup until the first entry and per event, and the size of the
+    output per event.
+    '''
+    _, nentries = get_chunk_events([infile_path], None)
+    nevents = max(1, min(nevents, nentries))
+    LOGGER.info('Calibrating on the first %s event(s) of:\n%s',
+                f'{nevents:,}', infile_path)
+
+    file_list = ROOT.vector('string')()
+    file_list.push_back(infile_path)
+    base = int(ROOT.FCCAnalyses.MemoryMonitor.get_rss())
+    output_bytes = 0
+    start_memory_monitor()
+    start_time = time.time()
     try:
-        with open(outfile, 'r', encoding='utf-8') as benchin:
-            benchmarks = json.load(benchin)
-    except OSError:
-        pass
+        dframe = create_dataframe(file_list, (0, nevents))
+        dframe = dframe.Filter(
+            'FCCAnalyses::MemoryMonitor::mark_first_entry()')
+        if hasattr(rdf_module, 'RDFanalysis'):
+            dframe = get_element(rdf_module.RDFanalysis, 'analysers')(dframe)
+            branch_list = ROOT.vector('string')()
+            for bname in get_element(rdf_module.RDFanalysis, 'output')():
+                branch_list.push_back(bname)
+            outfile, outfile_path = tempfile.mkstemp(suffix='.root')
+            os.close(outfile)
+            try:
+                dframe.Snapshot('events', outfile_path, branch_list)
+                output_bytes = os.path.getsize(outfile_path)
+            finally:
+                os.remove(outfile_path)
+        else:
+            process_name = next(iter(get_element(rdf_module, 'processList')))
+            _, hweight = getattr(rdf_module, 'build_graph')(dframe,
+                                                            process_name)
+            hweight.GetValue()
+    except Exception as excp:
+        LOGGER.error('During the calibration exception occurred:\n%s', excp)
+        sys.exit(3)
+    elapsed_time = time.time() - start_time
+    peak = stop_memory_monitor()
+    setup_time = max(0.,
+                     ROOT.FCCAnalyses.MemoryMonitor.get_first_entry_time())
 
-    benchmarks = [b for b in benchmarks if b['name'] != benchmark['name']]
-    benchmarks.append(benchmark)
+    return {'base': base,
+            'first_entry': int(
+                ROOT.FCCAnalyses.MemoryMonitor.get_first_entry_rss()) or base,
+            'peak': peak,
+            'cluster_bytes': get_cluster_bytes(infile_path),
+            'setup_time': setup_time,
+            'event_time': max(0., elapsed_time - setup_time) / nevents,
+            'output_bytes': output_bytes / nevents}
 
-    with open(outfile, 'w', encoding='utf-8') as benchout:
-        json.dump(benchmarks, benchout, indent=2)
+
+# _____________________________________________________________________________
+def plan_memory(args, rdf_module, ncpus: int, calibration: dict) -> dict:
+    '''
+    Plan number of threads, local workers, input cache and output buffers of
+    the run to stay within the memory limit.
+    '''
+    if ncpus < 0:
+        ncpus = os.cpu_count() or 1
+    nworkers = 1
+    if hasattr(rdf_module, 'RDFanalysis') and not args.test and \
+            len(args.files_list) == 0:
+        nworkers = max(1, args.local_workers)
+    plan = plan_memory_budget(args.memory_limit, ncpus, nworkers, calibration,
+                              hasattr(rdf_module, 'RDFanalysis'))
+    log_memory_plan(plan, calibration)
+
+    return plan
 
 
 # _____________________________________________________________________________
-def submit_job(cmd: str, max_trials: int) -> bool:
+def get_snapshot_options(args):
     '''
-    Submit job to condor, retry `max_trials` times.
+    Get options of the Snapshot, with the output buffers limited by the memory
+    plan.
     '''
-    for i in range(max_trials):
-        with subprocess.Popen(cmd, shell=True,
-                              stdout=subprocess.PIPE, stderr=subprocess.PIPE,
-                              universal_newlines=True) as proc:
-            (stdout, stderr) = proc.communicate()
+    options = ROOT.RDF.RSnapshotOptions()
+    if not args.memory_plan:
+        return options
+    plan = json.loads(args.memory_plan)
+    if plan['auto_flush'] is not None and hasattr(options, 'fAutoFlush'):
+        # Negative value is the size in bytes
+        options.fAutoFlush = -plan['auto_flush']
+    if plan['basket_size'] is not None and hasattr(options, 'fBasketSize'):
+        options.fBasketSize = plan['basket_size']
 
-            if proc.returncode == 0 and len(stderr) == 0:
-                LOGGER.info(stdout)
-                LOGGER.info('GOOD SUBMISSION')
-                return True
+    return options
 
-            LOGGER.warning('Error while submitting, retrying...\n  '
-                           'Trial: %i / %i\n  Error: %s',
-                           i, max_trials, stderr)
-            time.sleep(10)
 
-    LOGGER.error('Failed submitting after: %i trials!', max_trials)
-    return False
+# _____________________________________________________________________________
+def load_cxx_module() -> bool:
+    '''
+    Import the C++ module bundling the analyzers and add-on headers, if it was
+    built. The headers included later, also from the custom header files, are
+    then taken from the module instead of being parsed.
+    '''
+    library_path = ROOT.gSystem.DynamicPathName('libFCCAnalyses', True)
+    if not library_path:
+        return False
+    module_path = os.path.join(os.path.dirname(library_path),
+                               'FCCAnalyses.pcm')
+    if not os.path.isfile(module_path):
+        LOGGER.debug('C++ module of the analyzers not found, headers will '
+                     'be parsed')
+        return False
+    if not ROOT.gInterpreter.Declare('#pragma clang module import '
+                                     'FCCAnalyses'):
+        LOGGER.warning('C++ module of the analyzers can\'t be imported, '
+                       'headers will be parsed:\n%s', module_path)
+        return False
+    LOGGER.debug('Imported C++ module of the analyzers:\n%s', module_path)
+
+    return True
 
 
 # _____________________________________________________________________________
@@ -258,27 +335,9 @@ def initialize(args, rdf_module, anapath: str):
     geometry_file = get_element(rdf_module, "geometryFile")
     readout_name = get_element(rdf_module, "readoutName")
     if geometry_file != "" and readout_name != "":
+        load_analyzers('CaloNtupleizer')
         ROOT.CaloNtupleizer.loadGeometry(geometry_file, readout_name)
 
-    # set multithreading (no MT if number of events is specified)
-    ncpus = 1
-    if args.nevents < 0:
-        if isinstance(args.ncpus, int) and args.ncpus >= 1:
-            ncpus = args.ncpus
-        else:
-            ncpus = get_element(rdf_module, "nCPUS")
-        if ncpus < 0:  # use all available threads
-            ROOT.EnableImplicitMT()
-            ncpus = ROOT.GetThreadPoolSize()
-        ROOT.ROOT.EnableImplicitMT(ncpus)
-    ROOT.EnableThreadSafety()
-
-    if ROOT.IsImplicitMTEnabled():
-        LOGGER.info('Multithreading enabled. Running over %i threads',
-                    ROOT.GetThreadPoolSize())
-    else:
-        LOGGER.info('No multithreading enabled. Running in single thread...')
-
     # custom header files
     include_paths = get_element(rdf_module, "includePaths")
     if include_paths:
@@ -305,6 +364,57 @@ def initialize(args, rdf_module, anapath: str):
                 sys.exit(3)
             _ana.append(getattr(ROOT, analysis).dictionary)
 
+    # set multithreading (no MT if number of events is specified or when
+    # planning the stage)
+    ncpus = 1
+    if args.nevents < 0 and args.plan is None:
+        if args.ncpus == 'auto' or \
+                (isinstance(args.ncpus, int) and args.ncpus >= 1):
+            ncpus = args.ncpus
+        else:
+            ncpus = get_element(rdf_module, "nCPUS")
+    # Calibrate the analysis before the multithreading is enabled, the local
+    # workers get the plan of their parent
+    calibration = None
+    if ncpus == 'auto' or \
+            (args.memory_limit is not None and args.memory_plan is None):
+        tuning_files = get_tuning_files(args, rdf_module)
+        if not tuning_files:
+            LOGGER.error('No input files for the calibration found!\n'
+                         'Aborting...')
+            sys.exit(3)
+        calibration = run_calibration(rdf_module, tuning_files[0])
+    if ncpus == 'auto':
+        input_stats = get_input_stats(tuning_files)
+        thread_plan = plan_threads(calibration, input_stats,
+                                   os.cpu_count() or 1)
+        log_thread_plan(thread_plan, calibration, input_stats)
+        ncpus = thread_plan['threads']
+        args.tasks_per_worker = thread_plan['tasks_per_worker']
+    if args.memory_limit is not None and args.memory_plan is None:
+        plan = plan_memory(args, rdf_module, ncpus, calibration)
+        args.memory_plan = json.dumps(plan)
+        args.local_workers = plan['workers']
+        ncpus = plan['workers'] * plan['threads']
+    if args.memory_plan is not None:
+        ROOT.gEnv.SetValue('TTreeCache.Size',
+                           json.loads(args.memory_plan)['cache_factor'])
+    if args.nevents < 0 and args.plan is None:
+        if ncpus < 0:  # use all available threads
+            ROOT.EnableImplicitMT()
+            ncpus = ROOT.GetThreadPoolSize()
+        ROOT.ROOT.EnableImplicitMT(ncpus)
+    if args.tasks_per_worker is not None:
+        ROOT.ROOT.TTreeProcessorMT.SetTasksPerWorkerHint(
+            args.tasks_per_worker)
+    ROOT.EnableThreadSafety()
+
+    if ROOT.IsImplicitMTEnabled():
+        LOGGER.info('Multithreading enabled. Running over %i threads',
+                    ROOT.GetThreadPoolSize())
+    else:
+        LOGGER.info('No multithreading enabled. Running in single thread...')
+
 
 # _____________________________________________________________________________
 def run_rdf(rdf_module,
@@ -314,7 +424,11 @@ def run_rdf(rdf_module,
     '''
     Create RDataFrame and snapshot it.
     '''
-    dframe = ROOT.RDataFrame("events", input_list)
+    dframe = create_dataframe(input_list, args.entry_range)
+
+    # Record tasks of the event loop
+    if args.trace:
+        dframe = trace_dataframe(dframe, os.path.basename(out_file))
 
     # limit number of events processed
     if args.nevents > 0:
@@ -322,22 +436,49 @@ def run_rdf(rdf_module,
     else:
         dframe2 = dframe
 
+    # Record time of the first entry
+    if args.bench:
+        dframe2 = dframe2.Filter(
+            'FCCAnalyses::MemoryMonitor::mark_first_entry()')
+
+    # Profile Define and Filter nodes of the analysis
+    if args.profile or args.graph_timing or args.column_sizes:
+        dframe2 = ProfiledNode(dframe2, os.path.basename(out_file),
+                               sized=args.column_sizes)
+
     try:
-        evtcount_init = dframe2.Count()
-        dframe3 = get_element(rdf_module.RDFanalysis, "analysers")(dframe2)
+        with trace_phase('booking'):
+            evtcount_init = dframe2.Count()
+            analysers = get_element(rdf_module.RDFanalysis, "analysers")
+            if args.aot_compile and isinstance(dframe2, ProfiledNode):
+                LOGGER.warning('Profiled graph can\'t be compiled '
+                               'ahead-of-time, it will be jitted')
+            if args.aot_compile and not isinstance(dframe2, ProfiledNode):
+                basepath = os.path.dirname(os.path.abspath(
+                    args.anascript_path))
+                include_paths = [
+                    os.path.join(basepath, path) for path in
+                    get_element(rdf_module, "includePaths") or []]
+                dframe3 = book_compiled_graph(
+                    dframe2, analysers, include_paths,
+                    get_element(rdf_module, "aotCacheDir"))
+            else:
+                dframe3 = analysers(dframe2)
 
-        branch_list = ROOT.vector('string')()
-        blist = get_element(rdf_module.RDFanalysis, "output")()
-        for bname in blist:
-            branch_list.push_back(bname)
+            branch_list = ROOT.vector('string')()
+            blist = get_element(rdf_module.RDFanalysis, "output")()
+            for bname in blist:
+                branch_list.push_back(bname)
 
-        evtcount_final = dframe3.Count()
+            evtcount_final = dframe3.Count()
 
         # Generate computational graph of the analysis
         if args.graph:
             generate_graph(dframe, args)
 
-        dframe3.Snapshot("events", out_file, branch_list)
+        with trace_phase('event loop'):
+            dframe3.Snapshot("events", out_file, branch_list,
+                             get_snapshot_options(args))
     except Exception as excp:
         LOGGER.error('During the execution of the analysis file exception '
                      'occurred:\n%s', excp)
@@ -349,8 +490,14 @@ def run_rdf(rdf_module,
 # _____________________________________________________________________________
 def send_to_batch(rdf_module, chunk_list, process, anapath: str):
     '''
-    Send jobs to HTCondor batch system.
+    Create sub-job scripts and send them to the batch backend.
     '''
+    backend = get_element(rdf_module, 'batchBackend')
+    if backend not in BATCH_BACKENDS:
+        LOGGER.error('Unknown batch backend "%s"!\nAvailable backends: %s\n'
+                     'Aborting...', backend, ', '.join(BATCH_BACKENDS))
+        sys.exit(3)
+
     local_dir = os.environ['LOCAL_DIR']
     current_date = datetime.datetime.fromtimestamp(
         datetime.datetime.now().timestamp()).strftime('%Y-%m-%d_%H-%M-%S')
@@ -399,31 +546,7 @@ def send_to_batch(rdf_module, chunk_list, process, anapath: str):
     LOGGER.debug('Sub-job scripts to be run:\n - %s',
                  '\n - '.join(subjob_scripts))
 
-    condor_config_path = f'{log_dir}/job_desc_{process}.cfg'
-
-    for i in range(3):
-        try:
-            with open(condor_config_path, 'w', encoding='utf-8') as cfgfile:
-                condor_config = create_condor_config(log_dir,
-                                                     process,
-                                                     determine_os(local_dir),
-                                                     rdf_module,
-                                                     subjob_scripts)
-                cfgfile.write(condor_config)
-        except IOError as e:
-            LOGGER.warning('I/O error(%i): %s', e.errno, e.strerror)
-            if i == 2:
-                sys.exit(3)
-        else:
-            break
-        time.sleep(10)
-    subprocess.getstatusoutput(f'chmod 777 {condor_config_path}')
-
-    batch_cmd = f'condor_submit {condor_config_path}'
-    LOGGER.info('Batch command:\n  %s', batch_cmd)
-    success = submit_job(batch_cmd, 10)
-    if not success:
-        sys.exit(3)
+    BATCH_BACKENDS[backend](rdf_module, log_dir, process, subjob_scripts)
 
 
 # _____________________________________________________________________________
@@ -459,34 +582,21 @@ def run_local(rdf_module, infile_list, args):
     '''
     Run analysis locally.
     '''
+    manifest = get_manifest(args.anascript_path, infile_list,
+                            args.entry_range, args.nevents,
+                            get_element(rdf_module, 'includePaths'))
+
     # Create list of files to be processed
     info_msg = 'Creating dataframe object from files:\n'
     file_list = ROOT.vector('string')()
     # Amount of events processed in previous stage (= 0 if it is the first
-    # stage)
-    nevents_orig = 0
-    # The amount of events in the input file(s)
-    nevents_local = 0
+    # stage) and the amount of events in the input file(s)
+    infile_list = [apply_filepath_rewrites(f) for f in infile_list]
     for filepath in infile_list:
-
-        filepath = apply_filepath_rewrites(filepath)
-
         file_list.push_back(filepath)
         info_msg += f'- {filepath}\t\n'
-        infile = ROOT.TFile.Open(filepath, 'READ')
-        try:
-            nevents_orig += infile.Get('eventsProcessed').GetVal()
-        except AttributeError:
-            pass
-
-        try:
-            nevents_local += infile.Get("events").GetEntries()
-        except AttributeError:
-            LOGGER.error('Input file:\n%s\nis missing events TTree!\n'
-                         'Aborting...', filepath)
-            infile.Close()
-            sys.exit(3)
-        infile.Close()
+    nevents_orig, nevents_local = get_chunk_events(infile_list,
+                                                   args.entry_range)
 
     LOGGER.info(info_msg)
 
@@ -511,9 +621,19 @@ def run_local(rdf_module, infile_list, args):
     LOGGER.info('Output file path:\n%s', outfile_path)
 
     # Run RDF
+    if args.trace:
+        start_tracing()
+    if args.bench and ROOT.FCCAnalyses.Timers.compiled():
+        ROOT.FCCAnalyses.Timers.reset()
+    start_memory_monitor()
     start_time = time.time()
     inn, outn = run_rdf(rdf_module, file_list, outfile_path, args)
     elapsed_time = time.time() - start_time
+    peak_memory = stop_memory_monitor()
+    first_entry_time = -1.
+    if ROOT.FCCAnalyses.MemoryMonitor.get_first_entry_time() >= 0.:
+        first_entry_time = start_time - START_TIME + \
+            ROOT.FCCAnalyses.MemoryMonitor.get_first_entry_time()
     
     # replace nevents_local by inn = the amount of processed events
 
@@ -524,6 +644,9 @@ def run_local(rdf_module, infile_list, args):
     info_msg += f'{int(inn/elapsed_time):,}'
     info_msg += f'\nTotal events processed:  {int(inn):,}'
     info_msg += f'\nNo. result events:       {int(outn):,}'
+    info_msg += f'\nPeak memory (RSS):       {format_bytes(peak_memory)}'
+    if args.bench and first_entry_time >= 0.:
+        info_msg += f'\nTime to first event:     {first_entry_time:.2f} s'
     if inn > 0:
         info_msg += f'\nReduction factor local:  {outn/inn}'
     if nevents_orig > 0:
@@ -533,6 +656,15 @@ def run_local(rdf_module, infile_list, args):
     info_msg += '\n'
     LOGGER.info(info_msg)
 
+    if args.profile:
+        save_profile_report(args.profile)
+    if args.graph_timing:
+        generate_timing_graph(args)
+    if args.trace:
+        save_trace(args.trace)
+    if args.column_sizes:
+        log_column_sizes()
+
     # Update resulting root file with number of processed events
     # and number of selected events
     with ROOT.TFile(outfile_path, 'update') as outfile:
@@ -544,6 +676,11 @@ def run_local(rdf_module, infile_list, args):
         param.Write()
         outfile.Write()
 
+    # Record what the output was produced from, batch outputs are copied to
+    # their final destination afterwards
+    if not args.batch:
+        save_manifest(outfile_path, manifest)
+
     if args.bench:
         analysis_name = get_element(rdf_module, 'analysisName')
         if not analysis_name:
@@ -567,6 +704,184 @@ def run_local(rdf_module, infile_list, args):
         bench_time['extra'] = 'Analysis path: ' + args.anascript_path
         save_benchmark('benchmarks_bigger_better.json', bench_evt_per_sec)
 
+        if first_entry_time >= 0.:
+            bench_first_entry = {}
+            bench_first_entry['name'] = 'Time to first event: '
+            bench_first_entry['name'] += analysis_name
+            bench_first_entry['unit'] = 'Seconds'
+            bench_first_entry['value'] = first_entry_time
+            bench_first_entry['range'] = 10
+            bench_first_entry['extra'] = 'C++ module: '
+            bench_first_entry['extra'] += 'yes' if args.cxx_module else 'no'
+            save_benchmark('benchmarks_smaller_better.json',
+                           bench_first_entry)
+
+        bench_memory = {}
+        bench_memory['name'] = 'Peak memory: ' + analysis_name
+        bench_memory['unit'] = 'MB'
+        bench_memory['value'] = peak_memory / 1024**2
+        bench_memory['range'] = 100
+        bench_memory['extra'] = 'Analysis path: ' + args.anascript_path
+        save_benchmark('benchmarks_smaller_better.json', bench_memory)
+
+        # Memory allocated per event by the RVec-valued columns
+        for size in get_column_sizes():
+            bench_column = {}
+            bench_column['name'] = 'Bytes allocated per event in column '
+            bench_column['name'] += f'{size["name"]}: {analysis_name}'
+            bench_column['unit'] = 'B/evt'
+            bench_column['value'] = size['bytes_per_event']
+            bench_column['range'] = 100
+            bench_column['extra'] = f'Events: {size["calls"]}'
+            save_benchmark('benchmarks_smaller_better.json', bench_column)
+
+        # Time spent in the instrumented analyzers
+        for timer in get_analyzer_timers():
+            bench_timer = {}
+            bench_timer['name'] = f'Time spent in {timer["name"]}: '
+            bench_timer['name'] += analysis_name
+            bench_timer['unit'] = 'Seconds'
+            bench_timer['value'] = timer['time']
+            bench_timer['range'] = 10
+            bench_timer['extra'] = f'Calls: {timer["calls"]}'
+            for counter, count in timer['counts'].items():
+                bench_timer['extra'] += f', {counter}: {count}'
+            save_benchmark('benchmarks_smaller_better.json', bench_timer)
+
+
+# _____________________________________________________________________________
+def run_chunk_subprocess(cmd: list[str], log_path: str) -> int:
+    '''
+    Run one chunk of the analysis in a separate process.
+    '''
+    with open(log_path, 'w', encoding='utf-8') as logfile:
+        with subprocess.Popen(cmd, stdout=logfile,
+                              stderr=subprocess.STDOUT) as proc:
+            return proc.wait()
+
+
+# _____________________________________________________________________________
+def get_chunk_path(path: str, index: int) -> str:
+    '''
+    Get path of the report of the chunk, e.g. profile.chunk3.json.
+    '''
+    stem, ext = os.path.splitext(path)
+    return f'{stem}.chunk{index}{ext}'
+
+
+# _____________________________________________________________________________
+def run_local_workers(args, rdf_module, chunk_list: list[dict],
+                      output_stem: str, anapath: str,
+                      chunk_indices: list[int]):
+    '''
+    Run chunks with provided indices locally in a pool of processes. The
+    thread budget is divided among the workers and the chunks with most
+    events are started first.
+    '''
+    n_workers = min(args.local_workers, len(chunk_indices))
+    n_threads = 1
+    if ROOT.IsImplicitMTEnabled():
+        n_threads = ROOT.GetThreadPoolSize()
+    n_threads_worker = max(1, n_threads // n_workers)
+    LOGGER.info('Running %i chunks in %i local workers with %i thread(s) '
+                'each...', len(chunk_indices), n_workers, n_threads_worker)
+
+    output_dir = get_element(rdf_module, "outputDir")
+    order = sorted(chunk_indices,
+                   key=lambda i: chunk_list[i]['nevents'], reverse=True)
+    with concurrent.futures.ThreadPoolExecutor(n_workers) as executor:
+        futures = {}
+        for index in order:
+            chunk = chunk_list[index]
+            output_path = f'{output_stem}/chunk{index}.root'
+            cmd = [sys.executable, os.path.abspath(sys.argv[0]),
+                   'run', anapath,
+                   '--output', output_path,
+                   '--ncpus', str(n_threads_worker)]
+            if args.nevents > 0:
+                cmd += ['--nevents', str(args.nevents)]
+            if chunk['entry_range'] is not None:
+                cmd += ['--entry-range', str(chunk['entry_range'][0]),
+                        str(chunk['entry_range'][1])]
+            if args.memory_plan is not None:
+                cmd += ['--memory-plan', args.memory_plan]
+            if args.tasks_per_worker is not None:
+                cmd += ['--tasks-per-worker', str(args.tasks_per_worker)]
+            if args.aot_compile:
+                cmd += ['--aot-compile']
+            if args.bench:
+                cmd += ['--bench']
+            if args.profile:
+                cmd += ['--profile', get_chunk_path(args.profile, index)]
+            if args.trace:
+                cmd += ['--trace', get_chunk_path(args.trace, index)]
+            if args.column_sizes:
+                cmd += ['--column-sizes']
+            cmd += args.unknown
+            cmd += ['--files-list'] + list(chunk['files'])
+
+            log_path = os.path.join(output_dir, output_stem,
+                                    f'chunk{index}.log')
+            LOGGER.debug('Starting chunk %i:\n%s', index, ' '.join(cmd))
+            futures[executor.submit(run_chunk_subprocess, cmd, log_path)] = \
+                (index, log_path)
+
+        failed_chunks = []
+        for future in concurrent.futures.as_completed(futures):
+            index, log_path = futures[future]
+            if future.result() != 0:
+                LOGGER.error('Chunk %i failed! See the log file:\n%s',
+                             index, log_path)
+                failed_chunks.append(index)
+            else:
+                LOGGER.info('Chunk %i done.', index)
+
+    if failed_chunks:
+        LOGGER.error('%i chunk(s) failed!\nAborting...', len(failed_chunks))
+        sys.exit(3)
+
+
+# _____________________________________________________________________________
+def plan_stage(args, rdf_module):
+    '''
+    Estimate cost of the stage from a sample of events of every process and
+    propose number of chunks of every process.
+    '''
+    if args.target_walltime <= 0.:
+        LOGGER.error('Target walltime needs to be positive!\nAborting...')
+        sys.exit(3)
+
+    # Batch jobs run with the threads of the analysis script
+    nthreads = args.ncpus
+    if not isinstance(nthreads, int) or nthreads < 1:
+        nthreads = get_job_ncpus(rdf_module)
+
+    process_list = get_element(rdf_module, 'processList')
+    projections = {}
+    for process_name in process_list:
+        file_list, event_list = get_process_info(
+            process_name,
+            get_element(rdf_module, "prodTag"),
+            get_element(rdf_module, "inputDir"))
+        if len(file_list) <= 0:
+            LOGGER.error('No files to process!\nAborting...')
+            sys.exit(3)
+
+        fraction = get_element_dict(process_list[process_name], 'fraction')
+        if fraction is not None and fraction < 1:
+            file_list = get_subfile_list(file_list, event_list, fraction)
+            event_list = event_list[:len(file_list)]
+
+        calibration = run_calibration(
+            rdf_module, apply_filepath_rewrites(file_list[0]),
+            args.plan_events)
+        projections[process_name] = project_process(
+            sum(event_list), calibration, nthreads,
+            args.target_walltime * 3600.)
+
+    log_stage_plan(projections, nthreads)
+    save_stage_plan(args.plan, process_list, projections)
+
 
 # _____________________________________________________________________________
 def run_stages(args, rdf_module, anapath):
@@ -577,6 +892,11 @@ def run_stages(args, rdf_module, anapath):
     # Set ncpus, load header files, custom dicts, ...
     initialize(args, rdf_module, anapath)
 
+    # Estimate cost of the stage without running it (this will exit after)
+    if args.plan is not None:
+        plan_stage(args, rdf_module)
+        sys.exit(0)
+
     # Check if outputDir exist and if not create it
     output_dir = get_element(rdf_module, "outputDir")
     if not os.path.exists(output_dir) and output_dir:
@@ -610,9 +930,6 @@ def run_stages(args, rdf_module, anapath):
 
     # Check if batch mode is available
     run_batch = get_element(rdf_module, 'runBatch')
-    if run_batch and shutil.which('condor_q') is None:
-        LOGGER.error('HTCondor tools can\'t be found!\nAborting...')
-        sys.exit(3)
 
     # Check if the process list is specified
     process_list = get_element(rdf_module, 'processList')
@@ -651,10 +968,13 @@ def run_stages(args, rdf_module, anapath):
 
         if fraction < 1:
             file_list = get_subfile_list(file_list, event_list, fraction)
+            event_list = event_list[:len(file_list)]
 
-        chunk_list = [file_list]
+        chunk_list = [{'files': file_list,
+                       'entry_range': None,
+                       'nevents': sum(event_list)}]
         if chunks > 1:
-            chunk_list = get_chunk_list(file_list, chunks)
+            chunk_list = get_chunk_list(file_list, event_list, chunks)
         LOGGER.info('Number of the output files: %s', f'{len(chunk_list):,}')
 
         # Create directory if more than 1 chunk
@@ -676,20 +996,138 @@ def run_stages(args, rdf_module, anapath):
         else:
             # Running locally
             LOGGER.info('Running locally...')
-            if len(chunk_list) == 1:
-                args.output = f'{output_stem}.root'
-                run_local(rdf_module, chunk_list[0], args)
+            output_paths = [f'{output_stem}.root']
+            if len(chunk_list) > 1:
+                output_paths = [f'{output_stem}/chunk{index}.root'
+                                for index in range(len(chunk_list))]
+
+            # Skip the chunks whose outputs are up-to-date
+            chunk_indices = []
+            for index, chunk in enumerate(chunk_list):
+                manifest = get_manifest(anapath, chunk['files'],
+                                        chunk['entry_range'], args.nevents,
+                                        get_element(rdf_module,
+                                                    'includePaths'))
+                if not args.force and is_up_to_date(
+                        os.path.join(output_dir, output_paths[index]),
+                        manifest):
+                    LOGGER.info('Output "%s" is up-to-date, skipping it...',
+                                output_paths[index])
+                    continue
+                chunk_indices.append(index)
+
+            if args.local_workers > 1 and len(chunk_indices) > 1:
+                run_local_workers(args, rdf_module, chunk_list, output_stem,
+                                  anapath, chunk_indices)
+            else:
+                for index in chunk_indices:
+                    args.output = output_paths[index]
+                    args.entry_range = chunk_list[index]['entry_range']
+                    run_local(rdf_module, chunk_list[index]['files'], args)
+
+
+# _____________________________________________________________________________
+def book_histmaker_graph(graph_function, process: str, chunk: dict,
+                         n_replicas: int, bootstrap_seed: int,
+                         profile: bool = False, trace: bool = False,
+                         sized: bool = False,
+                         mark_first_entry: bool = False) -> tuple:
+    '''
+    Book histmaker graph of the process over the slice of the input files.
+    '''
+    file_list_root = ROOT.vector('string')()
+    for file_name in chunk['files']:
+        file_list_root.push_back(file_name)
+
+    dframe = create_dataframe(file_list_root, chunk['entry_range'])
+    if trace:
+        dframe = trace_dataframe(dframe, process)
+    evtcount = dframe.Count()
+
+    # Record time of the first entry
+    if mark_first_entry:
+        dframe = dframe.Filter(
+            'FCCAnalyses::MemoryMonitor::mark_first_entry()')
+
+    n_variations = len(REGISTERED_VARIATIONS)
+    if n_replicas > 0:
+        # Entry numbers are global in the chain of the input files when the
+        # entry range is restricted or when running single-threaded
+        offsets = None
+        if chunk['entry_range'] is not None or \
+                not ROOT.ROOT.IsImplicitMTEnabled():
+            entries = [metadata['entries'] or 0
+                       for metadata in get_files_metadata(chunk['files'])]
+            offsets = [0] + list(itertools.accumulate(entries))[:-1]
+        dframe = define_bootstrap(dframe, n_replicas, bootstrap_seed,
+                                  offsets)
+
+    if profile:
+        res, hweight = graph_function(
+            ProfiledNode(dframe, process, sized=sized), process)
+    else:
+        res, hweight = graph_function(dframe, process)
+    # Book also all systematic variations registered in the graph, they
+    # are filled in the same event loop. VariationsFor jits the graph right
+    # away, so it's used only when needed
+    if len(REGISTERED_VARIATIONS) > n_variations:
+        res = [ROOT.RDF.Experimental.VariationsFor(r) for r in res]
+        hweight = ROOT.RDF.Experimental.VariationsFor(hweight)
+
+    return dframe, res, hweight, evtcount
+
+
+# _____________________________________________________________________________
+def accumulate_histmaker_results(accumulated: dict | None, res: list,
+                                 hweight, evtcount,
+                                 n_replicas: int) -> dict:
+    '''
+    Add results of the histmaker graph to the results accumulated from the
+    previous slices of the input.
+    '''
+    if accumulated is None:
+        accumulated = {'hists': {}, 'sum_of_weights': {}, 'nevents': 0}
+        for r in res:
+            variations = get_variations(r)
+            if n_replicas > 0 and \
+                    not any(k.startswith('bootstrap:') for k in variations):
+                LOGGER.warning('Histogram "%s" is not weighted by the '
+                               '"bootstrap_weight" column, no bootstrap '
+                               'replicas will be saved for it',
+                               variations['nominal'].GetName())
+
+    hists = accumulated['hists']
+    for r in res:
+        for variation_key, hist in get_variations(r).items():
+            hname = hist.GetName() + get_variation_suffix(variation_key)
+            # merge histograms in case histogram exists
+            if hname in hists:
+                hists[hname].Add(hist)
             else:
-                for index, chunk in enumerate(chunk_list):
-                    args.output = f'{output_stem}/chunk{index}.root'
-                    run_local(rdf_module, chunk, args)
+                hists[hname] = hist.Clone(hname)
+                hists[hname].SetDirectory(0)
+
+    for variation_key, weight in get_variations(hweight).items():
+        suffix = get_variation_suffix(variation_key)
+        accumulated['sum_of_weights'][suffix] = \
+            accumulated['sum_of_weights'].get(suffix, 0.) + weight
 
+    accumulated['nevents'] += evtcount.GetValue()
 
+    return accumulated
+
+
+# _____________________________________________________________________________
 def run_histmaker(args, rdf_module, anapath):
     '''
     Run the analysis using histmaker (all stages integrated into one).
     '''
 
+    if args.plan is not None:
+        LOGGER.error('Planning is available only for the analysis stages!\n'
+                     'Aborting...')
+        sys.exit(3)
+
     # set ncpus, load header files, custom dicts, ...
     initialize(args, rdf_module, anapath)
 
@@ -708,13 +1146,18 @@ def run_histmaker(args, rdf_module, anapath):
 
     do_scale = get_element(rdf_module, "doScale", True)
     int_lumi = get_element(rdf_module, "intLumi", True)
+    n_replicas = get_element(rdf_module, "bootstrapReplicas", True)
+    bootstrap_seed = get_element(rdf_module, "bootstrapSeed", True)
+    if n_replicas > 0:
+        LOGGER.info('Filling %i bootstrap replicas of the histograms',
+                    n_replicas)
 
     # check if the process list is specified, and create graphs for them
     process_list = get_element(rdf_module, "processList")
     graph_function = getattr(rdf_module, "build_graph")
-    results = []  # all the histograms
-    hweights = []  # all the weights
-    evtcounts = []  # event count of the input file
+    # slices of the input files per process, with checkpointing enabled the
+    # partial results are saved after each slice
+    slices = {}
     # number of events processed per process, in a potential previous step
     events_processed_dict = {}
     for process in process_list:
@@ -741,55 +1184,105 @@ def run_histmaker(args, rdf_module, anapath):
         if fraction < 1:
             file_list = get_subfile_list(file_list, event_list, fraction)
 
-        # get the number of events processed, in a potential previous step
-        file_list_root = ROOT.vector('string')()
         # amount of events processed in previous stage (= 0 if it is the first
         # stage)
         nevents_meta = 0
-        for file_name in file_list:
-            file_name = apply_filepath_rewrites(file_name)
-            file_list_root.push_back(file_name)
-            # Skip check for processed events in case of first stage
-            if get_element(rdf_module, "prodTag") is None:
-                infile = ROOT.TFile.Open(str(file_name), 'READ')
-                for key in infile.GetListOfKeys():
-                    if 'eventsProcessed' == key.GetName():
-                        nevents_meta += infile.eventsProcessed.GetVal()
-                        break
-                infile.Close()
-            if args.test:
-                break
+        file_list = [apply_filepath_rewrites(f) for f in file_list]
+        if args.test:
+            file_list = file_list[:1]
+        event_list = event_list[:len(file_list)]
+        # Skip check for processed events in case of first stage
+        if get_element(rdf_module, "prodTag") is None:
+            for metadata in get_files_metadata(file_list):
+                nevents_meta += metadata['eventsProcessed']
         events_processed_dict[process] = nevents_meta
         info_msg = f'Add process "{process}" with:'
         info_msg += f'\n\tfraction = {fraction}'
-        info_msg += f'\n\tnFiles = {len(file_list_root):,}'
+        info_msg += f'\n\tnFiles = {len(file_list):,}'
         info_msg += f'\n\toutput = {output}\n\tchunks = {chunks}'
         LOGGER.info(info_msg)
 
-        dframe = ROOT.ROOT.RDataFrame("events", file_list_root)
-        evtcount = dframe.Count()
-
-        res, hweight = graph_function(dframe, process)
-        results.append(res)
-        hweights.append(hweight)
-        evtcounts.append(evtcount)
+        if args.checkpoint > 0:
+            slices[process] = get_chunk_list(file_list, event_list,
+                                             args.checkpoint)
+        else:
+            slices[process] = [{'files': file_list, 'entry_range': None}]
+
+    # Resume from the checkpoint of the previous run
+    checkpoint_path = os.path.join(
+        output_dir,
+        os.path.splitext(os.path.basename(anapath))[0] + '.checkpoint.root')
+    with open(anapath, 'rb') as anafile:
+        script_hash = hashlib.sha256(anafile.read()).hexdigest()
+    fingerprint = json.dumps(
+        {'script': script_hash,
+         'slices': {process: [[chunk['files'], chunk['entry_range']]
+                              for chunk in chunk_list]
+                    for process, chunk_list in slices.items()}})
+    done = set()
+    accumulated = {}
+    if args.checkpoint > 0:
+        done, accumulated = load_checkpoint(checkpoint_path, fingerprint)
+
+    nslices = max(len(chunk_list) for chunk_list in slices.values())
+    nevents_tot = 0
+    elapsed_time = 0.
+    peak_memory = 0
+    first_entry_time = -1.
+    graph_done = False
+    if args.trace:
+        start_tracing()
+    for islice in range(nslices):
+        if islice in done:
+            continue
+
+        graphs = {}
+        with trace_phase('booking'):
+            for process, chunk_list in slices.items():
+                if islice < len(chunk_list):
+                    graphs[process] = book_histmaker_graph(
+                        graph_function, process, chunk_list[islice],
+                        n_replicas, bootstrap_seed,
+                        bool(args.profile or args.graph_timing or
+                             args.column_sizes),
+                        bool(args.trace), args.column_sizes,
+                        bool(args.bench) and first_entry_time < 0.)
 
-    # Generate computational graph of the analysis
-    if args.graph:
-        generate_graph(dframe, args)
+        # Generate computational graph of the analysis
+        if args.graph and not graph_done:
+            generate_graph(list(graphs.values())[-1][0], args)
+            graph_done = True
 
-    LOGGER.info('Starting the event loop...')
-    start_time = time.time()
-    ROOT.ROOT.RDF.RunGraphs(evtcounts)
-    LOGGER.info('Event loop done!')
-    elapsed_time = time.time() - start_time
+        if nslices > 1:
+            LOGGER.info('Starting the event loop over slice %i/%i...',
+                        islice + 1, nslices)
+        else:
+            LOGGER.info('Starting the event loop...')
+        start_memory_monitor()
+        start_time = time.time()
+        with trace_phase('event loop'):
+            ROOT.ROOT.RDF.RunGraphs([graph[3] for graph in graphs.values()])
+        LOGGER.info('Event loop done!')
+        elapsed_time += time.time() - start_time
+        peak_memory = max(peak_memory, stop_memory_monitor())
+        if first_entry_time < 0. and \
+                ROOT.FCCAnalyses.MemoryMonitor.get_first_entry_time() >= 0.:
+            first_entry_time = start_time - START_TIME + \
+                ROOT.FCCAnalyses.MemoryMonitor.get_first_entry_time()
+
+        for process, (_, res, hweight, evtcount) in graphs.items():
+            accumulated[process] = accumulate_histmaker_results(
+                accumulated.get(process), res, hweight, evtcount, n_replicas)
+            nevents_tot += evtcount.GetValue()
+        done.add(islice)
+
+        if args.checkpoint > 0 and len(done) < nslices:
+            with trace_phase('checkpoint'):
+                save_checkpoint(checkpoint_path, fingerprint, done,
+                                accumulated)
 
     LOGGER.info('Writing out output files...')
-    nevents_tot = 0
-    for process, res, hweight, evtcount in zip(process_list,
-                                               results,
-                                               hweights,
-                                               evtcounts):
+    for process in process_list:
         # get the cross-sections etc. First try locally, then the procDict
         if 'crossSection' in process_list[process]:
             cross_section = process_list[process]['crossSection']
@@ -816,26 +1309,15 @@ def run_histmaker(args, rdf_module, anapath):
         else:
             matching_efficiency = 1
 
+        nevents = accumulated[process]['nevents']
         events_processed = events_processed_dict[process] \
-            if events_processed_dict[process] != 0 else evtcount.GetValue()
+            if events_processed_dict[process] != 0 else nevents
         scale = cross_section*kfactor*matching_efficiency/events_processed
 
-        nevents_tot += evtcount.GetValue()
-
-        hists_to_write = {}
-        for r in res:
-            hist = r.GetValue()
-            hname = hist.GetName()
-            # merge histograms in case histogram exists
-            if hist.GetName() in hists_to_write:
-                hists_to_write[hname].Add(hist)
-            else:
-                hists_to_write[hname] = hist
-
         LOGGER.info('Writing out process %s, nEvents processed %s',
-                    process, f'{evtcount.GetValue():,}')
+                    process, f'{nevents:,}')
         with ROOT.TFile(f'{output_dir}/{process}.root', 'RECREATE'):
-            for hist in hists_to_write.values():
+            for hist in accumulated[process]['hists'].values():
                 if do_scale:
                     hist.Scale(scale * int_lumi)
                 hist.Write()
@@ -843,8 +1325,11 @@ def run_histmaker(args, rdf_module, anapath):
             # write all meta info to the output file
             p = ROOT.TParameter(int)("eventsProcessed", events_processed)
             p.Write()
-            p = ROOT.TParameter(float)("sumOfWeights", hweight.GetValue())
-            p.Write()
+            for suffix, sum_of_weights in \
+                    accumulated[process]['sum_of_weights'].items():
+                p = ROOT.TParameter(float)("sumOfWeights" + suffix,
+                                           sum_of_weights)
+                p.Write()
             p = ROOT.TParameter(float)("intLumi", int_lumi)
             p.Write()
             p = ROOT.TParameter(float)("crossSection", cross_section)
@@ -855,12 +1340,28 @@ def run_histmaker(args, rdf_module, anapath):
                                        matching_efficiency)
             p.Write()
 
+    if args.profile:
+        save_profile_report(args.profile)
+    if args.graph_timing:
+        generate_timing_graph(args)
+    if args.trace:
+        save_trace(args.trace)
+    if args.column_sizes:
+        log_column_sizes()
+
+    # Outputs are complete, the checkpoint is not needed anymore
+    if os.path.isfile(checkpoint_path):
+        os.remove(checkpoint_path)
+
     info_msg = f"{' SUMMARY ':=^80}\n"
     info_msg += 'Elapsed time (H:M:S):    '
     info_msg += time.strftime('%H:%M:%S', time.gmtime(elapsed_time))
     info_msg += '\nEvents processed/second: '
-    info_msg += f'{int(nevents_tot/elapsed_time):,}'
+    info_msg += f'{int(nevents_tot/elapsed_time) if elapsed_time > 0 else 0:,}'
     info_msg += f'\nTotal events processed:  {nevents_tot:,}'
+    info_msg += f'\nPeak memory (RSS):       {format_bytes(peak_memory)}'
+    if args.bench and first_entry_time >= 0.:
+        info_msg += f'\nTime to first event:     {first_entry_time:.2f} s'
     info_msg += '\n'
     info_msg += 80 * '='
     info_msg += '\n'
@@ -919,6 +1420,7 @@ def run(parser):
     # Load pre compiled analyzers
     LOGGER.info('Loading analyzers from libFCCAnalyses...')
     ROOT.gSystem.Load("libFCCAnalyses")
+    args.cxx_module = load_cxx_module()
     # Is this still needed?? 01/04/2022 still to be the case
     fcc_loaded = ROOT.dummyLoader()
     if fcc_loaded:
@@ -932,6 +1434,12 @@ def run(parser):
     rdf_module = importlib.util.module_from_spec(rdf_spec)
     rdf_spec.loader.exec_module(rdf_module)
 
+    # Load analyzers with heavy dependencies only when referenced
+    include_paths = get_element(rdf_module, 'includePaths') or []
+    load_referenced_analyzers(
+        [anapath] + [os.path.join(os.path.dirname(anapath), path)
+                     for path in include_paths])
+
     # Merge configuration from analysis script file with command line arguments
     if get_element(rdf_module, 'graph'):
         args.graph = True
@@ -939,6 +1447,9 @@ def run(parser):
     if get_element(rdf_module, 'graphPath') != '':
         args.graph_path = get_element(rdf_module, 'graphPath')
 
+    if get_element(rdf_module, 'aotCompile'):
+        args.aot_compile = True
+
     n_ana_styles = 0
     for analysis_style in ["build_graph", "RDFanalysis", "Analysis"]:
         if hasattr(rdf_module, analysis_style):
@@ -10,12 +10,12 @@ import json
 import logging
 import subprocess
 import datetime
-import numpy as np
 
 import ROOT  # type: ignore
 from anascript import get_element, get_element_dict, get_attribute
-from process import get_process_info
-from frame import generate_graph
+from process import get_process_info, get_chunk_list, get_chunk_events
+from frame import generate_graph, create_dataframe
+from libraries import load_analyzers
 
 LOGGER = logging.getLogger('FCCAnalyses.run')
 
@@ -100,7 +100,7 @@ def create_subjob_script(local_dir: str,
                          analysis,
                          process_name: str,
                          chunk_num: int,
-                         chunk_list: list[list[str]],
+                         chunk_list: list[dict],
                          anapath: str,
                          cmd_args) -> str:
     '''
@@ -136,12 +136,15 @@ def create_subjob_script(local_dir: str,
     scr += local_dir
     scr += f'/bin/fccanalysis run {anapath} --batch'
     scr += f' --output {output_path}'
-    if cmd_args.ncpus > 0:
+    if isinstance(cmd_args.ncpus, int) and cmd_args.ncpus > 0:
         scr += f' --ncpus {cmd_args.ncpus}'
     if len(cmd_args.unknown) > 0:
         scr += ' ' + ' '.join(cmd_args.unknown)
+    entry_range = chunk_list[chunk_num]['entry_range']
+    if entry_range is not None:
+        scr += f' --entry-range {entry_range[0]} {entry_range[1]}'
     scr += ' --files-list'
-    for file_path in chunk_list[chunk_num]:
+    for file_path in chunk_list[chunk_num]['files']:
         scr += f' {file_path}'
     scr += '\n\n'
 
@@ -199,15 +202,6 @@ def get_subfile_list(in_file_list: list[str],
     return out_file_list
 
 
-# _____________________________________________________________________________
-def get_chunk_list(file_list: str, chunks: int):
-    '''
-    Get list of input file paths arranged into chunks.
-    '''
-    chunk_list = list(np.array_split(file_list, chunks))
-    return [chunk for chunk in chunk_list if chunk.size > 0]
-
-
 # _____________________________________________________________________________
 def save_benchmark(outfile, benchmark):
     '''
@@ -267,6 +261,7 @@ def initialize(args, analysis):
     readout_name = get_attribute(analysis, 'readout_name', None)
 
     if geometry_file is not None and readout_name is not None:
+        load_analyzers('CaloNtupleizer')
         ROOT.CaloNtupleizer.loadGeometry(geometry_file, readout_name)
 
     # set multithreading (no MT if number of events is specified)
@@ -275,6 +270,10 @@ def initialize(args, analysis):
         if isinstance(args.ncpus, int) and args.ncpus >= 1:
             n_threads = args.ncpus
         else:
+            if args.ncpus == 'auto':
+                LOGGER.warning('Automatic number of threads is not '
+                               'supported for the analysis class, using '
+                               '"n_threads"...')
             n_threads = get_attribute(analysis, "n_threads", 1)
         if n_threads < 0:  # use all available threads
             ROOT.EnableImplicitMT()
@@ -309,7 +308,7 @@ def run_rdf(args,
     Run the analysis ROOTDataFrame and snapshot it.
     '''
     # Create initial dataframe
-    dframe = ROOT.RDataFrame("events", input_list)
+    dframe = create_dataframe(input_list, args.entry_range)
 
     # Limit number of events processed
     if args.nevents > 0:
@@ -463,30 +462,13 @@ def run_local(args, analysis, infile_list):
     info_msg = 'Creating dataframe object from files:\n'
     file_list = ROOT.vector('string')()
     # Amount of events processed in previous stage (= 0 if it is the first
-    # stage)
-    nevents_orig = 0
-    # The amount of events in the input file(s)
-    nevents_local = 0
+    # stage) and the amount of events in the input file(s)
+    infile_list = [apply_filepath_rewrites(f) for f in infile_list]
     for filepath in infile_list:
-
-        filepath = apply_filepath_rewrites(filepath)
-
         file_list.push_back(filepath)
         info_msg += f'- {filepath}\t\n'
-        infile = ROOT.TFile.Open(filepath, 'READ')
-        try:
-            nevents_orig += infile.Get('eventsProcessed').GetVal()
-        except AttributeError:
-            pass
-
-        try:
-            nevents_local += infile.Get("events").GetEntries()
-        except AttributeError:
-            LOGGER.error('Input file:\n%s\nis missing events TTree!\n'
-                         'Aborting...', filepath)
-            infile.Close()
-            sys.exit(3)
-        infile.Close()
+    nevents_orig, nevents_local = get_chunk_events(infile_list,
+                                                   args.entry_range)
 
     LOGGER.info(info_msg)
 
@@ -573,6 +555,23 @@ def run_fccanalysis(args, analysis_module):
     Run analysis of style "Analysis".
     '''
 
+    # Options implemented only for the other analysis styles
+    unsupported = {'--local-workers': args.local_workers > 1,
+                   '--plan': args.plan,
+                   '--memory-limit': args.memory_limit,
+                   '--checkpoint': args.checkpoint,
+                   '--force': args.force,
+                   '--profile': args.profile,
+                   '--trace': args.trace,
+                   '--column-sizes': args.column_sizes,
+                   '--graph-timing': args.graph_timing,
+                   '--aot-compile': args.aot_compile}
+    for option, used in unsupported.items():
+        if used:
+            LOGGER.error('Option "%s" is not supported for the analysis '
+                         'class!\nAborting...', option)
+            sys.exit(3)
+
     # Get analysis class out of the module
     analysis_args = vars(args)
     analysis = analysis_module.Analysis(analysis_args)
@@ -663,10 +662,13 @@ def run_fccanalysis(args, analysis_module):
 
         if fraction < 1:
             file_list = get_subfile_list(file_list, event_list, fraction)
+            event_list = event_list[:len(file_list)]
 
-        chunk_list = [file_list]
+        chunk_list = [{'files': file_list,
+                       'entry_range': None,
+                       'nevents': sum(event_list)}]
         if chunks > 1:
-            chunk_list = get_chunk_list(file_list, chunks)
+            chunk_list = get_chunk_list(file_list, event_list, chunks)
         LOGGER.info('Number of the output files: %s', f'{len(chunk_list):,}')
 
         # Create directory if more than 1 chunk
@@ -693,11 +695,13 @@ def run_fccanalysis(args, analysis_module):
             LOGGER.info('Running locally...')
             if len(chunk_list) == 1:
                 args.output = f'{output_stem}.root'
-                run_local(args, analysis, chunk_list[0])
+                args.entry_range = chunk_list[0]['entry_range']
+                run_local(args, analysis, chunk_list[0]['files'])
             else:
                 for index, chunk in enumerate(chunk_list):
                     args.output = f'{output_stem}/chunk{index}.root'
-                    run_local(args, analysis, chunk)
+                    args.entry_range = chunk['entry_range']
+                    run_local(args, analysis, chunk['files'])
 
     if len(process_list) == 0:
         LOGGER.warning('No files processed (process_list not found)!\n'
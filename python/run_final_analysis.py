@@ -11,8 +11,19 @@ import importlib.util
 
 import ROOT  # type: ignore
 from anascript import get_element, get_element_dict
-from process import get_process_dict
-from frame import generate_graph
+from process import get_process_dict, get_files_metadata
+from frame import generate_graph, generate_timing_graph
+from cutflow import N_MAX_CUTS, CUT_MASK_COLUMN, define_cut_mask, \
+    filter_cut, filter_n_minus_one, book_cut_flow, get_cut_correlation, \
+    label_cut_flow
+from profiler import PROFILED_NODES, ProfiledNode, profile_expression, \
+    get_node, save_profile_report
+from memory import start_memory_monitor, stop_memory_monitor, \
+    format_bytes, log_column_sizes
+from tracer import start_tracing, trace_dataframe, trace_phase, save_trace
+from cutscan import get_scan_grid, book_cut_scan, get_scan_yields, \
+    write_cut_scan
+from libraries import load_referenced_analyzers
 
 LOGGER = logging.getLogger('FCCAnalyses.run_final')
 
@@ -20,27 +31,23 @@ ROOT.gROOT.SetBatch(True)
 
 
 # _____________________________________________________________________________
-def get_entries(infilepath: str) -> tuple[int, int]:
+def get_entries(infilepaths: list[str]) -> list[tuple[int, int]]:
     '''
-    Get number of original entries and number of actual entries in the file
+    Get number of original entries and number of actual entries in the files
     '''
-    events_processed = 0
-    events_in_ttree = 0
-
-    with ROOT.TFile(infilepath, 'READ') as infile:
-        try:
-            events_processed = infile.Get('eventsProcessed').GetVal()
-        except AttributeError:
-            LOGGER.warning('Input file is missing information about '
-                           'original number of events!')
-
-        try:
-            events_in_ttree = infile.Get("events").GetEntries()
-        except AttributeError:
-            LOGGER.error('Input file is missing "events" TTree!\nAborting...')
+    entries = []
+    for infilepath, metadata in zip(infilepaths,
+                                    get_files_metadata(infilepaths)):
+        if metadata['entries'] is None:
+            LOGGER.error('Input file is missing "events" TTree!\n%s\n'
+                         'Aborting...', infilepath)
             sys.exit(3)
+        if metadata['eventsProcessed'] == 0:
+            LOGGER.warning('Input file is missing information about '
+                           'original number of events!\n%s', infilepath)
+        entries.append((metadata['eventsProcessed'], metadata['entries']))
 
-    return events_processed, events_in_ttree
+    return entries
 
 
 # _____________________________________________________________________________
@@ -70,6 +77,85 @@ def testfile(f: str) -> bool:
     return True
 
 
+# _____________________________________________________________________________
+def book_histograms(df_cut, histo_list: dict) -> list:
+    '''
+    Book histograms from the histoList for the selected dataframe.
+    '''
+    histos = []
+
+    for v in histo_list:
+        # default 1D histogram
+        if "name" in histo_list[v]:
+            model = ROOT.RDF.TH1DModel(
+                v,
+                f';{histo_list[v]["title"]};',
+                histo_list[v]["bin"],
+                histo_list[v]["xmin"],
+                histo_list[v]["xmax"])
+            histos.append(df_cut.Histo1D(model, histo_list[v]["name"]))
+        # multi dim histogram (1, 2 or 3D)
+        elif "cols" in histo_list[v]:
+            cols = histo_list[v]['cols']
+            bins = histo_list[v]['bins']
+            bins_unpacked = tuple(i for sub in bins for i in sub)
+            if len(bins) != len(cols):
+                LOGGER.error('Amount of columns should be equal to '
+                             'the amount of bin configs!\nAborting...')
+                sys.exit(3)
+            if len(cols) == 1:
+                histos.append(df_cut.Histo1D((v, "", *bins_unpacked),
+                                             cols[0]))
+            elif len(cols) == 2:
+                histos.append(df_cut.Histo2D((v, "", *bins_unpacked),
+                                             cols[0],
+                                             cols[1]))
+            elif len(cols) == 3:
+                histos.append(df_cut.Histo3D((v, "", *bins_unpacked),
+                                             cols[0],
+                                             cols[1],
+                                             cols[2]))
+            else:
+                LOGGER.error('Only 1, 2 or 3D histograms supported.')
+                sys.exit(3)
+        else:
+            LOGGER.error('Error parsing the histogram config. Provide '
+                         'either name or cols.')
+            sys.exit(3)
+
+    return histos
+
+
+# _____________________________________________________________________________
+def write_histograms(fhisto: str, histos: list, scale: float | None,
+                     events_processed: int, int_lumi: float,
+                     xsec: float, kfactor: float,
+                     matching_efficiency: float) -> None:
+    '''
+    Write histograms together with the meta info into the output file.
+    '''
+    with ROOT.TFile(fhisto, 'RECREATE'):
+        for h in histos:
+            if scale is not None:
+                h.Scale(scale)
+            h.Write()
+
+        # write all meta info to the output file
+        p = ROOT.TParameter(int)("eventsProcessed", events_processed)
+        p.Write()
+        # take sum of weights=eventsProcessed for now (assume weights==1)
+        p = ROOT.TParameter(float)("sumOfWeights", events_processed)
+        p.Write()
+        p = ROOT.TParameter(float)("intLumi", int_lumi)
+        p.Write()
+        p = ROOT.TParameter(float)("crossSection", xsec)
+        p.Write()
+        p = ROOT.TParameter(float)("kfactor", kfactor)
+        p.Write()
+        p = ROOT.TParameter(float)("matchingEfficiency", matching_efficiency)
+        p.Write()
+
+
 # __________________________________________________________
 def run(rdf_module, args):
     '''
@@ -145,7 +231,9 @@ def run(rdf_module, args):
 
     process_list = get_element(rdf_module, "processList", {})
     if len(process_list) == 0:
-        files = glob.glob(f"{input_dir}/*")
+        # Only the output files and directories of the previous stage
+        files = [path for path in glob.glob(f"{input_dir}/*")
+                 if path.endswith('.root') or os.path.isdir(path)]
         process_list = [os.path.basename(file.replace(".root", "")) for file in files]
         info_msg = f"Found {len(process_list)} processes in the input directory:"
         for process_name in process_list:
@@ -164,17 +252,16 @@ def run(rdf_module, args):
         else:
             LOGGER.info('Open file:\n\t%s', infilepath)
             process_events[process_name], events_ttree[process_name] = \
-                get_entries(infilepath)
+                get_entries([infilepath])[0]
             file_list[process_name].push_back(infilepath)
 
         indirpath = input_dir + process_name
         if os.path.isdir(indirpath):
             info_msg = f'Open directory {indirpath}'
             flist = glob.glob(indirpath + '/chunk*.root')
-            for filepath in flist:
+            for filepath, (chunk_process_events, chunk_events_ttree) in \
+                    zip(flist, get_entries(flist)):
                 info_msg += '\n\t' + filepath
-                chunk_process_events, chunk_events_ttree = \
-                    get_entries(filepath)
                 process_events[process_name] += chunk_process_events
                 events_ttree[process_name] += chunk_events_ttree
                 file_list[process_name].push_back(filepath)
@@ -194,8 +281,33 @@ def run(rdf_module, args):
     int_lumi = get_element(rdf_module, "intLumi", True)
 
     do_tree = get_element(rdf_module, "doTree", True)
+    define_list = get_element(rdf_module, "defineList", True)
+    save_cut_flow = get_element(rdf_module, "saveCutFlow", True)
+    do_n_minus_one = get_element(rdf_module, "doNMinusOne", True)
+
+    # Yields for all points of the cut scan are filled in the same event loop
+    scan_grid = get_scan_grid(get_element(rdf_module, "cutScan", True))
+    scan_signal = get_element(rdf_module, "scanSignal", True)
+    scan_yields = {}
+    if scan_grid and not any(p in process_list for p in scan_signal):
+        LOGGER.error('None of the signal processes of the cut scan is in the '
+                     'process list!\nAborting...')
+        sys.exit(3)
+
+    # All cuts are evaluated only once per event and stored in the bit mask
+    use_cut_mask = 0 < len(cut_list) <= N_MAX_CUTS
+    if len(cut_list) > N_MAX_CUTS:
+        LOGGER.warning('Number of cuts exceeds %i, cuts will be evaluated '
+                       'separately.\nCut-flows and N-1 histograms will not '
+                       'be produced!', N_MAX_CUTS)
+
+    # Book computational graphs of all processes, they will be run together
+    # in one go
+    if args.trace:
+        start_tracing()
+    graphs = {}
     for process_name in process_list:
-        LOGGER.info('Running over process: %s', process_name)
+        LOGGER.info('Booking process: %s', process_name)
 
         if process_events[process_name] == 0:
             LOGGER.error('Can\'t scale histograms, the number of processed '
@@ -204,92 +316,69 @@ def run(rdf_module, args):
             sys.exit(3)
 
         df = ROOT.ROOT.RDataFrame("events", file_list[process_name])
-        define_list = get_element(rdf_module, "defineList", True)
+        if args.trace:
+            df = trace_dataframe(df, process_name)
+        profile = args.profile or args.graph_timing or args.column_sizes
+        if profile:
+            df = ProfiledNode(df, process_name, sized=args.column_sizes)
         if len(define_list) > 0:
-            LOGGER.info('Registering extra DataFrame defines...')
+            LOGGER.debug('Registering extra DataFrame defines...')
             for define in define_list:
                 df = df.Define(define, define_list[define])
 
         fout_list = []
         histos_list = []
+        n_minus_one_list = []
         tdf_list = []
         count_list = []
-        cuts_list = []
-        cuts_list.append(process_name)
-        eff_list = []
-        eff_list.append(process_name)
-        
-        # get process information from prodDict
-        try:
-            xsec = process_dict[process_name]["crossSection"]
-            kfactor = process_dict[process_name]["kfactor"]
-            matchingEfficiency = process_dict[process_name]["matchingEfficiency"]
-        except KeyError:
-            xsec = 1.0
-            kfactor = 1.0
-            matchingEfficiency = 1.0
-            LOGGER.error(
-                f'No value defined for process {process_name} in dictionary!')
-        gen_sf = xsec*kfactor*matchingEfficiency
+        cut_flow = {}
+        cut_scan = None
+        snapshot_columns = ""
+        if scan_grid:
+            cut_scan = book_cut_scan(df, scan_grid)
+        if use_cut_mask:
+            if profile:
+                # Cuts evaluated together in the mask are profiled one by one
+                nnodes = len(PROFILED_NODES)
+                profiled_cuts = {
+                    cut_name: profile_expression(cut_definition, 'Filter',
+                                                 cut_name, process_name)
+                    for cut_name, cut_definition in cut_list.items()}
+                df = df.wrap(define_cut_mask(get_node(df), profiled_cuts),
+                             'Define', CUT_MASK_COLUMN,
+                             list(range(nnodes, len(PROFILED_NODES))))
+            else:
+                df = define_cut_mask(df, cut_list)
+            cut_flow = book_cut_flow(df, cut_list, save_cut_flow)
+            snapshot_columns = "^(?!_cut_mask$).*"
 
         # Define all histos, snapshots, etc...
-        LOGGER.info('Defining snapshots and histograms')
-        for cut_name, cut_definition in cut_list.items():
+        LOGGER.debug('Defining snapshots and histograms')
+        for i, (cut_name, cut_definition) in enumerate(cut_list.items()):
             # output file for tree
             fout = output_dir + process_name + '_' + cut_name + '.root'
             fout_list.append(fout)
 
-            df_cut = df.Filter(cut_definition)
-
-            count_list.append(df_cut.Count())
-
-            histos = []
-
-            for v in histo_list:
-                # default 1D histogram
-                if "name" in histo_list[v]:
-                    model = ROOT.RDF.TH1DModel(
-                        v,
-                        f';{histo_list[v]["title"]};',
-                        histo_list[v]["bin"],
-                        histo_list[v]["xmin"],
-                        histo_list[v]["xmax"])
-                    histos.append(df_cut.Histo1D(model, histo_list[v]["name"]))
-                # multi dim histogram (1, 2 or 3D)
-                elif "cols" in histo_list[v]:
-                    cols = histo_list[v]['cols']
-                    bins = histo_list[v]['bins']
-                    bins_unpacked = tuple(i for sub in bins for i in sub)
-                    if len(bins) != len(cols):
-                        LOGGER.error('Amount of columns should be equal to '
-                                     'the amount of bin configs!\nAborting...')
-                        sys.exit(3)
-                    if len(cols) == 1:
-                        histos.append(df_cut.Histo1D((v, "", *bins_unpacked),
-                                                     cols[0]))
-                    elif len(cols) == 2:
-                        histos.append(df_cut.Histo2D((v, "", *bins_unpacked),
-                                                     cols[0],
-                                                     cols[1]))
-                    elif len(cols) == 3:
-                        histos.append(df_cut.Histo3D((v, "", *bins_unpacked),
-                                                     cols[0],
-                                                     cols[1],
-                                                     cols[2]))
-                    else:
-                        LOGGER.error('Only 1, 2 or 3D histograms supported.')
-                        sys.exit(3)
-                else:
-                    LOGGER.error('Error parsing the histogram config. Provide '
-                                 'either name or cols.')
-                    sys.exit(3)
-            histos_list.append(histos)
+            if use_cut_mask:
+                df_cut = filter_cut(df, i, cut_name)
+            else:
+                df_cut = df.Filter(cut_definition)
+                count_list.append(df_cut.Count())
+
+            histos_list.append(book_histograms(df_cut, histo_list))
+
+            if use_cut_mask and do_n_minus_one:
+                df_n_minus_one = filter_n_minus_one(df, i, len(cut_list),
+                                                    cut_name)
+                n_minus_one_list.append(book_histograms(df_n_minus_one,
+                                                        histo_list))
 
             if do_tree:
                 opts = ROOT.RDF.RSnapshotOptions()
                 opts.fLazy = True
                 try:
-                    snapshot_tdf = df_cut.Snapshot("events", fout, "", opts)
+                    snapshot_tdf = df_cut.Snapshot("events", fout,
+                                                   snapshot_columns, opts)
                 except Exception as excp:
                     LOGGER.error('During the execution of the final stage '
                                  'exception occurred:\n%s', excp)
@@ -302,10 +391,57 @@ def run(rdf_module, args):
         if args.graph:
             generate_graph(df, args)
 
-        # Now perform the loop and evaluate everything at once.
-        LOGGER.info('Evaluating...')
-        all_events = df.Count().GetValue()
-        LOGGER.info('Done')
+        graphs[process_name] = {'df': df,
+                                'all_events': df.Count(),
+                                'count_list': count_list,
+                                'cut_flow': cut_flow,
+                                'cut_scan': cut_scan,
+                                'histos_list': histos_list,
+                                'n_minus_one_list': n_minus_one_list,
+                                'fout_list': fout_list,
+                                'tdf_list': tdf_list}
+
+    # Now perform the loops of all processes and evaluate everything at once.
+    # The string expressions shared by the processes are jitted together.
+    LOGGER.info('Evaluating...')
+    start_memory_monitor()
+    with trace_phase('event loop'):
+        ROOT.ROOT.RDF.RunGraphs([graph['all_events']
+                                 for graph in graphs.values()])
+    peak_memory = stop_memory_monitor()
+    LOGGER.info('Done')
+
+    for process_name, graph in graphs.items():
+        LOGGER.info('Results for process: %s', process_name)
+        histos_list = graph['histos_list']
+        fout_list = graph['fout_list']
+        cut_flow = graph['cut_flow']
+        # Number of events passing each of the cuts
+        if use_cut_mask:
+            count_list = [int(cut_flow['independent'].GetBinContent(i + 1))
+                          for i in range(len(cut_list))]
+        else:
+            count_list = [count.GetValue() for count in graph['count_list']]
+
+        cuts_list = []
+        cuts_list.append(process_name)
+        eff_list = []
+        eff_list.append(process_name)
+
+        # get process information from prodDict
+        try:
+            xsec = process_dict[process_name]["crossSection"]
+            kfactor = process_dict[process_name]["kfactor"]
+            matchingEfficiency = process_dict[process_name]["matchingEfficiency"]
+        except KeyError:
+            xsec = 1.0
+            kfactor = 1.0
+            matchingEfficiency = 1.0
+            LOGGER.error(
+                f'No value defined for process {process_name} in dictionary!')
+        gen_sf = xsec*kfactor*matchingEfficiency
+
+        all_events = graph['all_events'].GetValue()
 
         nevents_real += all_events
         uncertainty = ROOT.Math.sqrt(all_events)
@@ -329,7 +465,7 @@ def run(rdf_module, args):
             # ####eff_list.append(1.)  # start with 100% efficiency
 
         for i, cut in enumerate(cut_list):
-            nevents_this_cut = count_list[i].GetValue()
+            nevents_this_cut = count_list[i]
             nevents_this_cut_raw = nevents_this_cut
             uncertainty = ROOT.Math.sqrt(nevents_this_cut_raw)
             if do_scale:
@@ -367,30 +503,26 @@ def run(rdf_module, args):
 
         # And save everything
         LOGGER.info('Saving the outputs...')
+        scale = gen_sf * int_lumi / process_events[process_name]
+        if graph['cut_scan'] is not None:
+            scan_yields[process_name] = [
+                y * scale for y in get_scan_yields(graph['cut_scan'],
+                                                   scan_grid)]
         for i, cut in enumerate(cut_list):
             # output file for histograms
             fhisto = output_dir + process_name + '_' + cut + '_histo.root'
-            with ROOT.TFile(fhisto, 'RECREATE'):
-                for h in histos_list[i]:
-                    if do_scale:
-                        h.Scale(gen_sf * int_lumi / process_events[process_name])
-                    h.Write()
-
-                # write all meta info to the output file
-                p = ROOT.TParameter(int)("eventsProcessed", process_events[process_name])
-                p.Write()
-                # take sum of weights=eventsProcessed for now (assume weights==1)
-                p = ROOT.TParameter(float)("sumOfWeights", process_events[process_name])
-                p.Write()
-                p = ROOT.TParameter(float)("intLumi", int_lumi)
-                p.Write()
-                p = ROOT.TParameter(float)("crossSection", xsec)
-                p.Write()
-                p = ROOT.TParameter(float)("kfactor", kfactor)
-                p.Write()
-                p = ROOT.TParameter(float)("matchingEfficiency",
-                                           matchingEfficiency)
-                p.Write()
+            write_histograms(fhisto, histos_list[i],
+                             scale if do_scale else None,
+                             process_events[process_name], int_lumi,
+                             xsec, kfactor, matchingEfficiency)
+
+            if graph['n_minus_one_list']:
+                fhisto = output_dir + process_name + '_' + cut + \
+                    '_Nminus1_histo.root'
+                write_histograms(fhisto, graph['n_minus_one_list'][i],
+                                 scale if do_scale else None,
+                                 process_events[process_name], int_lumi,
+                                 xsec, kfactor, matchingEfficiency)
 
             if do_tree:
                 # test that the snapshot worked well
@@ -398,6 +530,19 @@ def run(rdf_module, args):
                 if not validfile:
                     continue
 
+        if use_cut_mask and save_cut_flow:
+            fcutflow = output_dir + process_name + '_cutFlow.root'
+            LOGGER.info('Saving cut-flow to:\n%s', fcutflow)
+            cut_flow_hists = [cut_flow['independent'].GetValue(),
+                              cut_flow['cumulative'].GetValue(),
+                              cut_flow['overlap'].GetValue()]
+            cut_flow_hists.append(get_cut_correlation(
+                cut_flow_hists[2], graph['all_events'].GetValue()))
+            label_cut_flow(cut_flow_hists, list(cut_list))
+            with ROOT.TFile(fcutflow, 'RECREATE'):
+                for hist in cut_flow_hists:
+                    hist.Write()
+
         if save_tabular and cut != 'selNone':
             save_tab.append(cuts_list)
             efficiency_list.append(eff_list)
@@ -446,6 +591,27 @@ def run(rdf_module, args):
                           '    \\label{tab:my_label} \n'
                           '\\end{table}\n')
 
+    if scan_grid:
+        npoints = len(next(iter(scan_yields.values())))
+        signal = [0.] * npoints
+        background = [0.] * npoints
+        for process_name, yields in scan_yields.items():
+            total = signal if process_name in scan_signal else background
+            for i, y in enumerate(yields):
+                total[i] += y
+        scan_path = output_dir + 'cutScan.txt'
+        LOGGER.info('Saving cut scan to:\n%s', scan_path)
+        write_cut_scan(scan_path, scan_grid, signal, background)
+
+    if args.profile:
+        save_profile_report(args.profile)
+    if args.graph_timing:
+        generate_timing_graph(args)
+    if args.trace:
+        save_trace(args.trace)
+    if args.column_sizes:
+        log_column_sizes()
+
     elapsed_time = time.time() - start_time
 
     info_msg = f"{' SUMMARY ':=^80}\n"
@@ -454,6 +620,7 @@ def run(rdf_module, args):
     info_msg += '\nEvents processed/second: '
     info_msg += f'{int(nevents_real/elapsed_time):,}'
     info_msg += f'\nTotal events processed:  {nevents_real:,}'
+    info_msg += f'\nPeak memory (RSS):       {format_bytes(peak_memory)}'
     info_msg += '\n'
     info_msg += 80 * '='
     info_msg += '\n'
@@ -516,6 +683,9 @@ def run_final(parser):
     rdf_module = importlib.util.module_from_spec(rdf_spec)
     rdf_spec.loader.exec_module(rdf_module)
 
+    # Load analyzers with heavy dependencies only when referenced
+    load_referenced_analyzers([anapath_abs])
+
     # Merge configuration from analysis script file with command line arguments
     if get_element(rdf_module, 'graph'):
         args.graph = True
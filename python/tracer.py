@@ -0,0 +1,65 @@
+'''
+Timeline tracer of the event loop.
+
+The tasks processed by the threads of the event loop, file switches, phases
+of the run and the ONNX inference calls are recorded and saved in the Chrome
+trace format, which can be opened in https://ui.perfetto.dev or
+chrome://tracing.
+'''
+
+import contextlib
+import logging
+import ROOT  # type: ignore
+
+
+ROOT.gROOT.SetBatch(True)
+
+LOGGER: logging.Logger = logging.getLogger('FCCAnalyses.tracer')
+
+
+# _____________________________________________________________________________
+def start_tracing(max_events: int = 1000000) -> None:
+    '''
+    Start recording of the timeline, the calling thread is shown as the main
+    one.
+    '''
+    ROOT.FCCAnalyses.Tracer.enable(max_events)
+
+
+# _____________________________________________________________________________
+def trace_dataframe(dframe, label: str):
+    '''
+    Add always-true filter recording the tasks of the event loop to the top of
+    the computational graph.
+    '''
+    graph = ROOT.FCCAnalyses.Tracer.register_graph(label)
+
+    return dframe.Filter(
+        f'FCCAnalyses::Tracer::tick({graph}, rdfslot_, rdfsampleinfo_)')
+
+
+# _____________________________________________________________________________
+@contextlib.contextmanager
+def trace_phase(name: str):
+    '''
+    Record phase of the run on the main thread, does nothing when the tracing
+    is not enabled.
+    '''
+    ROOT.FCCAnalyses.Tracer.begin(name)
+    try:
+        yield
+    finally:
+        ROOT.FCCAnalyses.Tracer.end()
+
+
+# _____________________________________________________________________________
+def save_trace(path: str) -> None:
+    '''
+    Close the open tasks, save the timeline and stop the recording.
+    '''
+    ROOT.FCCAnalyses.Tracer.finish()
+    ROOT.FCCAnalyses.Tracer.save(path)
+    LOGGER.info('Timeline with %s events saved to:\n%s\nOpen it in '
+                'https://ui.perfetto.dev or chrome://tracing',
+                f'{ROOT.FCCAnalyses.Tracer.get_nevents():,}', path)
+    ROOT.FCCAnalyses.Tracer.disable()
@@ -0,0 +1,11 @@
+# generated with `stubgen tracer.py`
+
+import logging
+from collections.abc import Generator
+
+LOGGER: logging.Logger
+
+def start_tracing(max_events: int = 1000000) -> None: ...
+def trace_dataframe(dframe, label: str): ...
+def trace_phase(name: str) -> Generator[None, None, None]: ...
+def save_trace(path: str) -> None: ...
@@ -0,0 +1,175 @@
+'''
+Python user-defined functions compiled with Numba.
+
+The function is compiled for the types of the input columns and declared to
+the interpreter with ROOT.Numba.Declare, the Define and Filter nodes then
+call it as any other C++ function. The RVec columns are passed to the
+function as NumPy arrays and RVec is returned for the array results.
+'''
+
+import re
+import sys
+import logging
+import ROOT  # type: ignore
+
+
+ROOT.gROOT.SetBatch(True)
+
+LOGGER: logging.Logger = logging.getLogger('FCCAnalyses.udf')
+
+# Column types supported by ROOT.Numba.Declare
+SCALAR_TYPES: dict[str, str] = {
+    'float': 'float', 'Float_t': 'float',
+    'double': 'double', 'Double_t': 'double',
+    'int': 'int', 'Int_t': 'int',
+    'unsignedint': 'unsigned int', 'UInt_t': 'unsigned int',
+    'long': 'long', 'Long_t': 'long', 'Long64_t': 'long',
+    'unsignedlong': 'unsigned long', 'ULong_t': 'unsigned long',
+    'ULong64_t': 'unsigned long',
+    'bool': 'bool', 'Bool_t': 'bool',
+}
+RVEC_TYPES: dict[str, str] = {
+    'float': 'RVecF', 'double': 'RVecD', 'int': 'RVecI',
+    'unsigned int': 'RVecU', 'long': 'RVecL', 'unsigned long': 'RVecUL',
+    'bool': 'RVecB',
+}
+# Elements typedef-ed to long long, their RVecs are not RVecL/RVecUL
+LONG64_TYPES: tuple[str, ...] = ('Long64_t', 'ULong64_t')
+RVEC_PATTERN: re.Pattern = re.compile(
+    r'^(?:ROOT::)?(?:VecOps::)?RVec<(.+)>$')
+
+# Already declared functions, by the function and input types
+DECLARED_FUNCTIONS: dict[tuple, str] = {}
+
+
+# _____________________________________________________________________________
+def get_numba_type(cpp_type: str) -> str:
+    '''
+    Get type name accepted by ROOT.Numba.Declare for the column type.
+    '''
+    cpp_type = cpp_type.replace(' ', '')
+    match = RVEC_PATTERN.match(cpp_type)
+    if match and match.group(1) in LONG64_TYPES:
+        LOGGER.error('Column type "%s" is not supported by the Numba '
+                     'functions, convert the column first, e.g. with:\n  '
+                     'ROOT::VecOps::RVec<long>(<column>)\nAborting...',
+                     cpp_type)
+        sys.exit(3)
+    if match and match.group(1) in SCALAR_TYPES:
+        return RVEC_TYPES[SCALAR_TYPES[match.group(1)]]
+    if cpp_type in SCALAR_TYPES:
+        return SCALAR_TYPES[cpp_type]
+
+    LOGGER.error('Column type "%s" is not supported by the Numba '
+                 'functions!\nAborting...', cpp_type)
+    sys.exit(3)
+
+
+# _____________________________________________________________________________
+def get_numba():
+    '''
+    Import Numba, which is needed only by the analyses using it.
+    '''
+    try:
+        import numba  # type: ignore
+    except ImportError:
+        LOGGER.error('Numba is required by the Python functions, install '
+                     'it with:\n  pip install numba\nAborting...')
+        sys.exit(3)
+
+    return numba
+
+
+# _____________________________________________________________________________
+def infer_return_type(func, input_types: list[str]) -> str:
+    '''
+    Compile the function for the input types with Numba and get the type
+    name of its result.
+    '''
+    numba = get_numba()
+    scalars = {'float': numba.float32, 'double': numba.float64,
+               'int': numba.int32, 'unsigned int': numba.uint32,
+               'long': numba.int64, 'unsigned long': numba.uint64,
+               'bool': numba.boolean}
+    rvecs = {name: scalar for scalar, name in RVEC_TYPES.items()}
+    arg_types = [scalars[rvecs[t]][:] if t in rvecs else scalars[t]
+                 for t in input_types]
+
+    dispatcher = numba.njit(func)
+    try:
+        dispatcher.compile(tuple(arg_types))
+    except Exception as excp:
+        LOGGER.error('Function "%s" can\'t be compiled with Numba for the '
+                     'input types %s:\n%s\nAborting...', func.__name__,
+                     input_types, excp)
+        sys.exit(3)
+    result = dispatcher.nopython_signatures[-1].return_type
+
+    dtype = getattr(result, 'dtype', result)
+    for name, scalar in scalars.items():
+        if dtype == scalar:
+            if hasattr(result, 'dtype'):
+                return RVEC_TYPES[name]
+            return name
+
+    LOGGER.error('Result type "%s" of the function "%s" is not supported by '
+                 'the Numba functions!\nAborting...', result, func.__name__)
+    sys.exit(3)
+
+
+# _____________________________________________________________________________
+def declare_numba(func, input_types: list[str],
+                  return_type: str = '') -> str:
+    '''
+    Declare the Python function compiled with Numba for the input types and
+    return the name of the C++ function to be used in the expressions. The
+    return type is inferred, if not provided.
+    '''
+    key = (func, tuple(input_types), return_type)
+    if key in DECLARED_FUNCTIONS:
+        return DECLARED_FUNCTIONS[key]
+
+    if not return_type:
+        return_type = infer_return_type(func, input_types)
+    # Lambdas and closures from the same factory share the name, every
+    # declaration gets its own number
+    name = re.sub(r'[^A-Za-z0-9_]', '_', func.__name__)
+    name = f'{name}_{len(DECLARED_FUNCTIONS)}'
+    LOGGER.debug('Declaring Numba function Numba::%s(%s) -> %s', name,
+                 ', '.join(input_types), return_type)
+    ROOT.Numba.Declare(input_types, return_type, name=name)(func)
+
+    DECLARED_FUNCTIONS[key] = f'Numba::{name}'
+    return DECLARED_FUNCTIONS[key]
+
+
+# _____________________________________________________________________________
+def get_numba_call(dframe, func, columns: list[str],
+                   return_type: str = '') -> str:
+    '''
+    Get expression calling the Python function on the columns, the input
+    types are taken from the columns.
+    '''
+    input_types = [get_numba_type(str(dframe.GetColumnType(c)))
+                   for c in columns]
+    name = declare_numba(func, input_types, return_type)
+
+    return f'{name}({", ".join(columns)})'
+
+
+# _____________________________________________________________________________
+def define_numba(dframe, name: str, func, columns: list[str],
+                 return_type: str = ''):
+    '''
+    Define new column computed by the Python function from the columns.
+    '''
+    return dframe.Define(name, get_numba_call(dframe, func, columns,
+                                              return_type))
+
+
+# _____________________________________________________________________________
+def filter_numba(dframe, func, columns: list[str], name: str = ''):
+    '''
+    Filter events with the Python function of the columns returning bool.
+    '''
+    return dframe.Filter(get_numba_call(dframe, func, columns, 'bool'), name)
@@ -0,0 +1,19 @@
+# generated with `stubgen udf.py`
+
+import re
+import logging
+
+LOGGER: logging.Logger
+SCALAR_TYPES: dict[str, str]
+RVEC_TYPES: dict[str, str]
+LONG64_TYPES: tuple[str, ...]
+RVEC_PATTERN: re.Pattern
+DECLARED_FUNCTIONS: dict[tuple, str]
+
+def get_numba_type(cpp_type: str) -> str: ...
+def get_numba(): ...
+def infer_return_type(func, input_types: list[str]) -> str: ...
+def declare_numba(func, input_types: list[str], return_type: str = '') -> str: ...
+def get_numba_call(dframe, func, columns: list[str], return_type: str = '') -> str: ...
+def define_numba(dframe, name: str, func, columns: list[str], return_type: str = ''): ...
+def filter_numba(dframe, func, columns: list[str], name: str = ''): ...
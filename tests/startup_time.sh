@@ -0,0 +1,37 @@
+#!/bin/env bash
+
+# This test guards the start-up time of the fccanalysis command. The help of
+# all sub-commands, the sub-commands which don't need ROOT and the argument
+# errors have to finish within the time limit (in seconds) and must not import
+# ROOT.
+
+LIMIT=${FCCANALYSES_STARTUP_LIMIT:-1.0}
+FAILED=0
+
+check_startup() {
+  local start end elapsed imports
+  start=$(date +%s.%N)
+  imports=$(python3 -X importtime "$(command -v fccanalysis)" "$@" 2>&1 \
+            >/dev/null)
+  end=$(date +%s.%N)
+  elapsed=$(awk "BEGIN {print ${end} - ${start}}")
+  echo "fccanalysis $*: ${elapsed} s"
+  if echo "${imports}" | grep -qE '\| +ROOT$'; then
+    echo "ERROR: fccanalysis $* imports ROOT!"
+    FAILED=1
+  fi
+  if awk "BEGIN {exit !(${elapsed} > ${LIMIT})}"; then
+    echo "ERROR: fccanalysis $* took longer than ${LIMIT} s!"
+    FAILED=1
+  fi
+}
+
+check_startup --help
+for SUBCOMMAND in init build test pin run final plots combine merge; do
+  check_startup ${SUBCOMMAND} --help
+done
+# Argument errors
+check_startup run
+check_startup --no-such-option
+
+exit ${FAILED}
@@ -0,0 +1,131 @@
+#include "FCCAnalyses/Bootstrap.h"
+
+#include <filesystem>
+#include <map>
+#include <optional>
+#include <string>
+#include <utility>
+#include <vector>
+
+#include "ROOT/RDataFrame.hxx"
+#include "ROOT/RDF/RDatasetSpec.hxx"
+#include "TFile.h"
+#include "TROOT.h"
+#include "TTree.h"
+
+#include <catch2/catch_test_macros.hpp>
+#include <catch2/matchers/catch_matchers_floating_point.hpp>
+
+TEST_CASE("weights", "[bootstrap]") {
+  ROOT::VecOps::RVec<double> res = FCCAnalyses::Bootstrap::weights(42, 10);
+  REQUIRE(res.size() == 10);
+  ROOT::VecOps::RVec<double> again = FCCAnalyses::Bootstrap::weights(42, 10);
+  for (std::size_t i = 0; i < res.size(); ++i) {
+    REQUIRE(res[i] >= 0.);
+    REQUIRE(res[i] == again[i]);
+  }
+}
+
+TEST_CASE("weights mean", "[bootstrap]") {
+  const int nkeys = 100000;
+  double sum = 0.;
+  for (int i = 0; i < nkeys; ++i) {
+    sum += FCCAnalyses::Bootstrap::weights(i, 1)[0];
+  }
+  REQUIRE_THAT(sum / nkeys, Catch::Matchers::WithinAbs(1., 0.02));
+}
+
+namespace {
+// Two input files with several clusters each, every event carries its number
+// within the whole chain
+std::vector<std::string> makeInputFiles(ULong64_t nentries) {
+  std::vector<std::string> files;
+  ULong64_t id = 0;
+  for (int i = 0; i < 2; ++i) {
+    files.push_back((std::filesystem::temp_directory_path() /
+                     ("bootstrap_unittest_" + std::to_string(i) + ".root"))
+                        .string());
+    TFile file(files.back().c_str(), "RECREATE");
+    TTree tree("events", "events");
+    tree.Branch("id", &id, "id/l");
+    tree.SetAutoFlush(100);
+    for (ULong64_t j = 0; j < nentries; ++j, ++id) {
+      tree.Fill();
+    }
+    tree.Write();
+  }
+  return files;
+}
+
+// Keys of the events as booked by the histmaker, by the event number
+std::map<ULong64_t, std::uint64_t>
+getKeys(const std::vector<std::string> &files, ULong64_t nentries,
+        unsigned int nthreads,
+        std::optional<std::pair<Long64_t, Long64_t>> range = std::nullopt) {
+  if (nthreads > 1) {
+    ROOT::EnableImplicitMT(nthreads);
+  }
+  ROOT::RDF::Experimental::RDatasetSpec spec;
+  spec.AddSample({"events", "events", files});
+  if (range) {
+    spec.WithGlobalRange({range->first, range->second});
+  }
+  ROOT::RDataFrame dframe(spec);
+
+  std::vector<ULong64_t> offsets;
+  if (range || nthreads <= 1) {
+    offsets = {0, nentries};
+  }
+  auto node =
+      dframe
+          .DefinePerSample("offset",
+                           [offsets](unsigned int,
+                                     const ROOT::RDF::RSampleInfo &info) {
+                             return FCCAnalyses::Bootstrap::offset(info,
+                                                                   offsets);
+                           })
+          .Define("key",
+                  [](const ROOT::RDF::RSampleInfo &info, ULong64_t offset) {
+                    return FCCAnalyses::Bootstrap::key(
+                        info, FCCAnalyses::Bootstrap::entry(info) - offset);
+                  },
+                  {"rdfsampleinfo_", "offset"});
+  auto ids = node.Take<ULong64_t>("id");
+  auto keys = node.Take<std::uint64_t>("key");
+
+  std::map<ULong64_t, std::uint64_t> result;
+  for (std::size_t i = 0; i < ids->size(); ++i) {
+    result[ids->at(i)] = keys->at(i);
+  }
+  ROOT::DisableImplicitMT();
+  return result;
+}
+} // namespace
+
+TEST_CASE("keys independent of scheduling", "[bootstrap]") {
+  const ULong64_t nentries = 1000;
+  const auto files = makeInputFiles(nentries);
+
+  const auto reference = getKeys(files, nentries, 1);
+  REQUIRE(reference.size() == 2 * nentries);
+
+  SECTION("multi-threaded") {
+    REQUIRE(getKeys(files, nentries, 4) == reference);
+  }
+
+  SECTION("sliced") {
+    for (unsigned int nthreads : {1, 4}) {
+      auto keys = getKeys(files, nentries, nthreads,
+                          std::pair<Long64_t, Long64_t>{0, 1234});
+      const auto rest = getKeys(files, nentries, nthreads,
+                                std::pair<Long64_t, Long64_t>{1234, 2000});
+      REQUIRE(keys.size() + rest.size() == 2 * nentries);
+      keys.insert(rest.begin(), rest.end());
+      REQUIRE(keys == reference);
+    }
+  }
+
+  for (const auto &file : files) {
+    std::filesystem::remove(file);
+  }
+}
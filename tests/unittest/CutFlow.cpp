@@ -0,0 +1,38 @@
+#include "FCCAnalyses/CutFlow.h"
+
+#include <catch2/catch_test_macros.hpp>
+
+TEST_CASE("passed", "[cutflow]") {
+  ROOT::VecOps::RVec<int> res = FCCAnalyses::CutFlow::passed(0b1011, 4);
+  REQUIRE(res.size() == 3);
+  REQUIRE(res[0] == 0);
+  REQUIRE(res[1] == 1);
+  REQUIRE(res[2] == 3);
+}
+
+TEST_CASE("cumulative", "[cutflow]") {
+  ROOT::VecOps::RVec<int> res = FCCAnalyses::CutFlow::cumulative(0b1011, 4);
+  REQUIRE(res.size() == 2);
+  REQUIRE(res[0] == 0);
+  REQUIRE(res[1] == 1);
+  REQUIRE(FCCAnalyses::CutFlow::cumulative(0b1110, 4).empty());
+}
+
+TEST_CASE("pairs", "[cutflow]") {
+  ROOT::VecOps::RVec<int> first = FCCAnalyses::CutFlow::pairs_first(0b101, 3);
+  ROOT::VecOps::RVec<int> second =
+      FCCAnalyses::CutFlow::pairs_second(0b101, 3);
+  REQUIRE(first.size() == 4);
+  REQUIRE(second.size() == 4);
+  REQUIRE(first[1] == 0);
+  REQUIRE(second[1] == 2);
+  REQUIRE(first[2] == 2);
+  REQUIRE(second[2] == 0);
+}
+
+TEST_CASE("pass_all_but", "[cutflow]") {
+  REQUIRE(FCCAnalyses::CutFlow::pass_all_but(0b111, 3, 1));
+  REQUIRE(FCCAnalyses::CutFlow::pass_all_but(0b101, 3, 1));
+  REQUIRE_FALSE(FCCAnalyses::CutFlow::pass_all_but(0b101, 3, 0));
+  REQUIRE(FCCAnalyses::CutFlow::pass_all_but(~std::uint64_t(0) - 1, 64, 0));
+}
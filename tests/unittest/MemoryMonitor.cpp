@@ -0,0 +1,31 @@
+#include "FCCAnalyses/MemoryMonitor.h"
+
+#include <vector>
+
+#include <catch2/catch_test_macros.hpp>
+
+TEST_CASE("peak", "[memorymonitor]") {
+  REQUIRE(FCCAnalyses::MemoryMonitor::get_rss() > 0);
+  FCCAnalyses::MemoryMonitor::start(1);
+  const ULong64_t before = FCCAnalyses::MemoryMonitor::get_rss();
+  std::vector<char> buffer(64 * 1024 * 1024, 1);
+  const ULong64_t peak = FCCAnalyses::MemoryMonitor::stop();
+  REQUIRE(buffer.back() == 1);
+  REQUIRE(peak >= before + buffer.size() / 2);
+  REQUIRE(FCCAnalyses::MemoryMonitor::get_peak() == peak);
+}
+
+TEST_CASE("first entry", "[memorymonitor]") {
+  FCCAnalyses::MemoryMonitor::start(1);
+  REQUIRE(FCCAnalyses::MemoryMonitor::get_first_entry_rss() == 0);
+  REQUIRE(FCCAnalyses::MemoryMonitor::get_first_entry_time() < 0.);
+  REQUIRE(FCCAnalyses::MemoryMonitor::mark_first_entry());
+  const ULong64_t first = FCCAnalyses::MemoryMonitor::get_first_entry_rss();
+  REQUIRE(first > 0);
+  REQUIRE(FCCAnalyses::MemoryMonitor::get_first_entry_time() >= 0.);
+  std::vector<char> buffer(16 * 1024 * 1024, 1);
+  REQUIRE(FCCAnalyses::MemoryMonitor::mark_first_entry());
+  REQUIRE(buffer.back() == 1);
+  REQUIRE(FCCAnalyses::MemoryMonitor::get_first_entry_rss() == first);
+  FCCAnalyses::MemoryMonitor::stop();
+}
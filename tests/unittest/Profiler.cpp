@@ -0,0 +1,48 @@
+#include "FCCAnalyses/Profiler.h"
+
+#include <catch2/catch_test_macros.hpp>
+
+TEST_CASE("define", "[profiler]") {
+  FCCAnalyses::Profiler::reset();
+  int node = FCCAnalyses::Profiler::register_node(2);
+  REQUIRE(node == 0);
+  int value = (FCCAnalyses::Profiler::start(node, 1),
+               FCCAnalyses::Profiler::stop(node, 1, 42));
+  REQUIRE(value == 42);
+  REQUIRE(FCCAnalyses::Profiler::get_calls(node) == 1);
+  REQUIRE(FCCAnalyses::Profiler::get_passed(node) == 0);
+  std::vector<double> times = FCCAnalyses::Profiler::get_times(node);
+  REQUIRE(times.size() == 2);
+  REQUIRE(times[0] == 0.);
+  REQUIRE(times[1] >= 0.);
+}
+
+TEST_CASE("filter", "[profiler]") {
+  FCCAnalyses::Profiler::reset();
+  int node = FCCAnalyses::Profiler::register_node(1);
+  for (int i = 0; i < 10; ++i) {
+    FCCAnalyses::Profiler::start(node, 0);
+    FCCAnalyses::Profiler::filter(node, 0, i % 3 == 0);
+  }
+  REQUIRE(FCCAnalyses::Profiler::get_calls(node) == 10);
+  REQUIRE(FCCAnalyses::Profiler::get_passed(node) == 4);
+}
+
+TEST_CASE("sized", "[profiler]") {
+  FCCAnalyses::Profiler::reset();
+  int node = FCCAnalyses::Profiler::register_node(1);
+  ROOT::VecOps::RVec<ROOT::VecOps::RVec<float>> value(3);
+  for (auto &inner : value) {
+    inner.reserve(20);
+  }
+  const ULong64_t expected =
+      value.capacity() * sizeof(ROOT::VecOps::RVec<float>) +
+      3 * value[0].capacity() * sizeof(float);
+  REQUIRE(FCCAnalyses::Profiler::get_allocated_bytes(value) == expected);
+  REQUIRE(FCCAnalyses::Profiler::get_allocated_bytes(42) == 0);
+  auto result = (FCCAnalyses::Profiler::start(node, 0),
+                 FCCAnalyses::Profiler::stop_sized(node, 0, std::move(value)));
+  REQUIRE(result.size() == 3);
+  REQUIRE(FCCAnalyses::Profiler::get_calls(node) == 1);
+  REQUIRE(FCCAnalyses::Profiler::get_bytes(node) == expected);
+}
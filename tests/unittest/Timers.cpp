@@ -0,0 +1,30 @@
+#include "FCCAnalyses/Timers.h"
+
+#include <thread>
+
+#include <catch2/catch_test_macros.hpp>
+
+TEST_CASE("scope", "[timers]") {
+  int timer = FCCAnalyses::Timers::register_timer("unittest scope");
+  REQUIRE(FCCAnalyses::Timers::register_timer("unittest scope") == timer);
+  FCCAnalyses::Timers::reset();
+  for (int i = 0; i < 5; ++i) {
+    FCCAnalyses::Timers::Scope scope(timer);
+  }
+  std::thread thread([timer]() { FCCAnalyses::Timers::Scope scope(timer); });
+  thread.join();
+  REQUIRE(FCCAnalyses::Timers::get_names().at(timer) == "unittest scope");
+  REQUIRE(FCCAnalyses::Timers::get_calls().at(timer) == 6);
+  REQUIRE(FCCAnalyses::Timers::get_times().at(timer) >= 0.);
+}
+
+TEST_CASE("count", "[timers]") {
+  int counter = FCCAnalyses::Timers::register_timer("unittest count");
+  FCCAnalyses::Timers::reset();
+  FCCAnalyses::Timers::count(counter, 3);
+  FCCAnalyses::Timers::count(counter, 4);
+  REQUIRE(FCCAnalyses::Timers::get_calls().at(counter) == 2);
+  REQUIRE(FCCAnalyses::Timers::get_counts().at(counter) == 7);
+  FCCAnalyses::Timers::reset();
+  REQUIRE(FCCAnalyses::Timers::get_counts().at(counter) == 0);
+}
@@ -0,0 +1,49 @@
+#include "FCCAnalyses/Tracer.h"
+
+#include <cstdio>
+#include <fstream>
+#include <iterator>
+#include <string>
+
+#include <catch2/catch_test_macros.hpp>
+
+TEST_CASE("disabled", "[tracer]") {
+  FCCAnalyses::Tracer::disable();
+  REQUIRE_FALSE(FCCAnalyses::Tracer::is_enabled());
+  { FCCAnalyses::Tracer::Scope scope("call"); }
+  FCCAnalyses::Tracer::begin("phase");
+  FCCAnalyses::Tracer::end();
+  REQUIRE(FCCAnalyses::Tracer::get_nevents() == 0);
+}
+
+TEST_CASE("phases and scopes", "[tracer]") {
+  FCCAnalyses::Tracer::enable();
+  REQUIRE(FCCAnalyses::Tracer::is_enabled());
+  FCCAnalyses::Tracer::begin("phase");
+  { FCCAnalyses::Tracer::Scope scope("call"); }
+  FCCAnalyses::Tracer::end();
+  REQUIRE(FCCAnalyses::Tracer::get_nevents() == 2);
+  REQUIRE_THROWS(FCCAnalyses::Tracer::end());
+
+  const std::string path = "tracer_unittest.json";
+  FCCAnalyses::Tracer::save(path);
+  std::ifstream infile(path);
+  const std::string content((std::istreambuf_iterator<char>(infile)),
+                            std::istreambuf_iterator<char>());
+  std::remove(path.c_str());
+  REQUIRE(content.find("\"traceEvents\"") != std::string::npos);
+  REQUIRE(content.find("\"name\": \"phase\"") != std::string::npos);
+  REQUIRE(content.find("\"name\": \"call\"") != std::string::npos);
+
+  FCCAnalyses::Tracer::disable();
+  REQUIRE(FCCAnalyses::Tracer::get_nevents() == 0);
+}
+
+TEST_CASE("max events", "[tracer]") {
+  FCCAnalyses::Tracer::enable(3);
+  for (int i = 0; i < 10; ++i) {
+    FCCAnalyses::Tracer::Scope scope("call");
+  }
+  REQUIRE(FCCAnalyses::Tracer::get_nevents() == 3);
+  FCCAnalyses::Tracer::disable();
+}